@@ -1,8 +1,9 @@
 import asyncio
 import logging
 import time
+from collections import deque
 from functools import lru_cache
-from typing import Any, Callable, Coroutine, Iterable
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterable
 
 from .abstract import ChainAsyncClient
 from .btc import BTCAsyncClient, BTCConfig, compute_btc_address, get_btc_async_client
@@ -13,11 +14,15 @@ from .evm import (
     compute_create2_address,
     get_evm_async_client,
 )
+from .limiter import AdaptiveLimiter, is_rate_limit_error
 
 __all__ = [
     "get_async_client",
     "get_compute_address_function",
     "filter_blocks",
+    "stream_blocks",
+    "AdaptiveLimiter",
+    "is_rate_limit_error",
     "BTCAsyncClient",
     "EVMAsyncClient",
     "BTCConfig",
@@ -77,3 +82,36 @@ async def filter_blocks[T: (Transfer, TxHash)](
     end = time.monotonic()
     await asyncio.sleep(max(max_delay_per_block_batch - (end - start), 0))
     return result
+
+
+async def stream_blocks[U, T](
+    units: Iterable[U],
+    fn: Callable[[U], Coroutine[Any, Any, T]],
+    limiter: AdaptiveLimiter,
+) -> AsyncIterator[tuple[U, T]]:
+    """Run `fn` over `units` concurrently through `limiter` and yield the results in input order.
+
+    At most `limiter.max_limit` units are scheduled or buffered at a time, so a slow consumer
+    does not let results pile up in memory.
+    """
+    units_iter = iter(units)
+    pending: deque[tuple[U, asyncio.Task[T]]] = deque()
+
+    def schedule():
+        while len(pending) < limiter.max_limit:
+            try:
+                unit = next(units_iter)
+            except StopIteration:
+                return
+            pending.append((unit, asyncio.create_task(limiter.submit(fn, unit))))
+
+    try:
+        schedule()
+        while pending:
+            unit, task = pending.popleft()
+            result = await task
+            schedule()
+            yield unit, result
+    finally:
+        for _, task in pending:
+            task.cancel()
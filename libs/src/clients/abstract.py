@@ -1,12 +1,20 @@
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import partial
+from typing import Iterable
 
+from clients.cache import BlockCache, CachedBlock, dump_transfer, get_block_cache
 from clients.custom_types import (
+    BlockHeader,
     BlockNumber,
     ChainConfig,
     Transfer,
     TxHash,
 )
+from clients.endpoint_pool import EndpointPool
 
 
 class BaseClientError(Exception):
@@ -18,12 +26,23 @@ class ChainAsyncClient[_ChainT: ChainConfig, _ClientT, _TransferT: Transfer, _Ad
         """Initialize with Chain chain configuration"""
         self.chain = chain
         self.logger = logger
+        self.endpoint_pool = EndpointPool(
+            chain.rpc_urls,
+            hedge_delay=chain.rpc_hedge_delay,
+            max_head_lag=chain.rpc_max_head_lag,
+            head_refresh_interval=chain.rpc_head_refresh_interval,
+        )
+        self._canonical_hashes: dict[BlockNumber, tuple[float, asyncio.Task[str]]] = {}
 
     @property
     @abstractmethod
     def client(self) -> _ClientT:
         """Get or create an async client connection"""
 
+    @property
+    def block_cache(self) -> BlockCache:
+        return get_block_cache()
+
     @abstractmethod
     async def get_transfer_by_tx_hash(self, tx_hash: TxHash) -> _TransferT | list[_TransferT]:
         """Retrieve transfer details by transaction hash"""
@@ -48,6 +67,14 @@ class ChainAsyncClient[_ChainT: ChainConfig, _ClientT, _TransferT: Transfer, _Ad
     async def get_latest_block_number(self) -> BlockNumber:
         """Get latest block number"""
 
+    @abstractmethod
+    async def get_block_header(self, block_number: BlockNumber) -> BlockHeader:
+        """Get the header of the canonical block at `block_number`, without its transactions"""
+
+    async def get_block_hash(self, block_number: BlockNumber) -> str:
+        """Get the hash of the canonical block at `block_number`"""
+        return (await self.get_block_header(block_number)).hash
+
     @abstractmethod
     async def extract_transfer_from_block(
         self,
@@ -55,3 +82,79 @@ class ChainAsyncClient[_ChainT: ChainConfig, _ClientT, _TransferT: Transfer, _Ad
         **kwargs,
     ) -> list[_TransferT]:
         """Get block transfers"""
+
+    async def cache_block_transfers(
+        self,
+        block_number: BlockNumber,
+        block_hash: str,
+        transfers: Iterable[_TransferT],
+        *,
+        tx_hashes: list[TxHash] | None = None,
+    ):
+        """Store `transfers` of a block in the block cache, `tx_hashes` when the whole block was read."""
+        transfers_by_tx_hash = defaultdict(list)
+        for transfer in transfers:
+            transfers_by_tx_hash[transfer.tx_hash].append(dump_transfer(transfer))
+        await self.block_cache.put(
+            CachedBlock(
+                chain_symbol=self.chain.chain_symbol,
+                number=block_number,
+                hash=block_hash,
+                tx_hashes=tx_hashes,
+                transfers=transfers_by_tx_hash,
+            )
+        )
+
+    async def get_canonical_block_hash(self, block_number: BlockNumber) -> str:
+        """Get the hash of the canonical block at `block_number`, reused for `chain.delay` seconds.
+
+        The transactions of a scan are checked against the block cache concurrently, this makes
+        them cost one `get_block_hash` per block instead of one per transaction.
+        """
+        now = time.monotonic()
+        # Entries are added in time order, the expired ones are first.
+        while len(self._canonical_hashes) > 0:
+            oldest = next(iter(self._canonical_hashes))
+            if now - self._canonical_hashes[oldest][0] < self.chain.delay:
+                break
+            del self._canonical_hashes[oldest]
+        entry = self._canonical_hashes.get(block_number)
+        if entry is None or entry[1].get_loop() is not asyncio.get_running_loop():
+            lookup = asyncio.create_task(self.get_block_hash(block_number))
+            lookup.add_done_callback(partial(self._on_canonical_hash_done, block_number))
+            self._canonical_hashes[block_number] = (now, lookup)
+        else:
+            lookup = entry[1]
+        # Shielded so a cancelled caller does not cancel the lookup of the others.
+        return await asyncio.shield(lookup)
+
+    def _on_canonical_hash_done(self, block_number: BlockNumber, lookup: asyncio.Task[str]):
+        # A failed lookup is not shared with later callers.
+        if not lookup.cancelled() and lookup.exception() is None:
+            return
+        entry = self._canonical_hashes.get(block_number)
+        if entry is not None and entry[1] is lookup:
+            del self._canonical_hashes[block_number]
+
+    async def _is_canonical(self, block: CachedBlock) -> bool:
+        if await self.get_canonical_block_hash(block.number) != block.hash:
+            await self.block_cache.invalidate(block.chain_symbol, block.number, block.hash)
+            return False
+        return True
+
+    async def get_cached_block(self, block_number: BlockNumber) -> CachedBlock | None:
+        """Get the cached block at `block_number` if it is still canonical, no RPC is made if none is cached."""
+        block_hash = await self.block_cache.get_hash(self.chain.chain_symbol, block_number)
+        if block_hash is None:
+            return None
+        block = await self.block_cache.get(self.chain.chain_symbol, block_number, block_hash)
+        if block is None or not await self._is_canonical(block):
+            return None
+        return block
+
+    async def get_cached_transfers(self, tx_hash: TxHash) -> list[_TransferT] | None:
+        """Get the cached transfers of `tx_hash` if its block is still canonical."""
+        block = await self.block_cache.get_transaction_block(self.chain.chain_symbol, tx_hash)
+        if block is None or not await self._is_canonical(block):
+            return None
+        return [self.chain.transfer_class.model_validate(transfer) for transfer in block.transfers[tx_hash]]
@@ -1,14 +1,15 @@
+import asyncio
 import logging
 import os
 from functools import lru_cache
-from typing import override
+from typing import Any, Container, override
 
 from bitcoinutils.keys import PublicKey
 from pyfrost.btc_utils import taproot_tweak_pubkey
 from pyfrost.crypto_utils import code_to_pub, pub_compress
 
 from clients.abstract import ChainAsyncClient
-from clients.custom_types import BlockNumber, TxHash
+from clients.custom_types import BlockHeader, BlockNumber, TxHash
 
 from .custom_types import Address, BTCConfig, BTCTransfer
 from .rpc.ankr import BTCAnkrAsyncClient, Transaction
@@ -25,13 +26,23 @@ class BTCAsyncClient(ChainAsyncClient[BTCConfig, BTCAnkrAsyncClient, BTCTransfer
     def client(self) -> BTCAnkrAsyncClient:
         if self.btc is not None:
             return self.btc
-        self.btc = BTCAnkrAsyncClient(base_url=self.chain.private_rpc, indexer_url=self.chain.private_indexer_rpc)
+        self.btc = BTCAnkrAsyncClient(
+            base_url=self.chain.rpc_urls[0],
+            indexer_url=self.chain.private_indexer_rpc,
+            endpoint_pool=self.endpoint_pool,
+        )
         return self.btc
 
     @override
     async def get_transfer_by_tx_hash(self, tx_hash: TxHash) -> list[BTCTransfer]:
+        cached_transfers = await self.get_cached_transfers(tx_hash)
+        if cached_transfers is not None:
+            return cached_transfers
         tx = await self.client.get_tx_by_hash(tx_hash)
-        return self._parse_transfer(tx)
+        transfers = self._parse_transfer(tx)
+        if tx.blockHash is not None and tx.blockHeight >= 0:
+            await self.cache_block_transfers(tx.blockHeight, tx.blockHash, transfers)
+        return transfers
 
     @override
     async def get_finalized_block_number(self) -> BlockNumber:
@@ -51,33 +62,60 @@ class BTCAsyncClient(ChainAsyncClient[BTCConfig, BTCAnkrAsyncClient, BTCTransfer
 
     @override
     async def get_block_tx_hash(self, block_number: BlockNumber, **kwargs) -> list[TxHash]:
-        block = await self.client.get_block_by_identifier(block_number)
-        return [tx.txid for tx in block.txs]  # type: ignore
+        cached_block = await self.get_cached_block(block_number)
+        if cached_block is not None and cached_block.tx_hashes is not None:
+            return cached_block.tx_hashes
+        block = await self.client.get_raw_block_by_identifier(block_number)
+        return [tx["txid"] for tx in block["txs"]]
 
     @override
     async def get_latest_block_number(self) -> BlockNumber:
         return await self.client.get_latest_block_number()
 
+    @override
+    async def get_block_header(self, block_number: BlockNumber) -> BlockHeader:
+        block_hash = await self.get_block_hash(block_number)
+        header = await self.client.get_block_header(block_hash)
+        return BlockHeader(number=block_number, hash=block_hash, parent_hash=header["previousblockhash"])
+
+    @override
+    async def get_block_hash(self, block_number: BlockNumber) -> str:
+        return await self.client.get_block_hash(block_number)
+
     @override
     async def extract_transfer_from_block(
         self,
         block_number: BlockNumber,
+        accepted_addresses: Container[Address] | None = None,
         **kwargs,
     ) -> list[BTCTransfer]:
+        """Extract the transfers of a block, only to `accepted_addresses` when given.
+
+        The raw block is scanned without validating it into models, and `BTCTransfer`s are only
+        built for the matching outputs.
+        """
         self.logger.debug(f"Observing block number {block_number} start")
-        block = await self.client.get_block_by_identifier(block_number)
-        result = []
-        for tx in block.txs:  # type: ignore
-            # TODO: The time complexity is O(n^2); we should improve it.
-            # Be careful, as this function is CPU-bound.
-            # so if concurrency is the answer, we should use multi-processing.
-            transfer = self._parse_transfer(tx)
-            if transfer:
-                result.extend(transfer)
+        block = await self.client.get_raw_block_by_identifier(block_number)
+        tx_hashes, outputs = await asyncio.to_thread(filter_block_outputs, block, accepted_addresses)
+        result = [
+            BTCTransfer(
+                tx_hash=tx_hash,
+                block_number=block_number,
+                chain_symbol=self.chain.chain_symbol,
+                to=address,
+                value=value,
+                token="0x0000000000000000000000000000000000000000",
+                index=index,
+                # Transactions included in a block are confirmed, there is no receipt to check.
+                is_successful=True,
+            )
+            for tx_hash, index, address, value in outputs
+        ]
+        await self.cache_block_transfers(block_number, block["hash"], result, tx_hashes=tx_hashes)
         self.logger.debug(f"Observing block number {block_number} end")
         return result
 
-    def _parse_transfer(self, tx: Transaction) -> list[BTCTransfer]:
+    def _parse_transfer(self, tx: Transaction, is_successful: bool | None = None) -> list[BTCTransfer]:
         transfers = []
         for output in tx.vout:
             if output.isAddress:
@@ -90,21 +128,49 @@ class BTCAsyncClient(ChainAsyncClient[BTCConfig, BTCAnkrAsyncClient, BTCTransfer
                         value=output.value,
                         token="0x0000000000000000000000000000000000000000",
                         index=output.n,
+                        is_successful=is_successful,
                     )
                 )
         return transfers
 
 
+def filter_block_outputs(
+    block: dict[str, Any],
+    accepted_addresses: Container[Address] | None = None,
+) -> tuple[list[TxHash], list[tuple[TxHash, int, Address, int]]]:
+    """Scan a raw Blockbook block for outputs paying a single address, only `accepted_addresses` when given.
+
+    Return the hashes of all the transactions, and `(tx_hash, index, address, value)` of the matching outputs.
+    """
+    tx_hashes = []
+    outputs = []
+    for tx in block.get("txs") or ():
+        tx_hash = tx["txid"]
+        tx_hashes.append(tx_hash)
+        for output in tx["vout"]:
+            if not output.get("isAddress"):
+                continue
+            address = output["addresses"][0]
+            if accepted_addresses is None or address in accepted_addresses:
+                outputs.append((tx_hash, output["n"], address, int(output["value"])))
+    return tx_hashes, outputs
+
+
 @lru_cache
 def get_btc_async_client(chain: BTCConfig, logger: logging.Logger | logging.LoggerAdapter) -> BTCAsyncClient:
     client = BTCAsyncClient(chain, logger)
     return client
 
 
-def compute_btc_address(salt: int) -> Address:
+@lru_cache
+def _get_btc_group_public_key():
     btc_group_key_pub = int(os.environ["BTC_GROUP_KEY_PUB"])
     public_key = code_to_pub(btc_group_key_pub)
-    public_key = pub_compress(public_key=public_key)
+    return pub_compress(public_key=public_key)
+
+
+def compute_btc_address(salt: int) -> Address:
+    public_key = _get_btc_group_public_key()
     taproot_public_key, _ = taproot_tweak_pubkey(public_key, salt.to_bytes(8, byteorder="big"))
     x_hex = hex(taproot_public_key.x)[2:].zfill(64)
     y_hex = hex(taproot_public_key.y)[2:].zfill(64)
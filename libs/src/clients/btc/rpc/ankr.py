@@ -1,3 +1,6 @@
+import asyncio
+import itertools
+import json
 from decimal import Decimal
 from typing import Any
 
@@ -12,6 +15,8 @@ from clients.btc.exceptions import (
 )
 from clients.btc.rpc.data_models import AddressDetails, Block, Transaction, Unspent
 from clients.custom_types import URL, BlockNumber, TxHash
+from clients.endpoint_pool import EndpointPool
+from clients.http import get_http_client
 
 
 class BTCAnkrAsyncClient:
@@ -19,16 +24,20 @@ class BTCAnkrAsyncClient:
         self,
         base_url: URL,
         indexer_url: URL,
+        endpoint_pool: EndpointPool | None = None,
+        max_page_concurrency: int = 10,
     ):
         self.base_url = base_url
         self.block_book_base_url = indexer_url
-        self._client = httpx.AsyncClient()
+        # Routes the JSON-RPC calls of `base_url` across several nodes, the indexer is not pooled.
+        self.endpoint_pool = endpoint_pool
+        if endpoint_pool is not None:
+            endpoint_pool.watch_heads(self.get_endpoint_latest_block_number)
+        self.max_page_concurrency = max_page_concurrency
 
     @property
-    def client(self):
-        if self._client.is_closed:
-            self._client = httpx.AsyncClient()
-        return self._client
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client()
 
     async def _request(
         self,
@@ -38,6 +47,7 @@ class BTCAnkrAsyncClient:
         params: dict[str, Any] | None = None,
         data: Any = None,
         json_data: Any = None,  # Add json_data parameter
+        decode_in_thread: bool = False,
     ) -> dict[str, Any]:
         try:
             # Choose between data and json based on the request
@@ -46,7 +56,6 @@ class BTCAnkrAsyncClient:
                 "url": url,
                 "headers": headers,
                 "params": params,
-                "timeout": 15,
             }
             if json_data is not None:
                 request_kwargs["json"] = json_data
@@ -55,7 +64,11 @@ class BTCAnkrAsyncClient:
 
             response = await self.client.request(**request_kwargs)
             response.raise_for_status()
-            resp = response.json()
+            if decode_in_thread:
+                # Block pages are large, decoding them would block the event loop.
+                resp = await asyncio.to_thread(json.loads, response.content)
+            else:
+                resp = response.json()
 
             if isinstance(resp, dict) and resp.get("error"):
                 raise BTCRequestError(f"Ankr error occurred: {resp.get('error')}")
@@ -79,6 +92,19 @@ class BTCAnkrAsyncClient:
             # Raised if response.json() fails
             raise BTCResponseError(f"Failed to parse JSON response: {json_err}") from json_err
 
+    async def _rpc(self, method: str, params: list[Any], url: URL | None = None) -> dict[str, Any]:
+        data = {"id": "test", "method": method, "params": params}
+        headers = {
+            "Content-Type": "application/json",
+        }
+        if url is not None or self.endpoint_pool is None:
+            return await self._request("POST", url or self.base_url, headers=headers, json_data=data)
+        # Every call made here is a read, so it is safe to hedge.
+        return await self.endpoint_pool.request(
+            lambda endpoint_url: self._request("POST", endpoint_url, headers=headers, json_data=data),
+            hedge=True,
+        )
+
     async def get_tx_by_hash(self, tx_hash: TxHash) -> Transaction:
         url = f"{self.block_book_base_url}/api/v2/tx/{tx_hash}"
         data = await self._request("GET", url)
@@ -97,24 +123,28 @@ class BTCAnkrAsyncClient:
         return [Unspent.model_validate(i) for i in data]
 
     async def get_block_by_identifier(self, identifier: str | int) -> Block:
-        page = 1
-        all_txs = []  # List to store all transactions across pages
-        while True:
-            url = f"{self.block_book_base_url}/api/v2/block/{identifier}"
-            params = {"page": page}
-            response = await self._request("GET", url, params=params)
-            data = response
-            txs = response.get("txs", [])
-            all_txs.extend(txs)  # Add the current page's txs to the overall list
-
-            total_pages = response.get("totalPages", 1)
-            if page >= total_pages:
-                break  # Exit the loop if we've reached the last page
-
-            page += 1  # Move to the next page
-        data["txs"] = all_txs
+        data = await self.get_raw_block_by_identifier(identifier)
         return Block.model_validate(data)
 
+    async def get_raw_block_by_identifier(self, identifier: str | int) -> dict[str, Any]:
+        """Get a block with the transactions of all its pages, as returned by Blockbook.
+
+        The first page tells the number of pages, the others are fetched concurrently, at most
+        `max_page_concurrency` at a time, and their transactions are appended in page order.
+        """
+        url = f"{self.block_book_base_url}/api/v2/block/{identifier}"
+        data = await self._request("GET", url, params={"page": 1}, decode_in_thread=True)
+        semaphore = asyncio.Semaphore(self.max_page_concurrency)
+
+        async def get_page(page: int) -> list[dict[str, Any]]:
+            async with semaphore:
+                response = await self._request("GET", url, params={"page": page}, decode_in_thread=True)
+            return response.get("txs", [])
+
+        pages = await asyncio.gather(*[get_page(page) for page in range(2, data.get("totalPages", 1) + 1)])
+        data["txs"] = list(itertools.chain(data.get("txs", []), *pages))
+        return data
+
     async def send_tx(self, hex_tx_data: str) -> str | None:
         url = f"{self.block_book_base_url}/api/v2/sendtx/{hex_tx_data}"
         resp = await self._request("GET", url)
@@ -125,21 +155,25 @@ class BTCAnkrAsyncClient:
         return await self.get_block_by_identifier(number)
 
     async def get_latest_block_number(self) -> BlockNumber:
-        url = f"{self.base_url}"
-        data = {"id": "test", "method": "getblockchaininfo", "params": []}
-        headers = {
-            "Content-Type": "application/json",
-        }
-        resp = await self._request("POST", url, headers=headers, json_data=data)
+        if self.endpoint_pool is not None and len(self.endpoint_pool.endpoints) > 1:
+            # Probing every endpoint is also how lagging endpoints are found.
+            return await self.endpoint_pool.refresh_heads(self.get_endpoint_latest_block_number)
+        return await self.get_endpoint_latest_block_number()
+
+    async def get_endpoint_latest_block_number(self, url: URL | None = None) -> BlockNumber:
+        resp = await self._rpc("getblockchaininfo", [], url=url)
         return resp["result"]["blocks"]  # type: ignore
 
+    async def get_block_hash(self, block_number: BlockNumber) -> str:
+        resp = await self._rpc("getblockhash", [block_number])
+        return resp["result"]  # type: ignore
+
+    async def get_block_header(self, block_hash: str) -> dict[str, Any]:
+        resp = await self._rpc("getblockheader", [block_hash])
+        return resp["result"]  # type: ignore
+
     async def get_fee_per_byte(self) -> int | Decimal:
-        url = f"{self.base_url}"
-        data = {"id": "test", "method": "estimatesmartfee", "params": [6]}
-        headers = {
-            "Content-Type": "application/json",
-        }
-        resp = await self._request("POST", url, headers=headers, json_data=data)
+        resp = await self._rpc("estimatesmartfee", [6])
         fee_rate = resp and resp["result"] and Decimal(resp["result"]["feerate"]) * (10 ^ 8)
         if isinstance(fee_rate, Decimal):
             return fee_rate
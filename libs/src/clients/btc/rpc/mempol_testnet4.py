@@ -1,3 +1,5 @@
+import asyncio
+import itertools
 from typing import Any
 
 import httpx
@@ -17,19 +19,25 @@ from clients.btc.rpc.data_models import (
     Vout,
 )
 from clients.custom_types import BlockNumber
+from clients.http import get_http_client
+
+TXS_SLICE_SIZE = 25
 
 
 class BTCMempoolAsyncClient:
-    def __init__(self, base_url: str = "https://mempool.space/testnet4/api", timeout: int = 15):
+    def __init__(
+        self,
+        base_url: str = "https://mempool.space/testnet4/api",
+        timeout: int = 15,
+        max_page_concurrency: int = 10,
+    ):
         self.base_url = base_url
-        self._client = httpx.AsyncClient()
         self.time_out = timeout
+        self.max_page_concurrency = max_page_concurrency
 
     @property
-    def client(self):
-        if self._client.is_closed:
-            self._client = httpx.AsyncClient()
-        return self._client
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client()
 
     async def _request(
         self,
@@ -67,13 +75,15 @@ class BTCMempoolAsyncClient:
     async def get_block_by_id(self, block_id: str) -> Block:
         url = f"{self.base_url}/block/{block_id}"
         block: dict = await self._request("GET", url)  # type: ignore
-        txs = []
-        slice = 25
-        for i in range(0, int(block["tx_count"] // slice) + 1):
-            url = f"{self.base_url}/block/{block_id}/txs/{i * slice}"
-            data = await self._request("GET", url)
-            txs.append(data)
-        block["txs"] = txs
+        semaphore = asyncio.Semaphore(self.max_page_concurrency)
+
+        async def get_slice(start_index: int) -> list[dict]:
+            async with semaphore:
+                return await self._request("GET", f"{self.base_url}/block/{block_id}/txs/{start_index}")  # type: ignore
+
+        # The API returns the transactions of a block in slices of `TXS_SLICE_SIZE`.
+        slices = await asyncio.gather(*[get_slice(i) for i in range(0, block["tx_count"], TXS_SLICE_SIZE)])
+        block["txs"] = list(itertools.chain.from_iterable(slices))
         return self.populate_block(block)
 
     async def get_block_by_number(self, number: int) -> Block:
@@ -168,7 +178,7 @@ class BTCMempoolAsyncClient:
 
     def populate_block(self, data: dict) -> Block:
         txs = []
-        for tx in data["txs"][0]:
+        for tx in data["txs"]:
             txs.append(self.populate_transaction(tx))
 
         return Block(
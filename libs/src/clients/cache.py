@@ -0,0 +1,182 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from pydantic import BaseModel, Field
+
+from clients.custom_types import BlockNumber, Transfer, TxHash
+
+
+class CachedBlock(BaseModel):
+    chain_symbol: str
+    number: BlockNumber
+    hash: str
+    # Hashes of every transaction of the block, `None` when only some transactions were seen.
+    tx_hashes: list[TxHash] | None = None
+    transfers: dict[TxHash, list[dict[str, Any]]] = Field(default_factory=dict)
+
+    def merge(self, other: "CachedBlock") -> "CachedBlock":
+        return self.model_copy(
+            update={
+                "tx_hashes": other.tx_hashes if other.tx_hashes is not None else self.tx_hashes,
+                "transfers": {**self.transfers, **other.transfers},
+            }
+        )
+
+
+def dump_transfer(transfer: Transfer) -> dict[str, Any]:
+    # `is_successful` is excluded from dumps, but is worth keeping in the cache.
+    return {**transfer.model_dump(mode="json"), "is_successful": transfer.is_successful}
+
+
+class BlockCacheBackend(Protocol):
+    """Optional second tier of `BlockCache`, e.g. shared by the processes of a host."""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class BlockCache:
+    """Cache of blocks and transfers keyed by `(chain_symbol, block_number, block_hash)`.
+
+    Entries live in a size-bounded in-memory LRU and, when configured, in a `backend` as JSON.
+    Readers must know the hash of the canonical block to get an entry, and storing a block with
+    a new hash for a known height drops the old entry, so reorged blocks are never served.
+    """
+
+    def __init__(self, max_size: int = 2048, backend: BlockCacheBackend | None = None):
+        self.max_size = max_size
+        self.backend = backend
+        self._blocks: OrderedDict[tuple[str, BlockNumber, str], CachedBlock] = OrderedDict()
+        self._hashes: dict[tuple[str, BlockNumber], str] = {}
+        self._tx_blocks: dict[tuple[str, TxHash], tuple[BlockNumber, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._blocks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    @staticmethod
+    def _block_key(chain_symbol: str, number: BlockNumber, block_hash: str | None = None) -> str:
+        if block_hash is None:
+            return f"block:{chain_symbol}:{number}"
+        return f"block:{chain_symbol}:{number}:{block_hash}"
+
+    @staticmethod
+    def _tx_key(chain_symbol: str, tx_hash: TxHash) -> str:
+        return f"tx:{chain_symbol}:{tx_hash}"
+
+    async def get(self, chain_symbol: str, number: BlockNumber, block_hash: str) -> CachedBlock | None:
+        block = self._blocks.get((chain_symbol, number, block_hash))
+        if block is not None:
+            self._blocks.move_to_end((chain_symbol, number, block_hash))
+        elif self.backend is not None:
+            raw = await self.backend.get(self._block_key(chain_symbol, number, block_hash))
+            if raw is not None:
+                block = CachedBlock.model_validate_json(raw)
+                self._remember(block)
+        if block is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return block
+
+    async def get_transaction_block(self, chain_symbol: str, tx_hash: TxHash) -> CachedBlock | None:
+        """Get the cached block holding the transfers of `tx_hash`, without checking it is canonical."""
+        location = self._tx_blocks.get((chain_symbol, tx_hash))
+        if location is None and self.backend is not None:
+            raw = await self.backend.get(self._tx_key(chain_symbol, tx_hash))
+            if raw is not None:
+                number, block_hash = json.loads(raw)
+                location = (number, block_hash)
+        if location is None:
+            self.misses += 1
+            return None
+        block = await self.get(chain_symbol, *location)
+        if block is None or tx_hash not in block.transfers:
+            return None
+        return block
+
+    async def get_hash(self, chain_symbol: str, number: BlockNumber) -> str | None:
+        """Get the hash of the block cached at `number`, without checking it is canonical."""
+        block_hash = self._hashes.get((chain_symbol, number))
+        if block_hash is None and self.backend is not None:
+            block_hash = await self.backend.get(self._block_key(chain_symbol, number))
+        return block_hash
+
+    async def put(self, block: CachedBlock):
+        old_hash = await self.get_hash(block.chain_symbol, block.number)
+        if old_hash is not None and old_hash != block.hash:
+            await self.invalidate(block.chain_symbol, block.number, old_hash)
+        elif (old_block := await self._get_quietly(block.chain_symbol, block.number, block.hash)) is not None:
+            block = old_block.merge(block)
+        self._remember(block)
+        if self.backend is not None:
+            location = json.dumps([block.number, block.hash])
+            await asyncio.gather(
+                self.backend.set(self._block_key(block.chain_symbol, block.number), block.hash),
+                self.backend.set(
+                    self._block_key(block.chain_symbol, block.number, block.hash), block.model_dump_json()
+                ),
+                *[self.backend.set(self._tx_key(block.chain_symbol, tx_hash), location) for tx_hash in block.transfers],
+            )
+
+    async def invalidate(self, chain_symbol: str, number: BlockNumber, block_hash: str):
+        self.invalidations += 1
+        self._forget((chain_symbol, number, block_hash))
+        if self.backend is not None:
+            await self.backend.delete(self._block_key(chain_symbol, number, block_hash))
+
+    async def _get_quietly(self, chain_symbol: str, number: BlockNumber, block_hash: str) -> CachedBlock | None:
+        block = self._blocks.get((chain_symbol, number, block_hash))
+        if block is None and self.backend is not None:
+            raw = await self.backend.get(self._block_key(chain_symbol, number, block_hash))
+            if raw is not None:
+                block = CachedBlock.model_validate_json(raw)
+        return block
+
+    def _remember(self, block: CachedBlock):
+        key = (block.chain_symbol, block.number, block.hash)
+        self._blocks[key] = block
+        self._blocks.move_to_end(key)
+        self._hashes[(block.chain_symbol, block.number)] = block.hash
+        for tx_hash in block.transfers:
+            self._tx_blocks[(block.chain_symbol, tx_hash)] = (block.number, block.hash)
+        while len(self._blocks) > self.max_size:
+            self._forget(next(iter(self._blocks)))
+
+    def _forget(self, key: tuple[str, BlockNumber, str]):
+        block = self._blocks.pop(key, None)
+        chain_symbol, number, block_hash = key
+        if self._hashes.get((chain_symbol, number)) == block_hash:
+            del self._hashes[(chain_symbol, number)]
+        if block is None:
+            return
+        for tx_hash in block.transfers:
+            if self._tx_blocks.get((chain_symbol, tx_hash)) == (number, block_hash):
+                del self._tx_blocks[(chain_symbol, tx_hash)]
+
+
+_block_cache = BlockCache()
+
+
+def get_block_cache() -> BlockCache:
+    return _block_cache
+
+
+def configure_block_cache(*, max_size: int | None = None, backend: BlockCacheBackend | None = None):
+    """Configure the process-wide block cache used by every `ChainAsyncClient`."""
+    if max_size is not None:
+        _block_cache.max_size = max_size
+    if backend is not None:
+        _block_cache.backend = backend
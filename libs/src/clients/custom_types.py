@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 from enum import StrEnum
 from typing import Annotated, Any, Awaitable, Callable, Hashable
 
-from pydantic import BaseModel, ConfigDict, Field, PlainSerializer
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, field_validator
 
 type TxHash = str
 type BlockNumber = int
@@ -26,6 +26,9 @@ class Transfer[_AddressT](BaseModel, ABC):
     token: _AddressT
     to: _AddressT
     block_number: BlockNumber
+    # Set by clients that already know the transaction outcome while extracting the transfer,
+    # `None` means it must still be checked with `is_transaction_successful`.
+    is_successful: bool | None = Field(default=None, exclude=True)
 
     @abstractmethod
     def __eq__(self, value: Any) -> bool: ...
@@ -34,6 +37,12 @@ class Transfer[_AddressT](BaseModel, ABC):
     def __gt__(self, value: Any) -> bool: ...
 
 
+class BlockHeader(BaseModel):
+    number: BlockNumber
+    hash: str
+    parent_hash: str
+
+
 class WithdrawStatus(StrEnum):
     PENDING = "pending"
     PROCESSING = "processing"
@@ -55,11 +64,36 @@ class ChainConfig[_TransferT: Transfer, _WithdrawT: WithdrawRequest](BaseModel,
     model_config = ConfigDict(frozen=True)
 
     vault_address: Address
-    private_rpc: URL
+    # One endpoint, or several equivalent ones (also as a comma-separated string) routed through an `EndpointPool`.
+    private_rpc: URL | tuple[URL, ...]
     chain_symbol: str
     finalize_block_count: int | None = Field(default=15)
     delay: int | float = Field(default=3)
     batch_block_size: int = Field(default=5)
+    max_block_fetch_concurrency: int = Field(default=20)
+    # Blocks scanned by one iteration of the observer.
+    max_scan_blocks: int = Field(default=100)
     transfer_class: type[_TransferT]
     withdraw_request_type: type[_WithdrawT]
     deposit_finalizer_middleware: tuple[Callable[..., Awaitable[Any]], ...] | None = None  # Supports async functions
+    # Reads the best endpoint has not answered after this many seconds also go to the next one, `None` disables it.
+    rpc_hedge_delay: float | None = Field(default=0.5)
+    # Endpoints more than this many blocks behind the highest head are not used until they catch up.
+    rpc_max_head_lag: int = Field(default=5)
+    # Seconds between the background refreshes of the endpoint heads, which find the lagging endpoints.
+    rpc_head_refresh_interval: float = Field(default=10)
+
+    @field_validator("private_rpc", mode="before")
+    @classmethod
+    def split_private_rpc(cls, value: Any) -> Any:
+        if isinstance(value, str) and "," in value:
+            return tuple(url.strip() for url in value.split(",") if url.strip())
+        if isinstance(value, list):
+            return tuple(value)
+        return value
+
+    @property
+    def rpc_urls(self) -> tuple[URL, ...]:
+        if isinstance(self.private_rpc, tuple):
+            return self.private_rpc
+        return (self.private_rpc,)
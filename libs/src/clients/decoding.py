@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+
+class DecodingScheduler:
+    """Run CPU-bound decoding jobs in an executor, sharing the workers fairly between chains.
+
+    Each chain has its own queue of jobs and at most `max_workers` jobs run at a time; free
+    workers take the next job of each chain with pending jobs in turn, so a chain catching up
+    on thousands of blocks cannot delay the blocks of the other chains. With `max_workers` of
+    zero jobs run inline, on the event loop.
+    """
+
+    def __init__(self, max_workers: int = 0, executor: Executor | None = None):
+        self.max_workers = max_workers
+        self.executor = executor or _create_executor(max_workers, use_processes=False)
+        self._queues: dict[str, deque[tuple[Callable[..., Any], tuple, asyncio.Future]]] = {}
+        self._turns: deque[str] = deque()
+        self._in_flight = 0
+
+    def pending(self) -> dict[str, int]:
+        return {chain_symbol: len(queue) for chain_symbol, queue in self._queues.items() if len(queue) > 0}
+
+    async def submit[T](self, chain_symbol: str, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn(*args)` in the executor, `fn`, `args` and the result must be picklable with a process pool."""
+        if self.max_workers <= 0:
+            return fn(*args)
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(chain_symbol, deque())
+        if len(queue) == 0:
+            self._turns.append(chain_symbol)
+        queue.append((fn, args, future))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self._in_flight < self.max_workers and len(self._turns) > 0:
+            chain_symbol = self._turns.popleft()
+            queue = self._queues[chain_symbol]
+            fn, args, future = queue.popleft()
+            if len(queue) > 0:
+                self._turns.append(chain_symbol)
+            if future.done():
+                # Cancelled while queued.
+                continue
+            self._in_flight += 1
+            job = loop.run_in_executor(self.executor, fn, *args)
+            job.add_done_callback(lambda job, future=future: self._on_done(job, future))
+
+    def _on_done(self, job: asyncio.Future, future: asyncio.Future):
+        self._in_flight -= 1
+        if not future.done():
+            if job.cancelled():
+                future.cancel()
+            elif (error := job.exception()) is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(job.result())
+        self._dispatch()
+
+
+def _create_executor(max_workers: int, *, use_processes: bool) -> Executor | None:
+    if max_workers <= 0:
+        return None
+    if use_processes:
+        # `spawn` since forking a process with running threads (e.g. the validator) is unsafe.
+        return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers, thread_name_prefix="decoding")
+
+
+_max_workers = 0
+_executor: Executor | None = None
+# The queues and futures of a scheduler belong to the event loop its jobs were submitted from,
+# the executor is shared by the schedulers of every loop.
+_schedulers: WeakKeyDictionary[asyncio.AbstractEventLoop, DecodingScheduler] = WeakKeyDictionary()
+
+
+def configure_decoding_scheduler(*, max_workers: int, use_processes: bool = False):
+    """Configure the schedulers returned by `get_decoding_scheduler`, zero workers decodes inline."""
+    global _max_workers, _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _max_workers = max_workers
+    _executor = _create_executor(max_workers, use_processes=use_processes)
+    _schedulers.clear()
+
+
+def get_decoding_scheduler() -> DecodingScheduler:
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = DecodingScheduler(_max_workers, _executor)
+        _schedulers[loop] = scheduler
+    return scheduler
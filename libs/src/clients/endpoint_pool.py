@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Sequence
+
+from .custom_types import URL, BlockNumber
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """Health of a single RPC endpoint, as seen by the `EndpointPool` that routes to it."""
+
+    def __init__(self, url: URL, initial_latency: float = 0.5):
+        self.url = url
+        self.latency = initial_latency
+        self.error_rate = 0.0
+        self.head: BlockNumber | None = None
+        self.lagging = False
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def score(self) -> float:
+        # Lower is better: a slow endpoint and an endpoint failing half of its calls are equally bad.
+        return self.latency * (1 + 10 * self.error_rate)
+
+    def stats(self) -> dict[str, float | int | bool | None]:
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "head": self.head,
+            "lagging": self.lagging,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class EndpointPool:
+    """Route requests to the best of several RPC endpoints serving the same chain.
+
+    Endpoints are ranked by an EWMA of their latency weighted by an EWMA of their error rate.
+    A failed request is retried on the next endpoint, and a read that the best endpoint has not
+    answered within `hedge_delay` (or twice its usual latency, if larger) is also sent to the
+    second best, the first answer wins. Endpoints whose head is more than `max_head_lag` blocks
+    behind the highest known head get no requests, failovers or hedges until a head refresh shows
+    they caught up, unless every endpoint is lagging. Heads are refreshed by `refresh_heads`, and
+    in the background every `head_refresh_interval` seconds once `watch_heads` was called.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[URL],
+        *,
+        ewma_alpha: float = 0.2,
+        hedge_delay: float | None = 0.5,
+        max_head_lag: int = 5,
+        head_refresh_interval: float = 10,
+    ):
+        if len(urls) == 0:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.ewma_alpha = ewma_alpha
+        self.hedge_delay = hedge_delay
+        self.max_head_lag = max_head_lag
+        self.head_refresh_interval = head_refresh_interval
+        self._fetch_head: Callable[[URL], Awaitable[BlockNumber]] | None = None
+        self._heads_refreshed_at: float | None = None
+        self._head_refresh: asyncio.Future | None = None
+
+    def stats(self) -> dict[URL, dict[str, float | int | bool | None]]:
+        return {endpoint.url: endpoint.stats() for endpoint in self.endpoints}
+
+    def ranked(self) -> list[Endpoint]:
+        """Endpoints from best to worst, lagging endpoints last."""
+        return sorted(self.endpoints, key=lambda endpoint: (endpoint.lagging, endpoint.score))
+
+    def in_use(self) -> list[Endpoint]:
+        """Endpoints requests are routed to from best to worst: those not lagging, or all if every one is."""
+        ranked = self.ranked()
+        synced = [endpoint for endpoint in ranked if not endpoint.lagging]
+        return synced if len(synced) > 0 else ranked
+
+    def watch_heads(self, fetch_head: Callable[[URL], Awaitable[BlockNumber]]):
+        """Refresh the heads with `fetch_head` in the background of requests, every `head_refresh_interval` seconds.
+
+        Lagging endpoints are found, and found to have caught up, even if nobody asks for the latest block.
+        """
+        self._fetch_head = fetch_head
+
+    def _refresh_heads_if_stale(self):
+        if self._fetch_head is None or len(self.endpoints) == 1:
+            return
+        if self._head_refresh is not None and not self._head_refresh.done():
+            return
+        if self._heads_refreshed_at is not None:
+            if time.monotonic() - self._heads_refreshed_at < self.head_refresh_interval:
+                return
+        self._head_refresh = asyncio.ensure_future(self.refresh_heads(self._fetch_head))
+        self._head_refresh.add_done_callback(self._on_head_refresh_done)
+
+    @staticmethod
+    def _on_head_refresh_done(future: asyncio.Future):
+        # Nobody awaits a background refresh, the next one is tried after `head_refresh_interval`.
+        if not future.cancelled() and (error := future.exception()) is not None:
+            logger.warning(f"Refreshing endpoint heads failed: {error!r}")
+
+    def _record(self, endpoint: Endpoint, latency: float | None):
+        endpoint.requests += 1
+        failed = latency is None
+        if failed:
+            endpoint.errors += 1
+        else:
+            endpoint.latency += self.ewma_alpha * (latency - endpoint.latency)
+        endpoint.error_rate += self.ewma_alpha * (float(failed) - endpoint.error_rate)
+
+    async def _call[T](self, endpoint: Endpoint, fn: Callable[[URL], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        try:
+            result = await fn(endpoint.url)
+        except Exception:
+            self._record(endpoint, None)
+            raise
+        self._record(endpoint, time.monotonic() - start)
+        return result
+
+    async def request[T](self, fn: Callable[[URL], Awaitable[T]], *, hedge: bool = False) -> T:
+        """Call `fn(url)` on the best endpoint, failing over to the next ones on errors.
+
+        Only idempotent calls (reads) should be hedged, a hedged call may run on two endpoints.
+        """
+        self._refresh_heads_if_stale()
+        endpoints = self.in_use()
+        error: Exception | None = None
+        while len(endpoints) > 0:
+            endpoint = endpoints.pop(0)
+            try:
+                if hedge and self.hedge_delay is not None and len(endpoints) > 0:
+                    return await self._hedged_call(endpoint, endpoints, fn)
+                return await self._call(endpoint, fn)
+            except Exception as e:
+                error = e
+        assert error is not None
+        raise error
+
+    async def _hedged_call[T](
+        self, primary: Endpoint, fallbacks: list[Endpoint], fn: Callable[[URL], Awaitable[T]]
+    ) -> T:
+        assert self.hedge_delay is not None
+        tasks = [asyncio.ensure_future(self._call(primary, fn))]
+        done, _ = await asyncio.wait(tasks, timeout=max(self.hedge_delay, 2 * primary.latency))
+        if len(done) == 0:
+            # The hedge is not retried if it fails, `fallbacks` is what is left for failover.
+            tasks.append(asyncio.ensure_future(self._call(fallbacks.pop(0), fn)))
+        error: BaseException | None = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception as e:
+                    error = e
+        finally:
+            for task in tasks:
+                task.cancel()
+        assert error is not None
+        raise error
+
+    async def refresh_heads(self, fetch_head: Callable[[URL], Awaitable[BlockNumber]]) -> BlockNumber:
+        """Fetch the head of every endpoint, mark the lagging ones and return the head they all reached.
+
+        The returned head is the lowest head of the endpoints in use, so any of them can serve it.
+        """
+        self._heads_refreshed_at = time.monotonic()
+        heads = await asyncio.gather(
+            *[self._call(endpoint, fetch_head) for endpoint in self.endpoints], return_exceptions=True
+        )
+        for endpoint, head in zip(self.endpoints, heads):
+            # An endpoint that cannot tell its head is not used until it can.
+            endpoint.head = None if isinstance(head, BaseException) else head
+        known_heads = [endpoint.head for endpoint in self.endpoints if endpoint.head is not None]
+        if len(known_heads) == 0:
+            raise next(head for head in heads if isinstance(head, BaseException))
+        tip = max(known_heads)
+        for endpoint in self.endpoints:
+            endpoint.lagging = endpoint.head is None or tip - endpoint.head > self.max_head_lag
+        return min(endpoint.head for endpoint in self.endpoints if endpoint.head is not None and not endpoint.lagging)
@@ -5,7 +5,7 @@ from .client import (
     get_evm_async_client,
     get_signed_data,
 )
-from .custom_types import EVMConfig, EVMTransfer
+from .custom_types import EVMConfig, EVMTransfer, EVMTransferExtractionMode
 
 __all__ = [
     "EVMAsyncClient",
@@ -15,4 +15,5 @@ __all__ = [
     "get_signed_data",
     "EVMConfig",
     "EVMTransfer",
+    "EVMTransferExtractionMode",
 ]
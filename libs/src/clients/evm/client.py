@@ -1,27 +1,38 @@
+import asyncio
 import logging
 import os
 from functools import lru_cache
-from typing import override
+from typing import Collection, Container, override
 
 import web3.exceptions
 from eth_account import Account
 from eth_account.messages import encode_defunct
 from eth_typing import HexStr
 from pydantic import ValidationError
-from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3 import AsyncWeb3, Web3
 from web3.middleware.geth_poa import async_geth_poa_middleware
-from web3.types import TxData
+from web3.types import FilterParams, LogReceipt, RPCEndpoint, TxData
 
 from clients.abstract import ChainAsyncClient
-from clients.custom_types import BlockNumber, TxHash
+from clients.custom_types import BlockHeader, BlockNumber, TxHash
+from clients.decoding import get_decoding_scheduler
 
 from .abi import ERC20_ABI
-from .custom_types import ChecksumAddress, EVMConfig, EVMTransfer
-from .exceptions import EVMBlockNotFound, EVMTransferNotFound, EVMTransferNotValid
+from .custom_types import ChecksumAddress, EVMConfig, EVMTransfer, EVMTransferExtractionMode
+from .exceptions import (
+    EVMBlockNotFound,
+    EVMClientError,
+    EVMTokenDecimalsNotFound,
+    EVMTransferNotFound,
+    EVMTransferNotValid,
+)
+from .provider import AsyncBatchHTTPProvider
 from .transfer_decoder import (
+    TRANSFER_EVENT_TOPIC,
     InvalidTxError,
-    NotRecognizedSolidityFuncError,
     decode_transfer_tx,
+    parse_block_transfers,
+    to_address_key,
 )
 
 
@@ -29,25 +40,60 @@ class EVMAsyncClient(ChainAsyncClient[EVMConfig, AsyncWeb3, EVMTransfer, Checksu
     def __init__(self, chain: EVMConfig, logger: logging.Logger | logging.LoggerAdapter):
         super().__init__(chain, logger)
         self._w3 = None
+        self._block_receipts_supported = True
+        self._header_by_number_supported = True
+        self._address_keys: tuple[int, int, frozenset[bytes]] | None = None
+        self.endpoint_pool.watch_heads(self._get_endpoint_block_number)
 
     @property
     @override
     def client(self) -> AsyncWeb3:
         if self._w3 is not None:
             return self._w3
-        w3 = AsyncWeb3(AsyncHTTPProvider(self.chain.private_rpc))
+        w3 = AsyncWeb3(
+            AsyncBatchHTTPProvider(
+                self.chain.rpc_urls[0],
+                batch_window=self.chain.rpc_batch_window,
+                max_batch_size=self.chain.rpc_max_batch_size,
+                endpoint_pool=self.endpoint_pool,
+            )
+        )
         if self.chain.poa:
             w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
         self._w3 = w3
         return self._w3
 
+    @property
+    def provider(self) -> AsyncBatchHTTPProvider:
+        return self.client.provider  # type: ignore
+
     @override
-    async def get_transfer_by_tx_hash(self, tx_hash: TxHash) -> EVMTransfer:
+    async def get_transfer_by_tx_hash(self, tx_hash: TxHash) -> list[EVMTransfer]:
+        # Filled by `extract_transfer_from_block`, along with the receipt status, and by earlier calls.
+        cached_transfers = await self.get_cached_transfers(tx_hash)
+        if cached_transfers is not None:
+            return cached_transfers
         try:
             tx = await self.client.eth.get_transaction(HexStr(tx_hash))
         except web3.exceptions.TransactionNotFound as e:
             raise EVMTransferNotFound(f"Transfer with tx_hash: {tx_hash} not found") from e
-        return self._parse_transfer(tx)
+        if self.chain.transfer_extraction_mode == EVMTransferExtractionMode.LOGS and tx["input"] not in (b"", "0x"):  # type: ignore
+            # Same rule as `extract_transfer_from_logs`: token transfers are read from the logs.
+            try:
+                receipt = await self.client.eth.get_transaction_receipt(HexStr(tx_hash))
+            except web3.exceptions.TransactionNotFound as e:
+                raise EVMTransferNotFound(f"Receipt of tx_hash: {tx_hash} not found") from e
+            transfers = []
+            for log in receipt["logs"]:
+                transfer = self._parse_transfer_log(log)
+                if transfer is not None:
+                    transfer.is_successful = receipt["status"] == 1
+                    transfers.append(transfer)
+        else:
+            transfers = [self._parse_transfer(tx)]
+        if tx.get("blockHash") is not None:
+            await self.cache_block_transfers(tx["blockNumber"], tx["blockHash"].hex(), transfers)  # type: ignore
+        return transfers
 
     @override
     async def get_finalized_block_number(self) -> BlockNumber:
@@ -75,7 +121,10 @@ class EVMAsyncClient(ChainAsyncClient[EVMConfig, AsyncWeb3, EVMTransfer, Checksu
         ]
 
         contract = self.client.eth.contract(address=token_address, abi=min_abi)
-        decimals = await contract.functions.decimals().call()
+        try:
+            decimals = await contract.functions.decimals().call()
+        except (web3.exceptions.BadFunctionCallOutput, web3.exceptions.ContractLogicError) as e:
+            raise EVMTokenDecimalsNotFound(f"Token {token_address} has no decimals, error: {e}") from e
         return decimals
 
     @override
@@ -87,39 +136,266 @@ class EVMAsyncClient(ChainAsyncClient[EVMConfig, AsyncWeb3, EVMTransfer, Checksu
             self.logger.error(f"TransactionNotFound: {e}")
         return False
 
+    async def get_block_receipts_status(
+        self,
+        block_number: BlockNumber,
+        txs_hash: list[TxHash],
+    ) -> dict[TxHash, bool]:
+        """Get the success status of transactions of a block with a single request.
+
+        Uses `eth_getBlockReceipts` when the node supports it, otherwise one JSON-RPC batch of
+        `eth_getTransactionReceipt` for `txs_hash`.
+        """
+        receipts_status = await self._get_block_receipts_status(block_number)
+        if receipts_status is None:
+            receipts_status = await self._get_transactions_receipt_status(txs_hash)
+        return receipts_status
+
+    async def _get_block_receipts_status(self, block_number: BlockNumber) -> dict[TxHash, bool] | None:
+        if not self._block_receipts_supported:
+            return None
+        try:
+            receipts = await self.client.manager.coro_request(
+                RPCEndpoint("eth_getBlockReceipts"),
+                [hex(block_number)],
+            )
+        except web3.exceptions.MethodUnavailable as e:
+            self.logger.warning(f"eth_getBlockReceipts is not supported, falling back to batch requests: {e}")
+            self._block_receipts_supported = False
+            return None
+        except ValueError as e:
+            self.logger.warning(f"eth_getBlockReceipts failed for block {block_number}: {e}")
+            return None
+        return self._parse_receipts_status(receipts)
+
+    async def _get_transactions_receipt_status(self, txs_hash: list[TxHash]) -> dict[TxHash, bool]:
+        if len(txs_hash) == 0:
+            return {}
+        responses = await self.provider.make_batch_request(
+            [(RPCEndpoint("eth_getTransactionReceipt"), [tx_hash]) for tx_hash in txs_hash]
+        )
+        return self._parse_receipts_status([response.get("result") for response in responses])
+
+    @staticmethod
+    def _parse_receipts_status(receipts) -> dict[TxHash, bool]:
+        result = {}
+        for receipt in receipts or []:
+            if not receipt:
+                continue
+            status = receipt["status"]
+            tx_hash = receipt["transactionHash"]
+            result[tx_hash if isinstance(tx_hash, str) else tx_hash.hex()] = (
+                int(status, 16) if isinstance(status, str) else status
+            ) == 1
+        return result
+
     @override
     async def get_block_tx_hash(self, block_number: BlockNumber, **kwargs) -> list[TxHash]:
+        cached_block = await self.get_cached_block(block_number)
+        if cached_block is not None and cached_block.tx_hashes is not None:
+            return cached_block.tx_hashes
         block = await self.client.eth.get_block(block_number)
         return [tx_hash.hex() for tx_hash in block.transactions]  # type: ignore
 
     async def get_latest_block_number(self) -> BlockNumber:
-        return await self.client.eth.get_block_number()
+        if len(self.endpoint_pool.endpoints) == 1:
+            return await self.client.eth.get_block_number()
+        # Probing every endpoint is also how lagging endpoints are found.
+        return await self.endpoint_pool.refresh_heads(self._get_endpoint_block_number)
+
+    async def _get_endpoint_block_number(self, endpoint_uri: str) -> BlockNumber:
+        response = await self.provider.make_request_to(endpoint_uri, RPCEndpoint("eth_blockNumber"), [])
+        if "error" in response:
+            raise EVMClientError(f"eth_blockNumber failed on {endpoint_uri}: {response['error']}")
+        return int(response["result"], 16)
+
+    @override
+    async def get_block_header(self, block_number: BlockNumber) -> BlockHeader:
+        header = await self._get_header_by_number(block_number)
+        if header is None:
+            # Without `eth_getHeaderByNumber` the block is needed, but at least without its transactions.
+            try:
+                header = await self.client.eth.get_block(block_number)
+            except web3.exceptions.BlockNotFound as e:
+                raise EVMBlockNotFound(f"Block not found: {block_number}, error: {e}") from e
+        block_hash, parent_hash = header["hash"], header["parentHash"]
+        return BlockHeader(
+            number=block_number,
+            hash=block_hash if isinstance(block_hash, str) else block_hash.hex(),
+            parent_hash=parent_hash if isinstance(parent_hash, str) else parent_hash.hex(),
+        )
+
+    async def _get_header_by_number(self, block_number: BlockNumber) -> dict | None:
+        if not self._header_by_number_supported:
+            return None
+        try:
+            header = await self.client.manager.coro_request(RPCEndpoint("eth_getHeaderByNumber"), [hex(block_number)])
+        except web3.exceptions.MethodUnavailable as e:
+            self.logger.warning(f"eth_getHeaderByNumber is not supported, falling back to eth_getBlockByNumber: {e}")
+            self._header_by_number_supported = False
+            return None
+        if header is None:
+            raise EVMBlockNotFound(f"Block not found: {block_number}")
+        return header
 
     @override
     async def extract_transfer_from_block(
         self,
         block_number: BlockNumber,
+        accepted_addresses: Collection[ChecksumAddress] | None = None,
         **kwargs,
     ) -> list[EVMTransfer]:
+        """Extract the native and ERC-20 transfers of a block, only to `accepted_addresses` when given."""
         self.logger.debug(f"Observing block number {block_number} start")
+        try:
+            block = await self.client.eth.get_block(block_number, full_transactions=True)
+        except web3.exceptions.BlockNotFound as e:
+            raise EVMBlockNotFound(f"Block not found: {block_number}, error: {e}") from e
+        transactions = [
+            (tx["hash"].hex(), tx["blockNumber"], tx.get("to"), tx["value"], bytes(tx["input"]))
+            for tx in block.transactions  # type: ignore
+        ]
+        result, invalid = [], []
+        if len(transactions) > 0:
+            # Filtering and decoding are CPU-bound, they run in the decoding workers shared fairly by all the chains.
+            result, invalid = await get_decoding_scheduler().submit(
+                self.chain.chain_symbol,
+                parse_block_transfers,
+                self.chain.chain_symbol,
+                transactions,
+                None if accepted_addresses is None else self._get_address_keys(accepted_addresses),
+            )
+        for error in invalid:
+            self.logger.error(f"EVMTransferNotValid, {error}")
+        if len(result) > 0:
+            # Most blocks have no transfer worth keeping, their receipts are not fetched at all.
+            receipts_status = await self.get_block_receipts_status(
+                block_number,
+                list(dict.fromkeys(transfer.tx_hash for transfer in result)),
+            )
+            for transfer in result:
+                transfer.is_successful = receipts_status.get(transfer.tx_hash)
+        await self.cache_block_transfers(
+            block_number,
+            block["hash"].hex(),  # type: ignore
+            result,
+            tx_hashes=[tx["hash"].hex() for tx in block.transactions],  # type: ignore
+        )
+        self.logger.debug(f"Observing block number {block_number} end")
+        return result
+
+    async def extract_transfer_from_logs(
+        self,
+        from_block: BlockNumber,
+        to_block: BlockNumber,
+        *,
+        accepted_addresses: Collection[ChecksumAddress],
+        **kwargs,
+    ) -> list[EVMTransfer]:
+        """Get the transfers to `accepted_addresses` in `[from_block, to_block]`.
+
+        ERC-20 transfers come from `eth_getLogs` queries on the `Transfer` topic, with the recipient
+        topic filtered by chunks of `logs_address_chunk_size` addresses, so transfers made through
+        contracts are found too. Block bodies are only scanned for native token transfers, but that
+        still fetches the full body of every block of the range.
+        """
+        self.logger.debug(f"Observing logs of blocks {from_block}-{to_block} start")
+        addresses = list(accepted_addresses)
+        if len(addresses) == 0:
+            return []
+        chunk_size = self.chain.logs_address_chunk_size
+        address_topics = [
+            [self._to_address_topic(address) for address in addresses[i : i + chunk_size]]
+            for i in range(0, len(addresses), chunk_size)
+        ]
+        logs_chunks, *native_transfers = await asyncio.gather(
+            asyncio.gather(
+                *[
+                    self.client.eth.get_logs(
+                        FilterParams(
+                            fromBlock=from_block,
+                            toBlock=to_block,
+                            topics=[TRANSFER_EVENT_TOPIC, None, topics],  # type: ignore
+                        )
+                    )
+                    for topics in address_topics
+                ]
+            ),
+            *[
+                self.extract_native_transfer_from_block(block_number, accepted_addresses=accepted_addresses)
+                for block_number in range(from_block, to_block + 1)
+            ],
+        )
+        result = [transfer for transfers in native_transfers for transfer in transfers]
+        logs = sorted(
+            (log for logs in logs_chunks for log in logs),
+            key=lambda log: (log["blockNumber"], log["logIndex"]),
+        )
+        for log in logs:
+            transfer = self._parse_transfer_log(log)
+            if transfer is not None:
+                # Reverted transactions do not emit logs.
+                transfer.is_successful = True
+                result.append(transfer)
+        result.sort(key=lambda transfer: transfer.block_number)
+        self.logger.debug(f"Observing logs of blocks {from_block}-{to_block} end")
+        return result
+
+    async def extract_native_transfer_from_block(
+        self,
+        block_number: BlockNumber,
+        *,
+        accepted_addresses: Container[ChecksumAddress],
+        **kwargs,
+    ) -> list[EVMTransfer]:
         try:
             block = await self.client.eth.get_block(block_number, full_transactions=True)
         except web3.exceptions.BlockNotFound as e:
             raise EVMBlockNotFound(f"Block not found: {block_number}, error: {e}") from e
         result = []
         for tx in block.transactions:  # type: ignore
+            if tx["input"] not in (b"", "0x") or tx["to"] not in accepted_addresses:  # type: ignore
+                continue
             try:
-                transfer = self._parse_transfer(tx)
-                if transfer is None:
-                    continue
-                result.append(transfer)
-            except NotRecognizedSolidityFuncError:
-                ...
+                result.append(self._parse_transfer(tx))
             except EVMTransferNotValid as e:
                 self.logger.exception(f"EVMTransferNotValid, {e}")
-        self.logger.debug(f"Observing block number {block_number} end")
+        receipts_status = await self._get_transactions_receipt_status([transfer.tx_hash for transfer in result])
+        for transfer in result:
+            transfer.is_successful = receipts_status.get(transfer.tx_hash)
         return result
 
+    def _get_address_keys(self, accepted_addresses: Collection[ChecksumAddress]) -> frozenset[bytes]:
+        # The observer passes the same, only growing, address index for every block: convert it once per change.
+        version = (id(accepted_addresses), len(accepted_addresses))
+        if self._address_keys is not None and self._address_keys[:2] == version:
+            return self._address_keys[2]
+        keys = frozenset(to_address_key(address) for address in accepted_addresses)
+        self._address_keys = (*version, keys)
+        return keys
+
+    @staticmethod
+    def _to_address_topic(address: ChecksumAddress) -> str:
+        return "0x" + address[2:].lower().rjust(64, "0")
+
+    def _parse_transfer_log(self, log: LogReceipt) -> EVMTransfer | None:
+        topics = log["topics"]
+        # ERC-721 shares the `Transfer` signature but indexes the token id as a fourth topic.
+        if log.get("removed") or len(topics) != 3 or topics[0].hex() != TRANSFER_EVENT_TOPIC:
+            return None
+        try:
+            return EVMTransfer(
+                tx_hash=log["transactionHash"].hex(),
+                block_number=log["blockNumber"],
+                chain_symbol=self.chain.chain_symbol,
+                to=Web3.to_checksum_address(topics[2][-20:]),
+                value=int.from_bytes(log["data"], "big"),
+                token=log["address"],
+                log_index=log["logIndex"],
+            )
+        except ValidationError as e:
+            raise EVMTransferNotValid(f"Transfer log {log} is not valid.") from e
+
     @staticmethod
     def to_checksum_address(address: str):
         return Web3.to_checksum_address(address)
@@ -159,15 +435,16 @@ def get_evm_async_client(chain: EVMConfig, logger: logging.Logger | logging.Logg
     return client
 
 
-def compute_create2_address(salt: int) -> ChecksumAddress:
+@lru_cache
+def _get_create2_constants() -> tuple[bytes, bytes]:
     deployer_address = EVMAsyncClient.to_checksum_address(os.environ["USER_DEPOSIT_FACTORY_ADDRESS"])
     bytecode_hash = HexStr(os.environ["USER_DEPOSIT_BYTECODE_HASH"])
-    contract_address = Web3.keccak(
-        b"\xff"
-        + Web3.to_bytes(hexstr=deployer_address)
-        + salt.to_bytes(32, "big")
-        + Web3.to_bytes(hexstr=bytecode_hash)
-    ).hex()[-40:]
+    return b"\xff" + Web3.to_bytes(hexstr=deployer_address), Web3.to_bytes(hexstr=bytecode_hash)
+
+
+def compute_create2_address(salt: int) -> ChecksumAddress:
+    prefix, bytecode_hash = _get_create2_constants()
+    contract_address = Web3.keccak(prefix + salt.to_bytes(32, "big") + bytecode_hash)[-20:]
     return Web3.to_checksum_address(contract_address)
 
 
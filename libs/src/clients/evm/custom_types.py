@@ -1,3 +1,4 @@
+from enum import StrEnum
 from typing import Any
 
 from eth_typing import ChainId, ChecksumAddress
@@ -7,14 +8,21 @@ from clients.custom_types import ChainConfig, Transfer, WithdrawRequest
 
 
 class EVMTransfer(Transfer[ChecksumAddress]):
+    # Index of the `Transfer` log in its block, a transaction can emit several of them (e.g. a
+    # batch payout); `None` for transfers decoded from the transaction itself.
+    log_index: int | None = None
+
+    def _sort_key(self) -> tuple[str, int]:
+        return self.tx_hash, -1 if self.log_index is None else self.log_index
+
     def __eq__(self, value: Any) -> bool:
         if isinstance(value, EVMTransfer):
-            return self.tx_hash == value.tx_hash
+            return self._sort_key() == value._sort_key()
         return NotImplemented
 
     def __gt__(self, value: Any) -> bool:
         if isinstance(value, EVMTransfer):
-            return self.tx_hash > value.tx_hash
+            return self._sort_key() > value._sort_key()
         return NotImplemented
 
 
@@ -23,12 +31,32 @@ class EVMWithdrawRequest(WithdrawRequest):
     chain_id: ChainId
 
 
+class EVMTransferExtractionMode(StrEnum):
+    # Decode the input of every transaction of every block.
+    BLOCK = "block"
+    # Query ERC-20 `Transfer` logs to the deposit addresses, block bodies are only used for native transfers.
+    LOGS = "logs"
+
+
 class EVMConfig(ChainConfig[EVMTransfer, EVMWithdrawRequest]):
     chain_id: ChainId
     poa: bool = Field(default=False)
     native_decimal: int
+    # Concurrent RPC calls made within this many seconds are sent as one JSON-RPC batch, 0 disables it.
+    rpc_batch_window: float = Field(default=0.005)
+    rpc_max_batch_size: int = Field(default=50)
+    transfer_extraction_mode: EVMTransferExtractionMode = Field(default=EVMTransferExtractionMode.BLOCK)
+    # Max number of deposit addresses in the `to` topic list of a single `eth_getLogs` query.
+    logs_address_chunk_size: int = Field(default=500)
     transfer_class: type[EVMTransfer] = EVMTransfer
     withdraw_request_type: type[EVMWithdrawRequest] = EVMWithdrawRequest
 
 
-__all__ = ["ChecksumAddress", "ChainId", "EVMConfig", "EVMTransfer", "EVMWithdrawRequest"]
+__all__ = [
+    "ChecksumAddress",
+    "ChainId",
+    "EVMConfig",
+    "EVMTransfer",
+    "EVMTransferExtractionMode",
+    "EVMWithdrawRequest",
+]
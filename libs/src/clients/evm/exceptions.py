@@ -15,3 +15,7 @@ class EVMTransferNotValid(EVMClientError):
 
 class EVMBlockNotFound(EVMClientError):
     """Exception raised for transfer not found"""
+
+
+class EVMTokenDecimalsNotFound(EVMClientError):
+    """Exception raised when a token contract has no `decimals()`"""
@@ -0,0 +1,189 @@
+import asyncio
+import itertools
+from typing import Any, Sequence, cast
+
+import aiohttp
+from eth_typing import URI
+from web3 import AsyncHTTPProvider
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+from web3._utils.request import async_make_post_request
+from web3.types import RPCEndpoint, RPCResponse
+
+from clients.endpoint_pool import EndpointPool
+
+type RPCCall = tuple[RPCEndpoint | str, Any]
+
+# Calls that must not be sent twice, they are never hedged.
+WRITE_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+
+class AsyncBatchHTTPProvider(AsyncHTTPProvider):
+    """`AsyncHTTPProvider` that sends concurrent calls as JSON-RPC batch requests.
+
+    Calls made within `batch_window` seconds of each other are coalesced into a single HTTP
+    request of at most `max_batch_size` calls, and the responses are handed back to the waiting
+    coroutines. A `batch_window` of zero sends every call on its own.
+
+    With an `endpoint_pool`, every HTTP request is routed to the best endpoint of the pool
+    instead of `endpoint_uri`, and read-only requests are hedged.
+
+    A node that refuses batch requests (an HTTP client error or a single error object for the
+    whole batch) gets the calls of that batch one by one, and no more batches after that.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: URI | str | None = None,
+        request_kwargs: Any | None = None,
+        *,
+        batch_window: float = 0.0,
+        max_batch_size: int = 50,
+        endpoint_pool: EndpointPool | None = None,
+    ) -> None:
+        super().__init__(endpoint_uri, request_kwargs)
+        self.endpoint_pool = endpoint_pool
+        self.batch_window = batch_window
+        self.max_batch_size = max(max_batch_size, 1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: list[tuple[RPCCall, asyncio.Future[RPCResponse]]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._sending: set[asyncio.Task] = set()
+        self.batch_supported = True
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.batch_window <= 0 or not self.batch_supported:
+            return await self._make_request(method, params)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Requests queued on a previous (closed) loop can never be flushed, start over.
+            self._loop = loop
+            self._pending = []
+            self._flush_handle = None
+        future: asyncio.Future[RPCResponse] = loop.create_future()
+        self._pending.append(((method, params), future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if len(pending) == 0:
+            return
+        task = asyncio.ensure_future(self._send(pending))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, pending: list[tuple[RPCCall, asyncio.Future[RPCResponse]]]):
+        calls = [call for call, _ in pending]
+        try:
+            if len(calls) == 1:
+                method, params = calls[0]
+                responses = [await self._make_request(RPCEndpoint(method), params)]
+            else:
+                responses = await self.make_batch_request(calls)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(pending, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def _make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.endpoint_pool is None:
+            return await super().make_request(method, params)
+        raw_response = await self._post(self.encode_rpc_request(method, params), hedge=method not in WRITE_METHODS)
+        return self.decode_rpc_response(raw_response)
+
+    async def make_request_to(self, endpoint_uri: URI | str, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """Send a single call to `endpoint_uri`, bypassing batching and the endpoint pool."""
+        raw_response = await async_make_post_request(
+            URI(endpoint_uri), self.encode_rpc_request(method, params), **self.get_request_kwargs()
+        )
+        return self.decode_rpc_response(raw_response)
+
+    async def _post(self, data: bytes, *, hedge: bool) -> bytes:
+        if self.endpoint_pool is None:
+            return await async_make_post_request(self.endpoint_uri, data, **self.get_request_kwargs())
+        return await self.endpoint_pool.request(
+            lambda endpoint_uri: async_make_post_request(URI(endpoint_uri), data, **self.get_request_kwargs()),
+            hedge=hedge,
+        )
+
+    async def make_batch_request(self, calls: Sequence[RPCCall]) -> list[RPCResponse]:
+        """Send `calls` as JSON-RPC batches of at most `max_batch_size` calls each."""
+        if len(calls) <= self.max_batch_size:
+            return await self._make_batch_request(calls)
+        chunks = await asyncio.gather(
+            *[
+                self._make_batch_request(calls[i : i + self.max_batch_size])
+                for i in range(0, len(calls), self.max_batch_size)
+            ]
+        )
+        return list(itertools.chain.from_iterable(chunks))
+
+    async def _make_batch_request(self, calls: Sequence[RPCCall]) -> list[RPCResponse]:
+        if len(calls) == 0:
+            return []
+        if not self.batch_supported:
+            return await self._make_single_requests(calls)
+        request_ids = []
+        payload = []
+        for method, params in calls:
+            request_id = next(self.request_counter)
+            request_ids.append(request_id)
+            payload.append({"jsonrpc": "2.0", "method": method, "params": params or [], "id": request_id})
+        try:
+            raw_response = await self._post(
+                FriendlyJsonSerde().json_encode(payload, cls=Web3JsonEncoder).encode(),
+                hedge=all(method not in WRITE_METHODS for method, _ in calls),
+            )
+        except aiohttp.ClientResponseError as e:
+            if not _is_batch_rejection(e):
+                raise
+            self.batch_supported = False
+            return await self._make_single_requests(calls)
+        decoded: Any = self.decode_rpc_response(raw_response)
+        if not isinstance(decoded, list):
+            self.batch_supported = False
+            return await self._make_single_requests(calls)
+        return self._split_batch_response(decoded, request_ids)
+
+    async def _make_single_requests(self, calls: Sequence[RPCCall]) -> list[RPCResponse]:
+        responses = await asyncio.gather(*[self._make_request(RPCEndpoint(method), params) for method, params in calls])
+        return list(responses)
+
+    def decode_batch_rpc_response(self, raw_response: bytes, request_ids: list[int]) -> list[RPCResponse]:
+        """Split a batch response back into one response per request, in request order.
+
+        Nodes may answer a batch in any order, and some answer the whole batch with a single
+        error object (e.g. batch too large); that error is then returned for every request.
+        """
+        return self._split_batch_response(self.decode_rpc_response(raw_response), request_ids)
+
+    @staticmethod
+    def _split_batch_response(decoded: Any, request_ids: list[int]) -> list[RPCResponse]:
+        if not isinstance(decoded, list):
+            return [cast(RPCResponse, {**decoded, "id": request_id}) for request_id in request_ids]
+        responses_by_id = {response.get("id"): response for response in decoded}
+        return [
+            responses_by_id.get(
+                request_id,
+                cast(
+                    RPCResponse,
+                    {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32603, "message": "Missing response"}},
+                ),
+            )
+            for request_id in request_ids
+        ]
+
+
+def _is_batch_rejection(error: aiohttp.ClientResponseError) -> bool:
+    # Client errors other than rate limiting mean the request itself, a batch, is not accepted.
+    return 400 <= error.status < 500 and error.status != 429
@@ -1,12 +1,18 @@
 from dataclasses import dataclass
+from typing import Container
 
+from pydantic import ValidationError
 from web3 import Web3
 
+from clients.custom_types import BlockNumber, TxHash
+
 from .abi import ERC20_ABI
-from .custom_types import ChecksumAddress
+from .custom_types import ChecksumAddress, EVMTransfer
 
 type FunctionHash = str
 
+TRANSFER_EVENT_TOPIC = Web3.keccak(text="Transfer(address,address,uint256)").hex()
+
 
 class NotRecognizedSolidityFuncError(Exception):
     pass
@@ -77,3 +83,106 @@ def decode_transfer_tx(tx_input: str) -> TransferTX:
         return decoded_tx_input
     else:
         raise NotRecognizedSolidityFuncError(f"Function {function_selector} is not recognized")
+
+
+def _parse_calldata_layouts(selectors: dict[FunctionHash, SolidityFunction]) -> dict[bytes, int]:
+    """Offset of the `_to` word in the calldata of each selector, the `_value` word follows it."""
+    layouts = {}
+    for selector, func in selectors.items():
+        names = [inp["name"] for inp in func.inputs]
+        to_index = names.index("_to")
+        if names[to_index + 1] != "_value":
+            raise ValueError(f"Unsupported {func.name} inputs: {names}")
+        layouts[bytes.fromhex(selector.removeprefix("0x"))] = 4 + 32 * to_index
+    return layouts
+
+
+calldata_layouts = _parse_calldata_layouts(function_selectors)
+
+
+def to_address_key(address: str) -> bytes:
+    """The 20 raw bytes of a hex address, which do not depend on the checksum casing."""
+    return bytes.fromhex(address.removeprefix("0x"))
+
+
+def decode_transfer_calldata(tx_input: bytes) -> tuple[bytes, int] | None:
+    """Return the raw recipient and the value of a `transfer`/`transferFrom` call, `None` for any other input."""
+    offset = calldata_layouts.get(tx_input[:4])
+    if offset is None or len(tx_input) < offset + 64:
+        return None
+    # An address word is left-padded with 12 zero bytes.
+    return tx_input[offset + 12 : offset + 32], int.from_bytes(tx_input[offset + 32 : offset + 64], "big")
+
+
+# `(tx_hash, block_number, to, value, input)` of a transaction, with a hex string for the hash.
+type RawTransaction = tuple[TxHash, BlockNumber, ChecksumAddress | None, int, bytes]
+
+
+def filter_transfer_transactions(
+    transactions: list[RawTransaction], accepted_keys: Container[bytes]
+) -> list[RawTransaction]:
+    """Keep the native transfers and ERC-20 transfer calls of a block paying one of `accepted_keys`.
+
+    Recipients are compared as raw 20-byte keys (see `to_address_key`), so nothing is decoded to
+    text or checksummed for the vast majority of transactions that pay other addresses.
+    """
+    matches = []
+    for transaction in transactions:
+        to, tx_input = transaction[2], transaction[4]
+        if len(tx_input) == 0:
+            if to is not None and to_address_key(to) in accepted_keys:
+                matches.append(transaction)
+            continue
+        decoded = decode_transfer_calldata(tx_input)
+        if decoded is not None and decoded[0] in accepted_keys:
+            matches.append(transaction)
+    return matches
+
+
+def parse_block_transfers(
+    chain_symbol: str,
+    transactions: list[RawTransaction],
+    accepted_keys: Container[bytes] | None = None,
+) -> tuple[list[EVMTransfer], list[str]]:
+    """Decode the native and ERC-20 transfers of a block's transactions in one pass.
+
+    When `accepted_keys` is given, the transactions are first filtered with
+    `filter_transfer_transactions`, which is the bulk of the work on a busy block.
+
+    Runs in a worker of the decoding scheduler, so it only takes and returns picklable values:
+    the transfers, and the description of the transactions that could not be decoded.
+    """
+    if accepted_keys is not None:
+        transactions = filter_transfer_transactions(transactions, accepted_keys)
+    transfers = []
+    invalid = []
+    for tx_hash, block_number, to, value, tx_input in transactions:
+        try:
+            if len(tx_input) == 0:
+                transfer = EVMTransfer(
+                    tx_hash=tx_hash,
+                    block_number=block_number,
+                    chain_symbol=chain_symbol,
+                    to=to,  # type: ignore
+                    value=value,
+                    token="0x0000000000000000000000000000000000000000",  # type: ignore
+                )
+            else:
+                decoded = decode_transfer_calldata(tx_input)
+                if decoded is None:
+                    continue
+                recipient, token_value = decoded
+                transfer = EVMTransfer(
+                    tx_hash=tx_hash,
+                    block_number=block_number,
+                    chain_symbol=chain_symbol,
+                    # Only checksummed once the transaction is known to be a transfer worth keeping.
+                    to=Web3.to_checksum_address(recipient),
+                    value=token_value,
+                    token=to,  # type: ignore
+                )
+        except ValidationError as e:
+            invalid.append(f"Transfer with tx_hash {tx_hash} is not valid: {e}")
+            continue
+        transfers.append(transfer)
+    return transfers, invalid
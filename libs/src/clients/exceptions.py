@@ -2,6 +2,7 @@ from .abstract import BaseClientError
 from .evm.exceptions import (
     EVMBlockNotFound,
     EVMClientError,
+    EVMTokenDecimalsNotFound,
     EVMTransferNotFound,
     EVMTransferNotValid,
 )
@@ -10,6 +11,7 @@ __all__ = [
     "BaseClientError",
     "EVMBlockNotFound",
     "EVMClientError",
+    "EVMTokenDecimalsNotFound",
     "EVMTransferNotFound",
     "EVMTransferNotValid",
 ]
@@ -0,0 +1,97 @@
+import asyncio
+import importlib.util
+from collections import defaultdict
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package (`httpx[http2]`).
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientSettings:
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 15.0,
+        http2: bool = True,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+
+class HTTPClientStats:
+    """Requests sent and connections opened per host, the difference is the number of reused connections."""
+
+    def __init__(self):
+        self.requests: defaultdict[str, int] = defaultdict(int)
+        self.connections: defaultdict[str, int] = defaultdict(int)
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        return {
+            host: {
+                "requests": requests,
+                "connections": self.connections[host],
+                "reused": requests - self.connections[host],
+            }
+            for host, requests in self.requests.items()
+        }
+
+    async def on_request(self, request: httpx.Request):
+        host = request.url.host
+        self.requests[host] += 1
+
+        async def trace(event_name: str, info: dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                self.connections[host] += 1
+
+        request.extensions["trace"] = trace
+
+
+_settings = HTTPClientSettings()
+_stats = HTTPClientStats()
+# An `httpx.AsyncClient` is bound to the event loop its connections were opened on.
+_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = WeakKeyDictionary()
+
+
+def configure_http_clients(**settings: Any):
+    """Configure the clients returned by `get_http_client`, clients created before are not affected."""
+    global _settings
+    _settings = HTTPClientSettings(**settings)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared, connection-pooling `httpx.AsyncClient` of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=_settings.max_connections,
+                max_keepalive_connections=_settings.max_keepalive_connections,
+                keepalive_expiry=_settings.keepalive_expiry,
+            ),
+            timeout=_settings.timeout,
+            http2=_settings.http2,
+            event_hooks={"request": [_stats.on_request]},
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    """Close the shared client of the running event loop, e.g. before the loop is closed."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def get_http_client_stats() -> dict[str, dict[str, int]]:
+    return _stats.as_dict()
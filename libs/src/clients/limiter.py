@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+RATE_LIMIT_STATUS_CODE = 429
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an error raised by an RPC call is a rate-limit (HTTP 429) response"""
+    while error is not None:
+        status = getattr(error, "status_code", None) or getattr(error, "status", None)
+        if status == RATE_LIMIT_STATUS_CODE:
+            return True
+        error = error.__cause__  # type: ignore
+    return False
+
+
+class AdaptiveLimiter:
+    """Bound the number of in-flight RPC calls and adapt the bound to the provider capacity.
+
+    The limit grows additively while calls finish under `target_latency` and shrinks
+    multiplicatively on slow calls and rate-limit errors (AIMD). Rate-limited calls are
+    retried with exponential backoff up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 5,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        target_latency: float = 2.0,
+        decrease_factor: float = 0.5,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self._in_flight = 0
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self):
+        async with self.condition:
+            self._in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self, latency: float):
+        if latency > self.target_latency:
+            self._decrease()
+        else:
+            # Additive increase: one extra slot once a whole window of calls finished on time.
+            self._limit = min(self._limit + 1 / max(self._limit, 1), self.max_limit)
+
+    def on_rate_limited(self):
+        self._decrease()
+
+    def _decrease(self):
+        self._limit = max(self._limit * self.decrease_factor, self.min_limit)
+
+    async def submit[T](self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        attempt = 0
+        while True:
+            await self.acquire()
+            start = time.monotonic()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                self.on_rate_limited()
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                self.on_success(time.monotonic() - start)
+                return result
+            finally:
+                await self.release()
+            await asyncio.sleep(self.retry_delay * 2**attempt)
+            attempt += 1
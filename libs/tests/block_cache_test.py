@@ -0,0 +1,70 @@
+from clients.cache import BlockCache, CachedBlock
+
+
+class DictBackend:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def make_block(number, block_hash, tx_hash="0x1"):
+    return CachedBlock(
+        chain_symbol="SEP",
+        number=number,
+        hash=block_hash,
+        tx_hashes=[tx_hash],
+        transfers={tx_hash: [{"tx_hash": tx_hash, "value": "1"}]},
+    )
+
+
+async def test_block_cache_should_only_serve_blocks_with_the_requested_hash():
+    # Arrangement
+    cache = BlockCache()
+    await cache.put(make_block(1, "0xa"))
+
+    # Action & Assertion
+    assert (await cache.get("SEP", 1, "0xa")).tx_hashes == ["0x1"]
+    assert await cache.get("SEP", 1, "0xb") is None
+
+
+async def test_block_cache_should_invalidate_reorged_block():
+    # Arrangement
+    backend = DictBackend()
+    cache = BlockCache(backend=backend)
+    await cache.put(make_block(1, "0xa", tx_hash="0x1"))
+
+    # Action
+    await cache.put(make_block(1, "0xb", tx_hash="0x2"))
+
+    # Assertion
+    assert await cache.get("SEP", 1, "0xa") is None
+    assert await cache.get_transaction_block("SEP", "0x1") is None
+    assert (await cache.get_transaction_block("SEP", "0x2")).hash == "0xb"
+    assert "block:SEP:1:0xa" not in backend.values
+    assert cache.invalidations == 1
+
+
+async def test_block_cache_should_evict_least_recently_used_and_fall_back_to_backend():
+    # Arrangement
+    backend = DictBackend()
+    cache = BlockCache(max_size=2, backend=backend)
+    for number in range(3):
+        await cache.put(make_block(number, f"0x{number}", tx_hash=f"0xt{number}"))
+
+    # Action
+    cache.backend = None
+    evicted = await cache.get("SEP", 0, "0x0")
+    cache.backend = backend
+    restored = await cache.get_transaction_block("SEP", "0xt0")
+
+    # Assertion
+    assert evicted is None
+    assert restored is not None and restored.number == 0
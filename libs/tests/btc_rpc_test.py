@@ -0,0 +1,79 @@
+import asyncio
+
+from clients.btc.client import filter_block_outputs
+from clients.btc.rpc.ankr import BTCAnkrAsyncClient
+from clients.btc.rpc.mempol_testnet4 import BTCMempoolAsyncClient
+
+
+async def test_ankr_should_fetch_block_pages_concurrently_and_in_order():
+    # Arrangement
+    client = BTCAnkrAsyncClient(base_url="http://rpc.example", indexer_url="http://indexer.example")
+    in_flight = 0
+    max_in_flight = 0
+
+    async def request(method, url, params=None, **kwargs):
+        nonlocal in_flight, max_in_flight
+        page = params["page"]
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later pages answer first.
+        await asyncio.sleep(0.001 * (5 - page))
+        in_flight -= 1
+        return {"hash": "h", "totalPages": 4, "txs": [{"txid": f"{page}-{i}"} for i in range(2)]}
+
+    client._request = request  # type: ignore
+
+    # Action
+    block = await client.get_raw_block_by_identifier(100)
+
+    # Assertion
+    assert [tx["txid"] for tx in block["txs"]] == [f"{page}-{i}" for page in range(1, 5) for i in range(2)]
+    assert max_in_flight == 3
+
+
+async def test_mempool_should_keep_every_transactions_slice():
+    # Arrangement
+    client = BTCMempoolAsyncClient()
+    requested = []
+
+    async def request(method, url, **kwargs):
+        requested.append(url)
+        if url.endswith("/block/h"):
+            return {"tx_count": 60}
+        start_index = int(url.rsplit("/", 1)[-1])
+        return [{"txid": str(i)} for i in range(start_index, min(start_index + 25, 60))]
+
+    client._request = request  # type: ignore
+    client.populate_block = lambda data: data  # type: ignore
+
+    # Action
+    block = await client.get_block_by_id("h")
+
+    # Assertion
+    assert [tx["txid"] for tx in block["txs"]] == [str(i) for i in range(60)]  # type: ignore
+    assert len(requested) == 4
+
+
+def test_filter_block_outputs_should_only_keep_accepted_addresses():
+    # Arrangement
+    block = {
+        "hash": "h",
+        "txs": [
+            {
+                "txid": "tx1",
+                "vout": [
+                    {"value": "1000", "n": 0, "addresses": ["bc1-user"], "isAddress": True},
+                    {"value": "2000", "n": 1, "addresses": ["bc1-other"], "isAddress": True},
+                ],
+            },
+            {"txid": "tx2", "vout": [{"value": "0", "n": 0, "addresses": ["OP_RETURN"], "isAddress": False}]},
+        ],
+    }
+
+    # Action
+    tx_hashes, outputs = filter_block_outputs(block, {"bc1-user", "OP_RETURN"})
+
+    # Assertion
+    assert tx_hashes == ["tx1", "tx2"]
+    assert outputs == [("tx1", 0, "bc1-user", 1000)]
+    assert len(filter_block_outputs(block)[1]) == 2
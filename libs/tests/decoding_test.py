@@ -0,0 +1,39 @@
+import asyncio
+
+from clients.decoding import DecodingScheduler
+
+
+async def test_scheduler_should_take_turns_between_chains():
+    # Arrangement
+    scheduler = DecodingScheduler(max_workers=1)
+    order = []
+
+    def decode(chain_symbol, block_number):
+        order.append((chain_symbol, block_number))
+        return block_number
+
+    # Action
+    results = await asyncio.gather(
+        *[scheduler.submit("SEP", decode, "SEP", i) for i in range(4)],
+        *[scheduler.submit("BTC", decode, "BTC", i) for i in range(2)],
+    )
+
+    # Assertion
+    assert results == [0, 1, 2, 3, 0, 1]
+    assert order == [("SEP", 0), ("SEP", 1), ("BTC", 0), ("SEP", 2), ("BTC", 1), ("SEP", 3)]
+
+
+async def test_scheduler_should_raise_job_errors():
+    # Arrangement
+    scheduler = DecodingScheduler(max_workers=2)
+
+    def decode():
+        raise ValueError("invalid block")
+
+    # Action & Assertion
+    try:
+        await scheduler.submit("SEP", decode)
+    except ValueError as e:
+        assert str(e) == "invalid block"
+    else:
+        raise AssertionError("ValueError not raised")
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from clients.endpoint_pool import EndpointPool
+from clients.evm.custom_types import EVMConfig
+
+
+def test_chain_config_should_split_comma_separated_private_rpc():
+    # Arrangement
+    config = EVMConfig(
+        private_rpc="http://a.example, http://b.example",
+        chain_symbol="SEP",
+        vault_address="",
+        chain_id=1,
+        native_decimal=18,
+    )
+
+    # Action & Assertion
+    assert config.rpc_urls == ("http://a.example", "http://b.example")
+
+
+async def test_pool_should_fail_over_to_next_endpoint():
+    # Arrangement
+    pool = EndpointPool(["a", "b"], hedge_delay=None)
+    calls = []
+
+    async def call(url):
+        calls.append(url)
+        if url == "a":
+            raise ConnectionError(url)
+        return url
+
+    # Action
+    result = await pool.request(call)
+
+    # Assertion
+    assert result == "b"
+    assert calls == ["a", "b"]
+    assert pool.ranked()[0].url == "b"
+
+
+async def test_pool_should_hedge_slow_reads():
+    # Arrangement
+    pool = EndpointPool(["slow", "fast"], hedge_delay=0.01)
+    pool.endpoints[0].latency = 0.001
+    answered = asyncio.Event()
+
+    async def call(url):
+        if url == "slow":
+            await answered.wait()
+        answered.set()
+        return url
+
+    # Action
+    result = await pool.request(call, hedge=True)
+
+    # Assertion
+    assert result == "fast"
+
+
+async def test_pool_should_mark_lagging_endpoints():
+    # Arrangement
+    pool = EndpointPool(["a", "b", "c"], max_head_lag=5)
+    heads = {"a": 100, "b": 98, "c": 90}
+
+    async def fetch_head(url):
+        return heads[url]
+
+    # Action
+    head = await pool.refresh_heads(fetch_head)
+
+    # Assertion
+    assert head == 98
+    assert [endpoint.url for endpoint in pool.ranked() if endpoint.lagging] == ["c"]
+
+
+async def test_pool_should_raise_last_error_if_every_endpoint_fails():
+    # Arrangement
+    pool = EndpointPool(["a", "b"])
+
+    async def call(url):
+        raise ConnectionError(url)
+
+    # Action & Assertion
+    with pytest.raises(ConnectionError, match="b"):
+        await pool.request(call)
+
+
+async def test_pool_should_not_fail_over_or_hedge_to_lagging_endpoints():
+    # Arrangement
+    pool = EndpointPool(["a", "b", "c"], hedge_delay=0.01)
+    await pool.refresh_heads(lambda url: asyncio.sleep(0, {"a": 100, "b": 100, "c": 90}[url]))
+    calls = []
+
+    async def call(url):
+        calls.append(url)
+        raise ConnectionError(url)
+
+    # Action
+    with pytest.raises(ConnectionError):
+        await pool.request(call, hedge=True)
+
+    # Assertion
+    assert sorted(calls) == ["a", "b"]
+
+
+async def test_pool_should_use_every_endpoint_if_all_are_lagging():
+    # Arrangement
+    pool = EndpointPool(["a", "b"])
+    for endpoint in pool.endpoints:
+        endpoint.lagging = True
+
+    # Action & Assertion
+    assert [endpoint.url for endpoint in pool.in_use()] == ["a", "b"]
+
+
+async def test_pool_should_refresh_heads_in_background_of_requests():
+    # Arrangement
+    pool = EndpointPool(["a", "b"], hedge_delay=None, head_refresh_interval=60)
+    heads = {"a": 100, "b": 90}
+    fetched = []
+
+    async def fetch_head(url):
+        fetched.append(url)
+        return heads[url]
+
+    async def call(url):
+        return url
+
+    pool.watch_heads(fetch_head)
+
+    # Action
+    await pool.request(call)
+    await pool._head_refresh
+    await pool.request(call)
+
+    # Assertion
+    assert sorted(fetched) == ["a", "b"]
+    assert [endpoint.url for endpoint in pool.in_use()] == ["a"]
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from clients.evm.client import EVMAsyncClient
+from clients.evm.custom_types import EVMConfig
+from clients.evm.transfer_decoder import TRANSFER_EVENT_TOPIC
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+USER = "0xABaBaBaBABabABabAbAbABAbABabababaBaBABaB"
+OTHER = "0x" + "cd" * 20
+
+
+def _transfer_log(tx_hash: str, log_index: int, to: str, value: int) -> AttributeDict:
+    return AttributeDict(
+        {
+            "transactionHash": HexBytes(tx_hash),
+            "blockNumber": 4,
+            "logIndex": log_index,
+            "address": "0x" + "ef" * 20,
+            "topics": [
+                HexBytes(TRANSFER_EVENT_TOPIC),
+                HexBytes("0x" + "00" * 32),
+                HexBytes("0x" + to[2:].lower().rjust(64, "0")),
+            ],
+            "data": HexBytes(value.to_bytes(32, "big")),
+        }
+    )
+
+
+def _block(number: int, recipients: list[str]) -> AttributeDict:
+    return AttributeDict(
+        {
+            "hash": HexBytes(f"0x{number:064x}"),
+            "transactions": [
+                AttributeDict(
+                    {
+                        "hash": HexBytes(f"0x{number:032x}{i:032x}"),
+                        "blockNumber": number,
+                        "to": to,
+                        "value": 5,
+                        "input": HexBytes("0x"),
+                    }
+                )
+                for i, to in enumerate(recipients)
+            ],
+        }
+    )
+
+
+@pytest.fixture
+def evm_client():
+    client = EVMAsyncClient(
+        EVMConfig(
+            private_rpc="http://example.com",
+            chain_symbol="SEP",
+            vault_address="",
+            chain_id=1,
+            native_decimal=18,
+        ),
+        logging.getLogger(__name__),
+    )
+    client._w3 = MagicMock()
+    client._w3.manager.coro_request = AsyncMock(return_value=[{"transactionHash": "0x01", "status": "0x1"}])
+    yield client
+
+
+async def test_extract_transfer_from_block_should_skip_receipts_without_transfers(evm_client):
+    # Arrangement
+    evm_client._w3.eth.get_block = AsyncMock(return_value=_block(1, [OTHER, OTHER]))
+
+    # Action
+    transfers = await evm_client.extract_transfer_from_block(1, accepted_addresses=[USER])
+
+    # Assertion
+    assert transfers == []
+    evm_client._w3.manager.coro_request.assert_not_called()
+
+
+async def test_extract_transfer_from_block_should_fetch_receipts_of_transfers(evm_client):
+    # Arrangement
+    evm_client._w3.eth.get_block = AsyncMock(return_value=_block(2, [OTHER, USER]))
+
+    # Action
+    transfers = await evm_client.extract_transfer_from_block(2, accepted_addresses=[USER])
+
+    # Assertion
+    assert [transfer.to for transfer in transfers] == [USER]
+    evm_client._w3.manager.coro_request.assert_awaited_once()
+
+
+async def test_get_transfer_by_tx_hash_should_serve_cached_transfer_of_canonical_block(evm_client):
+    # Arrangement
+    tx = _block(3, [USER]).transactions[0]
+    evm_client._w3.eth.get_transaction = AsyncMock(
+        return_value=AttributeDict({**tx, "blockHash": HexBytes(f"0x{3:064x}")})
+    )
+    evm_client.get_block_hash = AsyncMock(return_value=f"0x{3:064x}")
+    tx_hash = tx["hash"].hex()
+
+    # Action
+    transfers = await evm_client.get_transfer_by_tx_hash(tx_hash)
+    cached_transfers = await evm_client.get_transfer_by_tx_hash(tx_hash)
+
+    # Assertion
+    assert [transfer.to for transfer in transfers] == [USER]
+    assert cached_transfers == transfers
+    evm_client._w3.eth.get_transaction.assert_awaited_once()
+
+
+async def test_extract_transfer_from_logs_should_keep_every_log_of_tx(evm_client):
+    # Arrangement
+    tx_hash = f"0x{4:064x}"
+    evm_client._w3.eth.get_logs = AsyncMock(
+        return_value=[_transfer_log(tx_hash, 1, USER, 20), _transfer_log(tx_hash, 0, USER, 10)]
+    )
+    evm_client._w3.eth.get_block = AsyncMock(return_value=_block(4, []))
+
+    # Action
+    transfers = await evm_client.extract_transfer_from_logs(4, 4, accepted_addresses=[USER])
+
+    # Assertion
+    assert [(transfer.log_index, transfer.value) for transfer in transfers] == [(0, 10), (1, 20)]
+
+
+async def test_cached_block_should_be_checked_once_per_block(evm_client):
+    # Arrangement
+    block = _block(5, [USER, USER])
+    evm_client._w3.eth.get_block = AsyncMock(return_value=block)
+    evm_client._w3.eth.get_transaction = AsyncMock()
+    evm_client.get_block_hash = AsyncMock(return_value=block["hash"].hex())
+    await evm_client.extract_transfer_from_block(5, accepted_addresses=[USER])
+    evm_client._w3.eth.get_block.reset_mock()
+    tx_hashes = [tx["hash"].hex() for tx in block.transactions]
+
+    # Action
+    transfers = await asyncio.gather(*[evm_client.get_transfer_by_tx_hash(tx_hash) for tx_hash in tx_hashes])
+    block_tx_hashes = await evm_client.get_block_tx_hash(5)
+
+    # Assertion
+    assert [transfer.tx_hash for tx_transfers in transfers for transfer in tx_transfers] == tx_hashes
+    assert block_tx_hashes == tx_hashes
+    evm_client.get_block_hash.assert_awaited_once_with(5)
+    evm_client._w3.eth.get_transaction.assert_not_called()
+    evm_client._w3.eth.get_block.assert_not_called()
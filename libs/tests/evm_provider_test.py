@@ -0,0 +1,104 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from clients.evm.provider import AsyncBatchHTTPProvider
+from web3.types import RPCEndpoint
+
+
+def test_decode_batch_rpc_response_should_follow_request_order():
+    # Arrangement
+    provider = AsyncBatchHTTPProvider("http://example.com")
+    raw_response = json.dumps(
+        [
+            {"jsonrpc": "2.0", "id": 2, "result": "0x2"},
+            {"jsonrpc": "2.0", "id": 1, "result": "0x1"},
+        ]
+    ).encode()
+
+    # Action
+    responses = provider.decode_batch_rpc_response(raw_response, [1, 2, 3])
+
+    # Assertion
+    assert [response.get("result") for response in responses] == ["0x1", "0x2", None]
+    assert "error" in responses[2]
+
+
+def test_decode_batch_rpc_response_should_spread_batch_error():
+    # Arrangement
+    provider = AsyncBatchHTTPProvider("http://example.com")
+    raw_response = json.dumps(
+        {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch too large"}}
+    ).encode()
+
+    # Action
+    responses = provider.decode_batch_rpc_response(raw_response, [1, 2])
+
+    # Assertion
+    assert [response["id"] for response in responses] == [1, 2]
+    assert all(response["error"]["code"] == -32600 for response in responses)
+
+
+async def test_concurrent_requests_should_be_sent_as_one_batch():
+    # Arrangement
+    provider = AsyncBatchHTTPProvider("http://example.com", batch_window=0.01)
+    payloads = []
+
+    async def mock_post(endpoint_uri, data, **kwargs):
+        payload = json.loads(data)
+        payloads.append(payload)
+        return json.dumps([{"jsonrpc": "2.0", "id": call["id"], "result": call["params"][0]} for call in payload])
+
+    # Action
+    with patch("clients.evm.provider.async_make_post_request", new=mock_post):
+        responses = await asyncio.gather(*[provider.make_request(RPCEndpoint("eth_call"), [i]) for i in range(3)])
+
+    # Assertion
+    assert len(payloads) == 1
+    assert [call["method"] for call in payloads[0]] == ["eth_call"] * 3
+    assert [response["result"] for response in responses] == [0, 1, 2]
+
+
+async def test_batch_should_be_split_by_max_batch_size():
+    # Arrangement
+    provider = AsyncBatchHTTPProvider("http://example.com", max_batch_size=2)
+    payloads = []
+
+    async def mock_post(endpoint_uri, data, **kwargs):
+        payload = json.loads(data)
+        payloads.append(payload)
+        return json.dumps([{"jsonrpc": "2.0", "id": call["id"], "result": call["params"][0]} for call in payload])
+
+    # Action
+    with patch("clients.evm.provider.async_make_post_request", new=mock_post):
+        responses = await provider.make_batch_request([("eth_getTransactionReceipt", [i]) for i in range(5)])
+
+    # Assertion
+    assert [len(payload) for payload in payloads] == [2, 2, 1]
+    assert [response["result"] for response in responses] == [0, 1, 2, 3, 4]
+
+
+async def test_batch_request_should_fall_back_to_single_requests_when_batches_are_rejected():
+    # Arrangement
+    provider = AsyncBatchHTTPProvider("http://example.com")
+    payloads = []
+
+    async def mock_post(endpoint_uri, data, **kwargs):
+        payload = json.loads(data)
+        payloads.append(payload)
+        if isinstance(payload, list):
+            return json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "no batches"}})
+        return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": payload["params"][0]})
+
+    # Action
+    with (
+        patch("clients.evm.provider.async_make_post_request", new=mock_post),
+        patch("web3.providers.async_rpc.async_make_post_request", new=mock_post),
+    ):
+        first = await provider.make_batch_request([(RPCEndpoint("eth_call"), [i]) for i in range(2)])
+        second = await provider.make_batch_request([(RPCEndpoint("eth_call"), [i]) for i in range(2, 4)])
+
+    # Assertion
+    assert [response["result"] for response in [*first, *second]] == [0, 1, 2, 3]
+    assert not provider.batch_supported
+    assert [isinstance(payload, list) for payload in payloads] == [True, False, False, False, False]
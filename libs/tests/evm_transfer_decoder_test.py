@@ -0,0 +1,76 @@
+from clients.evm.transfer_decoder import (
+    decode_transfer_calldata,
+    filter_transfer_transactions,
+    parse_block_transfers,
+    to_address_key,
+)
+
+USER = "0xABaBaBaBABabABabAbAbABAbABabababaBaBABaB"
+OTHER = "0x" + "cd" * 20
+TOKEN = "0x" + "11" * 20
+TRANSFER = bytes.fromhex("a9059cbb")
+TRANSFER_FROM = bytes.fromhex("23b872dd")
+
+
+def _word(value: str | int) -> bytes:
+    if isinstance(value, str):
+        return bytes(12) + bytes.fromhex(value[2:])
+    return value.to_bytes(32, "big")
+
+
+def test_decode_transfer_calldata_should_read_recipient_and_value():
+    # Arrangement
+    transfer = TRANSFER + _word(USER) + _word(7)
+    transfer_from = TRANSFER_FROM + _word(OTHER) + _word(USER) + _word(9)
+
+    # Action & Assertion
+    assert decode_transfer_calldata(transfer) == (to_address_key(USER), 7)
+    assert decode_transfer_calldata(transfer_from) == (to_address_key(USER), 9)
+    assert decode_transfer_calldata(TRANSFER + _word(USER)) is None
+    assert decode_transfer_calldata(b"") is None
+
+
+def test_filter_transfer_transactions_should_keep_accepted_recipients():
+    # Arrangement
+    transactions = [
+        ("0x01", 1, TOKEN, 0, TRANSFER + _word(OTHER) + _word(1)),
+        ("0x02", 1, TOKEN, 0, TRANSFER + _word(USER) + _word(2)),
+        ("0x03", 1, USER, 3, b""),
+        ("0x04", 1, OTHER, 4, b""),
+        ("0x05", 1, None, 0, TRANSFER + _word(USER) + _word(5)),
+    ]
+
+    # Action
+    matched = filter_transfer_transactions(transactions, frozenset([to_address_key(USER)]))
+
+    # Assertion
+    assert [tx[0] for tx in matched] == ["0x02", "0x03", "0x05"]
+
+
+def test_parse_block_transfers_should_checksum_recipients():
+    # Arrangement
+    transactions = [
+        ("0x02", 1, TOKEN, 0, TRANSFER + _word(USER.lower()) + _word(2)),
+        ("0x03", 1, USER, 3, b""),
+    ]
+
+    # Action
+    transfers, _ = parse_block_transfers("SEP", transactions)
+
+    # Assertion
+    assert [(transfer.to, transfer.value) for transfer in transfers] == [(USER, 2), (USER, 3)]
+
+
+def test_parse_block_transfers_should_only_decode_accepted_recipients():
+    # Arrangement
+    transactions = [
+        ("0x01", 1, TOKEN, 0, TRANSFER + _word(OTHER) + _word(1)),
+        ("0x02", 1, TOKEN, 0, TRANSFER + _word(USER) + _word(2)),
+        ("0x04", 1, OTHER, 4, b""),
+    ]
+
+    # Action
+    transfers, _ = parse_block_transfers("SEP", transactions, frozenset([to_address_key(USER)]))
+
+    # Assertion
+    assert [transfer.tx_hash for transfer in transfers] == ["0x02"]
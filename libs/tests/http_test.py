@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+from clients.http import HTTP2_AVAILABLE, HTTPClientSettings, HTTPClientStats, get_http_client
+
+
+async def test_get_http_client_should_share_client_within_event_loop():
+    # Action
+    client = get_http_client()
+
+    # Assertion
+    assert client is get_http_client()
+    assert client is not await asyncio.to_thread(asyncio.run, _get_http_client())
+
+
+async def _get_http_client() -> httpx.AsyncClient:
+    return get_http_client()
+
+
+def test_http2_should_only_be_enabled_if_available():
+    # Action & Assertion
+    assert HTTPClientSettings(http2=True).http2 is HTTP2_AVAILABLE
+    assert HTTPClientSettings(http2=False).http2 is False
+
+
+async def test_stats_should_count_reused_connections():
+    # Arrangement
+    stats = HTTPClientStats()
+    requests = [httpx.Request("GET", "https://zex.example/api") for _ in range(3)]
+
+    # Action
+    for request in requests:
+        await stats.on_request(request)
+    await requests[0].extensions["trace"]("connection.connect_tcp.complete", {})
+
+    # Assertion
+    assert stats.as_dict() == {"zex.example": {"requests": 3, "connections": 1, "reused": 2}}
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from clients import AdaptiveLimiter, is_rate_limit_error
+from clients.btc.exceptions import BTCRequestError
+
+
+class RateLimitError(Exception):
+    status = 429
+
+
+def test_is_rate_limit_error_should_follow_exception_cause():
+    # Arrangement
+    error = RuntimeError("wrapped")
+    error.__cause__ = BTCRequestError("Too many requests", status_code=429)
+
+    # Action & Assertion
+    assert is_rate_limit_error(error) is True
+    assert is_rate_limit_error(BTCRequestError("Not found", status_code=404)) is False
+
+
+async def test_limiter_should_bound_in_flight_calls():
+    # Arrangement
+    limiter = AdaptiveLimiter(2, max_limit=2)
+    max_in_flight = 0
+
+    async def call():
+        nonlocal max_in_flight
+        max_in_flight = max(max_in_flight, limiter.in_flight)
+        await asyncio.sleep(0)
+
+    # Action
+    await asyncio.gather(*[limiter.submit(call) for _ in range(10)])
+
+    # Assertion
+    assert max_in_flight == 2
+    assert limiter.in_flight == 0
+
+
+async def test_limiter_should_grow_while_calls_are_fast():
+    # Arrangement
+    limiter = AdaptiveLimiter(1, max_limit=10, target_latency=10)
+
+    async def call():
+        return True
+
+    # Action
+    for _ in range(10):
+        await limiter.submit(call)
+
+    # Assertion
+    assert limiter.limit > 1
+
+
+async def test_limiter_should_shrink_and_retry_on_rate_limit():
+    # Arrangement
+    limiter = AdaptiveLimiter(8, max_limit=8, retry_delay=0)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RateLimitError()
+        return calls
+
+    # Action
+    result = await limiter.submit(call)
+
+    # Assertion
+    assert result == 2
+    assert limiter.limit == 4
+
+
+async def test_limiter_should_raise_when_retries_are_exhausted():
+    # Arrangement
+    limiter = AdaptiveLimiter(4, max_retries=1, retry_delay=0)
+
+    async def call():
+        raise RateLimitError()
+
+    # Action & Assertion
+    with pytest.raises(RateLimitError):
+        await limiter.submit(call)
+    assert limiter.limit == 1
@@ -0,0 +1,58 @@
+import pytest
+
+from zexporta.utils.batch_size import BatchSizeController
+
+
+def _controller(size: int = 10) -> BatchSizeController:
+    return BatchSizeController(size, min_size=2, max_size=12, target_latency=5, increase=1, decrease=0.5)
+
+
+@pytest.mark.parametrize(
+    argnames=["size", "latency", "full", "expected_decision", "expected_size"],
+    argvalues=[
+        (10, 1, True, "grow", 11),
+        (12, 1, True, "hold", 12),
+        (10, 1, False, "hold", 10),
+        (10, 6, True, "shrink", 5),
+        (10, 6, False, "shrink", 5),
+        (3, 6, True, "shrink", 2),
+        (2, 6, True, "hold", 2),
+    ],
+    ids=[
+        "full_batch_within_target_should_grow",
+        "full_batch_at_max_size_should_hold",
+        "partial_batch_within_target_should_hold",
+        "full_batch_over_target_should_shrink",
+        "partial_batch_over_target_should_shrink",
+        "shrink_should_stop_at_min_size",
+        "batch_at_min_size_over_target_should_hold",
+    ],
+)
+def test_record_success(size: int, latency: float, full: bool, expected_decision: str, expected_size: int):
+    # Arrangement
+    controller = _controller(size)
+
+    # Action
+    decision = controller.record_success(latency, full=full)
+
+    # Assertion
+    assert decision == expected_decision
+    assert controller.size == expected_size
+
+
+def test_record_failure_should_shrink():
+    # Arrangement
+    controller = _controller(10)
+
+    # Action
+    decision = controller.record_failure()
+
+    # Assertion
+    assert decision == "shrink"
+    assert controller.stats() == {
+        "size": 5,
+        "grows": 0,
+        "shrinks": 1,
+        "last_decision": "shrink",
+        "last_latency": None,
+    }
@@ -3,10 +3,13 @@ import os
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from clients import BTCConfig, EVMConfig
 from clients.abstract import ChainAsyncClient
 from pymongo import AsyncMongoClient
 from testcontainers.mongodb import MongoDbContainer
 
+from zexporta.custom_types import Deposit, DepositStatus, EVMTransfer
+from zexporta.explorer import get_token_decimals_cache
 from zexporta.utils.logger import ChainLoggerAdapter
 
 from .mock import MockChainConfig
@@ -30,6 +33,12 @@ async def drop_mongo(setup_mongo):
         await db_connection.drop_database(os.environ["MONGO_DBNAME"])
 
 
+@pytest.fixture(autouse=True, scope="function")
+def clear_token_decimals_cache():
+    get_token_decimals_cache.cache_clear()
+    yield
+
+
 @pytest.fixture(autouse=True, scope="session")
 def disable_asyncio_sleep():
     with patch("asyncio.sleep", new=AsyncMock(spec=asyncio.sleep)):
@@ -51,3 +60,51 @@ def mock_client(mock_chain_config):
 @pytest.fixture
 def mock_logger():
     yield MagicMock(spec=ChainLoggerAdapter)
+
+
+@pytest.fixture
+def evm_chain_config():
+    yield EVMConfig(
+        private_rpc="http://example.com",
+        chain_symbol="SEP",
+        vault_address="0x0000000000000000000000000000000000000000",
+        chain_id=11155111,
+        native_decimal=18,
+    )
+
+
+@pytest.fixture
+def btc_chain_config():
+    yield BTCConfig(
+        private_rpc="http://example.com",
+        private_indexer_rpc="http://example.com",
+        chain_symbol="BTC",
+        vault_address="",
+    )
+
+
+@pytest.fixture
+def evm_deposit():
+    def make_evm_deposit(
+        tx_hash: str,
+        block_number: int,
+        value: int = 10,
+        status: DepositStatus = DepositStatus.PENDING,
+        log_index: int | None = None,
+    ) -> Deposit:
+        return Deposit(
+            transfer=EVMTransfer(
+                tx_hash=tx_hash,
+                value=value,
+                chain_symbol="SEP",
+                token="0x0000000000000000000000000000000000000001",
+                to="0x0000000000000000000000000000000000000002",
+                block_number=block_number,
+                log_index=log_index,
+            ),
+            user_id=1,
+            decimals=18,
+            status=status,
+        )
+
+    yield make_evm_deposit
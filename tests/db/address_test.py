@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+from zexporta.custom_types import UserAddress
+from zexporta.db.address import (
+    AddressIndex,
+    get_collection,
+    get_users_address_to_insert,
+    insert_many_user_address,
+    iter_users_address_to_insert,
+)
+
+
+def _user_address(user_id: int) -> UserAddress:
+    return UserAddress(user_id=user_id, address=f"0x{user_id:040x}")
+
+
+async def test_address_index_refresh_should_load_only_new_users(evm_chain_config):
+    # Arrangement
+    index = AddressIndex(evm_chain_config)
+    await insert_many_user_address(evm_chain_config, [_user_address(user_id) for user_id in range(3)])
+    await index.refresh()
+    # Not seen by the incremental refresh: already indexed users are not read again.
+    await get_collection(evm_chain_config).update_one({"user_id": 0}, {"$set": {"is_active": False}})
+    await insert_many_user_address(evm_chain_config, [_user_address(user_id) for user_id in range(3, 5)])
+
+    # Action
+    addresses = await index.refresh()
+
+    # Assertion
+    assert index.last_user_id == 4
+    assert addresses == {_user_address(user_id).address: user_id for user_id in range(5)}
+
+
+async def test_address_index_refresh_should_query_above_last_user_id(evm_chain_config):
+    # Arrangement
+    index = AddressIndex(evm_chain_config)
+    await insert_many_user_address(evm_chain_config, [_user_address(user_id) for user_id in range(3)])
+    await index.refresh()
+    collection = get_collection(evm_chain_config)
+
+    # Action
+    with patch.object(collection, "find", wraps=collection.find) as find:
+        await index.refresh()
+
+    # Assertion
+    assert find.call_args.args[0] == {"is_active": True, "user_id": {"$gt": 2}}
+
+
+async def test_address_index_reload_should_drop_deactivated_addresses(evm_chain_config):
+    # Arrangement
+    index = AddressIndex(evm_chain_config)
+    await insert_many_user_address(evm_chain_config, [_user_address(user_id) for user_id in range(3)])
+    await index.refresh()
+    await get_collection(evm_chain_config).update_one({"user_id": 0}, {"$set": {"is_active": False}})
+
+    # Action
+    addresses = await index.reload()
+
+    # Assertion
+    assert addresses == {_user_address(user_id).address: user_id for user_id in range(1, 3)}
+
+
+async def test_address_index_refresh_should_drop_deactivated_addresses_after_reload_interval(evm_chain_config):
+    # Arrangement
+    index = AddressIndex(evm_chain_config, reload_interval=0)
+    await insert_many_user_address(evm_chain_config, [_user_address(user_id) for user_id in range(3)])
+    previous_addresses = await index.refresh()
+    await get_collection(evm_chain_config).update_one({"user_id": 0}, {"$set": {"is_active": False}})
+
+    # Action
+    addresses = await index.refresh()
+
+    # Assertion
+    assert addresses == {_user_address(user_id).address: user_id for user_id in range(1, 3)}
+    assert len(previous_addresses) == 3
+
+
+async def test_iter_users_address_to_insert_should_match_sequential_derivation(evm_chain_config):
+    # Arrangement
+    expected_result = get_users_address_to_insert(evm_chain_config, 5, 30)
+
+    # Action
+    with patch("zexporta.db.address.ADDRESS_DERIVATION_CHUNK_SIZE", 4):
+        chunks = [chunk async for chunk in iter_users_address_to_insert(evm_chain_config, 5, 30)]
+
+    # Assertion
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4, 4, 4, 4, 2]
+    assert [address for chunk in chunks for address in chunk] == expected_result
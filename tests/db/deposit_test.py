@@ -0,0 +1,243 @@
+import asyncio
+
+from zexporta.custom_types import BTCTransfer, Deposit, DepositStatus, WriteOutcome
+from zexporta.db.deposit import (
+    claim_finalized_deposits,
+    find_deposit_by_status,
+    get_block_numbers_by_status,
+    get_collection,
+    get_pending_deposits_block_number,
+    insert_deposits_if_not_exists,
+    iter_block_numbers_by_status,
+    release_claimed_deposits,
+    upsert_deposits,
+)
+
+
+def _btc_deposit(tx_hash: str, index: int, block_number: int = 100) -> Deposit:
+    return Deposit(
+        transfer=BTCTransfer(
+            tx_hash=tx_hash,
+            value=10,
+            chain_symbol="BTC",
+            token="0x0000000000000000000000000000000000000000",
+            to=f"address{index}",
+            block_number=block_number,
+            index=index,
+        ),
+        user_id=index,
+        decimals=8,
+        status=DepositStatus.PENDING,
+    )
+
+
+async def test_insert_deposits_should_store_every_log_of_evm_transaction(evm_chain_config, evm_deposit):
+    # Arrangement
+    deposits = [evm_deposit("0x1", block_number=100, value=10 * (i + 1), log_index=i) for i in range(3)]
+
+    # Action
+    outcome = await insert_deposits_if_not_exists(evm_chain_config, deposits)
+    await upsert_deposits(evm_chain_config, deposits)
+
+    # Assertion
+    stored = await find_deposit_by_status(evm_chain_config, DepositStatus.PENDING)
+    assert outcome.inserted == 3
+    assert sorted((deposit.transfer.log_index, deposit.transfer.value) for deposit in stored) == [
+        (0, 10),
+        (1, 20),
+        (2, 30),
+    ]
+
+
+async def test_insert_deposits_should_store_every_output_of_btc_transaction(btc_chain_config):
+    # Arrangement
+    deposits = [_btc_deposit("0x1", index=0), _btc_deposit("0x1", index=1)]
+
+    # Action
+    outcome = await insert_deposits_if_not_exists(btc_chain_config, deposits)
+
+    # Assertion
+    stored = await find_deposit_by_status(btc_chain_config, DepositStatus.PENDING)
+    assert outcome.inserted == 2
+    assert sorted(deposit.transfer.index for deposit in stored) == [0, 1]
+
+
+async def test_insert_deposits_should_not_overwrite_existing_deposit(evm_chain_config, evm_deposit):
+    # Arrangement
+    await insert_deposits_if_not_exists(evm_chain_config, [evm_deposit("0x1", block_number=100)])
+
+    # Action
+    outcome = await insert_deposits_if_not_exists(
+        evm_chain_config,
+        [evm_deposit("0x1", block_number=100, status=DepositStatus.REORG), evm_deposit("0x2", block_number=101)],
+    )
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=1, matched=1, modified=0)
+    pending = await find_deposit_by_status(evm_chain_config, DepositStatus.PENDING)
+    assert [deposit.transfer.tx_hash for deposit in pending] == ["0x1", "0x2"]
+
+
+async def test_upsert_deposits_should_overwrite_existing_deposit(evm_chain_config, evm_deposit):
+    # Arrangement
+    await insert_deposits_if_not_exists(evm_chain_config, [evm_deposit("0x1", block_number=100)])
+
+    # Action
+    outcome = await upsert_deposits(
+        evm_chain_config,
+        [evm_deposit("0x1", block_number=100, status=DepositStatus.REORG), evm_deposit("0x2", block_number=101)],
+    )
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=1, matched=1, modified=1)
+    reorg = await find_deposit_by_status(evm_chain_config, DepositStatus.REORG)
+    assert [deposit.transfer.tx_hash for deposit in reorg] == ["0x1"]
+
+
+async def test_upsert_deposits_should_update_only_same_btc_output(btc_chain_config):
+    # Arrangement
+    await insert_deposits_if_not_exists(btc_chain_config, [_btc_deposit("0x1", index=0), _btc_deposit("0x1", index=1)])
+    deposit = _btc_deposit("0x1", index=1)
+    deposit.status = DepositStatus.FINALIZED
+
+    # Action
+    outcome = await upsert_deposits(btc_chain_config, [deposit])
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=0, matched=1, modified=1)
+    pending = await find_deposit_by_status(btc_chain_config, DepositStatus.PENDING)
+    finalized = await find_deposit_by_status(btc_chain_config, DepositStatus.FINALIZED)
+    assert [deposit.transfer.index for deposit in pending] == [0]
+    assert [deposit.transfer.index for deposit in finalized] == [1]
+
+
+async def _find_block_numbers(chain, query: dict) -> set[int]:
+    # The find-and-dedupe the aggregation replaced.
+    return {record["transfer"]["block_number"] async for record in get_collection(chain).find(query)}
+
+
+async def test_get_block_numbers_by_status_should_match_find_and_dedupe(evm_chain_config, evm_deposit):
+    # Arrangement
+    block_numbers = [105, 101, 103, 101, 110, 103, 102]
+    await insert_deposits_if_not_exists(
+        evm_chain_config,
+        [evm_deposit(f"0x{i}", block_number=block_number) for i, block_number in enumerate(block_numbers)],
+    )
+    await insert_deposits_if_not_exists(
+        evm_chain_config, [evm_deposit("0xf", block_number=104, status=DepositStatus.FINALIZED)]
+    )
+    query = {"transfer.chain_symbol": "SEP", "status": DepositStatus.PENDING.value}
+
+    # Action
+    result = await get_block_numbers_by_status(evm_chain_config, DepositStatus.PENDING)
+    pending_result = await get_pending_deposits_block_number(evm_chain_config, finalized_block_number=104)
+
+    # Assertion
+    assert result == sorted(await _find_block_numbers(evm_chain_config, query))
+    assert result == [101, 102, 103, 105, 110]
+    assert pending_result == sorted(
+        await _find_block_numbers(evm_chain_config, {**query, "transfer.block_number": {"$lte": 104}})
+    )
+
+
+async def test_iter_block_numbers_by_status_should_yield_ascending_batches(evm_chain_config, evm_deposit):
+    # Arrangement
+    block_numbers = [107, 101, 103, 101, 105, 102, 106, 104]
+    await insert_deposits_if_not_exists(
+        evm_chain_config,
+        [evm_deposit(f"0x{i}", block_number=block_number) for i, block_number in enumerate(block_numbers)],
+    )
+
+    # Action
+    batches = [
+        batch async for batch in iter_block_numbers_by_status(evm_chain_config, DepositStatus.PENDING, batch_size=3)
+    ]
+
+    # Assertion
+    assert batches == [[101, 102, 103], [104, 105, 106], [107]]
+
+
+async def test_find_deposit_by_status_should_return_limit_oldest_deposits(evm_chain_config, evm_deposit):
+    # Arrangement
+    block_numbers = [105, 101, 104, 102, 103]
+    await insert_deposits_if_not_exists(
+        evm_chain_config,
+        [evm_deposit(f"0x{i}", block_number=block_number) for i, block_number in enumerate(block_numbers)],
+    )
+    await insert_deposits_if_not_exists(
+        evm_chain_config, [evm_deposit("0xf", block_number=100, status=DepositStatus.FINALIZED)]
+    )
+
+    # Action
+    deposits = await find_deposit_by_status(evm_chain_config, DepositStatus.PENDING, limit=3)
+
+    # Assertion
+    assert [deposit.transfer.block_number for deposit in deposits] == [101, 102, 103]
+
+
+async def _insert_finalized_deposits(chain, evm_deposit, count: int):
+    await insert_deposits_if_not_exists(
+        chain,
+        [evm_deposit(f"0x{i}", block_number=100 + i, status=DepositStatus.FINALIZED) for i in range(count)],
+    )
+
+
+async def test_concurrent_claims_should_never_share_a_deposit(evm_chain_config, evm_deposit):
+    # Arrangement
+    await _insert_finalized_deposits(evm_chain_config, evm_deposit, 5)
+
+    # Action
+    claims = await asyncio.gather(
+        *[claim_finalized_deposits(evm_chain_config, claim, limit=2) for claim in ("a", "b", "c")]
+    )
+
+    # Assertion
+    claimed = [transfer["tx_hash"] for transfers in claims for transfer in transfers]
+    assert sorted(claimed) == [f"0x{i}" for i in range(5)]
+    assert all(len(transfers) <= 2 for transfers in claims)
+    assert await find_deposit_by_status(evm_chain_config, DepositStatus.FINALIZED) == []
+
+
+async def test_claim_should_take_oldest_finalized_deposits_in_order(evm_chain_config, evm_deposit):
+    # Arrangement
+    await _insert_finalized_deposits(evm_chain_config, evm_deposit, 3)
+
+    # Action
+    transfers = await claim_finalized_deposits(evm_chain_config, "a", limit=2)
+
+    # Assertion
+    assert transfers == [{"tx_hash": "0x0", "block_number": 100}, {"tx_hash": "0x1", "block_number": 101}]
+    processing = await find_deposit_by_status(evm_chain_config, DepositStatus.PROCESSING)
+    assert [deposit.transfer.tx_hash for deposit in processing] == ["0x0", "0x1"]
+
+
+async def test_release_should_return_claimed_deposits_to_be_claimed_again(evm_chain_config, evm_deposit):
+    # Arrangement
+    await _insert_finalized_deposits(evm_chain_config, evm_deposit, 3)
+    await claim_finalized_deposits(evm_chain_config, "a", limit=2)
+    await claim_finalized_deposits(evm_chain_config, "b", limit=1)
+
+    # Action
+    released = await release_claimed_deposits(evm_chain_config, "a")
+    reclaimed = await claim_finalized_deposits(evm_chain_config, "c", limit=3)
+
+    # Assertion
+    assert released == 2
+    assert [transfer["tx_hash"] for transfer in reclaimed] == ["0x0", "0x1"]
+    assert await get_collection(evm_chain_config).count_documents({"claim": "a"}) == 0
+
+
+async def test_release_without_claim_should_release_every_claim_with_status(evm_chain_config, evm_deposit):
+    # Arrangement
+    await _insert_finalized_deposits(evm_chain_config, evm_deposit, 3)
+    await claim_finalized_deposits(evm_chain_config, "a", limit=1)
+    await claim_finalized_deposits(evm_chain_config, "b", limit=1)
+
+    # Action
+    released = await release_claimed_deposits(evm_chain_config, status=DepositStatus.REORG)
+
+    # Assertion
+    assert released == 2
+    reorg = await find_deposit_by_status(evm_chain_config, DepositStatus.REORG)
+    assert [deposit.transfer.tx_hash for deposit in reorg] == ["0x0", "0x1"]
+    assert await get_collection(evm_chain_config).count_documents({"claim": {"$exists": True}}) == 0
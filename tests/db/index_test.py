@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from zexporta.db.index import ensure_indexes, get_collections_indexes
+
+
+async def _get_indexes(chains) -> dict[str, dict[str, tuple[list, bool]]]:
+    return {
+        collection_name: {
+            name: (list(information["key"]), information.get("unique", False))
+            for name, information in (await collection.index_information()).items()
+        }
+        for collection_name, (collection, _) in get_collections_indexes(chains).items()
+    }
+
+
+async def test_ensure_indexes_should_create_declared_indexes(evm_chain_config, btc_chain_config):
+    # Arrangement
+    chains = [evm_chain_config, btc_chain_config]
+
+    # Action
+    await ensure_indexes(chains)
+
+    # Assertion
+    indexes = await _get_indexes(chains)
+    for collection_name, (_, index_models) in get_collections_indexes(chains).items():
+        expected_result = {
+            "_id_": ([("_id", 1)], False),
+            **{
+                model.document["name"]: (list(model.document["key"].items()), model.document.get("unique", False))
+                for model in index_models
+            },
+        }
+        assert indexes[collection_name] == expected_result
+
+
+async def test_ensure_indexes_should_be_idempotent(evm_chain_config, btc_chain_config):
+    # Arrangement
+    chains = [evm_chain_config, btc_chain_config]
+    await ensure_indexes(chains)
+    indexes = await _get_indexes(chains)
+
+    # Action
+    await ensure_indexes(chains)
+
+    # Assertion
+    assert await _get_indexes(chains) == indexes
+
+
+async def test_ensure_indexes_should_report_usage_of_every_chain_of_a_generator(evm_chain_config, btc_chain_config):
+    # Arrangement
+    chains = [evm_chain_config, btc_chain_config]
+
+    # Action
+    with patch("zexporta.db.index.get_index_usage", return_value={}) as get_index_usage:
+        await ensure_indexes(chain for chain in chains)
+
+    # Assertion
+    assert get_index_usage.call_args.args[0] == chains
@@ -0,0 +1,45 @@
+from zexporta.custom_types import UTXO, UTXOStatus, WriteOutcome
+from zexporta.db.utxo import find_utxo_by_status, insert_utxos_if_not_exists, upsert_utxos
+
+
+def _utxo(tx_hash: str, index: int, amount: int = 1000, status: UTXOStatus = UTXOStatus.UNSPENT) -> UTXO:
+    return UTXO(status=status, tx_hash=tx_hash, amount=amount, index=index, address="address", salt=index)
+
+
+async def test_insert_utxos_should_not_overwrite_existing_utxo():
+    # Arrangement
+    await insert_utxos_if_not_exists([_utxo("0x1", index=0)])
+
+    # Action
+    outcome = await insert_utxos_if_not_exists([_utxo("0x1", index=0, status=UTXOStatus.SPEND), _utxo("0x1", index=1)])
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=1, matched=1, modified=0)
+    assert await find_utxo_by_status(UTXOStatus.SPEND) == []
+    assert len(await find_utxo_by_status(UTXOStatus.UNSPENT)) == 2
+
+
+async def test_upsert_utxos_should_overwrite_existing_utxo():
+    # Arrangement
+    await insert_utxos_if_not_exists([_utxo("0x1", index=0), _utxo("0x1", index=1)])
+
+    # Action
+    outcome = await upsert_utxos([_utxo("0x1", index=0, status=UTXOStatus.SPEND)])
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=0, matched=1, modified=1)
+    assert [utxo.index for utxo in await find_utxo_by_status(UTXOStatus.SPEND)] == [0]
+    assert [utxo.index for utxo in await find_utxo_by_status(UTXOStatus.UNSPENT)] == [1]
+
+
+async def test_find_utxo_by_status_should_return_limit_largest_utxos():
+    # Arrangement
+    amounts = [3000, 7000, 1000, 9000, 5000]
+    await insert_utxos_if_not_exists([_utxo("0x1", index=i, amount=amount) for i, amount in enumerate(amounts)])
+    await insert_utxos_if_not_exists([_utxo("0x2", index=0, amount=8000, status=UTXOStatus.SPEND)])
+
+    # Action
+    utxos = await find_utxo_by_status(UTXOStatus.UNSPENT, limit=3)
+
+    # Assertion
+    assert [utxo.amount for utxo in utxos] == [9000, 7000, 5000]
@@ -0,0 +1,40 @@
+from zexporta.custom_types import EVMWithdrawRequest, WithdrawStatus, WriteOutcome
+from zexporta.db.withdraw import find_withdraws_by_status, insert_withdraws_if_not_exists, upsert_withdraws
+
+
+def _withdraw(nonce: int, status: WithdrawStatus = WithdrawStatus.PENDING) -> EVMWithdrawRequest:
+    return EVMWithdrawRequest(
+        amount=10,
+        recipient="0x0000000000000000000000000000000000000002",
+        status=status,
+        chain_symbol="SEP",
+        nonce=nonce,
+        token_address="0x0000000000000000000000000000000000000001",
+        chain_id=11155111,
+    )
+
+
+async def test_insert_withdraws_should_not_overwrite_existing_withdraw(evm_chain_config):
+    # Arrangement
+    await insert_withdraws_if_not_exists([_withdraw(0)])
+
+    # Action
+    outcome = await insert_withdraws_if_not_exists([_withdraw(0, status=WithdrawStatus.SUCCESSFUL), _withdraw(1)])
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=1, matched=1, modified=0)
+    pending = await find_withdraws_by_status(WithdrawStatus.PENDING, evm_chain_config)
+    assert [withdraw.nonce for withdraw in pending] == [0, 1]
+
+
+async def test_upsert_withdraws_should_overwrite_existing_withdraw(evm_chain_config):
+    # Arrangement
+    await insert_withdraws_if_not_exists([_withdraw(0), _withdraw(1)])
+
+    # Action
+    outcome = await upsert_withdraws([_withdraw(0, status=WithdrawStatus.SUCCESSFUL)])
+
+    # Assertion
+    assert outcome == WriteOutcome(inserted=0, matched=1, modified=1)
+    pending = await find_withdraws_by_status(WithdrawStatus.PENDING, evm_chain_config)
+    assert [withdraw.nonce for withdraw in pending] == [1]
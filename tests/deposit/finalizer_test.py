@@ -0,0 +1,56 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from zexporta.custom_types import DepositStatus
+from zexporta.db.deposit import find_deposit_by_status, insert_deposits_if_not_exists
+from zexporta.deposit.finalizer import finalize_blocks_by_tx_hash, update_finalized_deposits
+
+
+async def _tx_hashes(chain, status: DepositStatus) -> list[str]:
+    return [deposit.transfer.tx_hash for deposit in await find_deposit_by_status(chain, status)]
+
+
+async def test_finalize_blocks_by_tx_hash_should_reorg_only_given_blocks(evm_chain_config, mock_client, evm_deposit):
+    # Arrangement
+    await insert_deposits_if_not_exists(
+        evm_chain_config,
+        [
+            evm_deposit("0x1", block_number=100),
+            evm_deposit("0x2", block_number=101),
+            evm_deposit("0x3", block_number=102),
+        ],
+    )
+    mock_client.get_block_tx_hash.side_effect = lambda block_number, **kwargs: {100: ["0x1"], 102: []}[block_number]
+
+    # Action
+    finalized = await finalize_blocks_by_tx_hash(evm_chain_config, mock_client, 110, [100, 102])
+
+    # Assertion
+    assert finalized == 1
+    assert await _tx_hashes(evm_chain_config, DepositStatus.FINALIZED) == ["0x1"]
+    assert await _tx_hashes(evm_chain_config, DepositStatus.PENDING) == ["0x2"]
+    assert await _tx_hashes(evm_chain_config, DepositStatus.REORG) == ["0x3"]
+
+
+async def test_update_finalized_deposits_should_wait_while_only_reorged_blocks_are_pending(
+    evm_deposit, evm_chain_config, mock_client
+):
+    # Arrangement
+    await insert_deposits_if_not_exists(evm_chain_config, [evm_deposit("0x1", block_number=100)])
+    mock_client.get_finalized_block_number.return_value = 110
+    sleep = AsyncMock(side_effect=asyncio.CancelledError)
+
+    # Action
+    with (
+        patch("zexporta.deposit.finalizer.get_async_client", return_value=mock_client),
+        patch("zexporta.deposit.finalizer.get_canonical_block_numbers", return_value=([], [100], [])),
+        patch("zexporta.deposit.finalizer.asyncio.sleep", sleep),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await update_finalized_deposits(evm_chain_config)
+
+    # Assertion
+    sleep.assert_awaited_once_with(evm_chain_config.delay)
+    assert await _tx_hashes(evm_chain_config, DepositStatus.PENDING) == ["0x1"]
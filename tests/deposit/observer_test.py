@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from clients.exceptions import EVMBlockNotFound
+
+from zexporta.custom_types import BlockHeader
+from zexporta.db.chain import get_last_observed_block, upsert_chain_last_observed_block
+from zexporta.deposit.observer import observe_deposit
+
+
+def _header(number: int) -> BlockHeader:
+    return BlockHeader(number=number, hash=f"0x{number}", parent_hash=f"0x{number - 1}")
+
+
+@pytest.mark.parametrize("error", [ValueError("invalid"), RuntimeError("unexpected")])
+async def test_observe_deposit_should_retry_when_fetching_headers_fails(evm_chain_config, mock_client, error):
+    # Arrangement
+    await upsert_chain_last_observed_block(evm_chain_config.chain_symbol, 100)
+    mock_client.get_latest_block_number.return_value = 101
+    sleep = AsyncMock(side_effect=asyncio.CancelledError)
+
+    # Action
+    with (
+        patch("zexporta.deposit.observer.get_async_client", return_value=mock_client),
+        patch("zexporta.deposit.observer.fetch_block_headers", side_effect=error),
+        patch("zexporta.deposit.observer.asyncio.sleep", sleep),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await observe_deposit(evm_chain_config)
+
+    # Assertion
+    sleep.assert_awaited_once()
+    assert await get_last_observed_block(evm_chain_config.chain_symbol) == 100
+
+
+async def test_observe_deposit_should_retry_when_fetching_last_block_hash_fails(evm_chain_config, mock_client):
+    # Arrangement
+    await upsert_chain_last_observed_block(evm_chain_config.chain_symbol, 100)
+    mock_client.get_latest_block_number.return_value = 101
+    mock_client.get_block_hash.side_effect = ValueError("invalid")
+    sleep = AsyncMock(side_effect=asyncio.CancelledError)
+
+    # Action
+    with (
+        patch("zexporta.deposit.observer.get_async_client", return_value=mock_client),
+        patch("zexporta.deposit.observer.fetch_block_headers", return_value=[_header(101)]),
+        patch("zexporta.deposit.observer.insert_new_address_to_db"),
+        patch("zexporta.deposit.observer.get_active_address", return_value={}),
+        patch("zexporta.deposit.observer.explorer", return_value=[]),
+        patch("zexporta.deposit.observer.asyncio.sleep", sleep),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await observe_deposit(evm_chain_config)
+
+    # Assertion
+    sleep.assert_awaited_once_with(10)
+    assert await get_last_observed_block(evm_chain_config.chain_symbol) == 100
+
+
+@pytest.mark.parametrize("error", [EVMBlockNotFound("not found"), ValueError("invalid"), RuntimeError("rate limited")])
+async def test_observe_deposit_should_retry_when_exploring_blocks_fails(evm_chain_config, mock_client, error):
+    # Arrangement
+    await upsert_chain_last_observed_block(evm_chain_config.chain_symbol, 100)
+    mock_client.get_latest_block_number.return_value = 101
+    sleep = AsyncMock(side_effect=asyncio.CancelledError)
+
+    # Action
+    with (
+        patch("zexporta.deposit.observer.get_async_client", return_value=mock_client),
+        patch("zexporta.deposit.observer.fetch_block_headers", return_value=[_header(101)]),
+        patch("zexporta.deposit.observer.insert_new_address_to_db"),
+        patch("zexporta.deposit.observer.get_active_address", return_value={}),
+        patch("zexporta.deposit.observer.explorer", side_effect=error),
+        patch("zexporta.deposit.observer.upsert_block_headers") as upsert_block_headers,
+        patch("zexporta.deposit.observer.asyncio.sleep", sleep),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await observe_deposit(evm_chain_config)
+
+    # Assertion
+    sleep.assert_awaited_once()
+    upsert_block_headers.assert_not_called()
+    mock_client.get_block_hash.assert_not_called()
+    assert await get_last_observed_block(evm_chain_config.chain_symbol) == 100
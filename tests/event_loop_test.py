@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from zexporta.utils.event_loop import get_background_loop, run_in_background_loop
+
+
+async def _running_loop() -> asyncio.AbstractEventLoop:
+    return asyncio.get_running_loop()
+
+
+async def _fail():
+    raise ValueError("invalid request")
+
+
+def test_run_in_background_loop_should_reuse_the_loop():
+    # Action
+    loops = [run_in_background_loop(_running_loop()) for _ in range(3)]
+
+    # Assertion
+    assert loops == [get_background_loop().loop] * 3
+
+
+def test_run_in_background_loop_should_raise_coroutine_errors():
+    # Action & Assertion
+    with pytest.raises(ValueError, match="invalid request"):
+        run_in_background_loop(_fail())
@@ -1,6 +1,9 @@
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from clients import AdaptiveLimiter
+from clients.exceptions import EVMTokenDecimalsNotFound
 
 from zexporta.db.token import get_decimals
 from zexporta.explorer import explorer, get_accepted_deposits, get_block_batches, get_token_decimals
@@ -186,3 +189,151 @@ async def test_explorer_with_transfers(mock_client, mock_logger):
         assert deposits[0].user_id == 1
         assert deposits[0].decimals == 18
         assert deposits[0].transfer == transfer1
+
+
+async def test_explorer_should_return_deposits_in_block_order(mock_client, mock_logger):
+    accepted_addresses = {"0xDEF": 1}
+    transfers = {
+        block_number: MockTransfer(
+            tx_hash=f"0x{block_number}", value=100, chain_symbol="ETH", token="0xABC", to="0xDEF", block_number=1
+        )
+        for block_number in range(1, 6)
+    }
+    release_first_block = asyncio.Event()
+
+    async def mock_extract_block_logic(block_number, **kwargs):
+        # The first block finishes last, later blocks must wait for it to be emitted.
+        if block_number == 1:
+            await release_first_block.wait()
+        elif block_number == 5:
+            release_first_block.set()
+        return [transfers[block_number]]
+
+    mock_client.is_transaction_successful.return_value = True
+    mock_client.get_token_decimals.return_value = 18
+
+    deposits = await explorer(
+        mock_client,
+        1,
+        5,
+        accepted_addresses,
+        mock_extract_block_logic,  # type: ignore
+        batch_size=5,
+        logger=mock_logger,
+    )
+
+    assert [deposit.transfer.tx_hash for deposit in deposits] == ["0x1", "0x2", "0x3", "0x4", "0x5"]
+
+
+async def test_get_accepted_deposits_should_use_known_transaction_status(mock_client):
+    # Arrangement
+    transfer1 = MockTransfer(
+        tx_hash="0x123", value=100, chain_symbol="ETH", token="0xABC", to="0xDEF", block_number=1, is_successful=True
+    )
+    transfer2 = MockTransfer(
+        tx_hash="0x456", value=200, chain_symbol="ETH", token="0xABC", to="0xDEF", block_number=1, is_successful=False
+    )
+    accepted_addresses = {"0xDEF": 1}
+    mock_client.get_token_decimals.return_value = 18
+
+    # Action
+    deposits = await get_accepted_deposits(mock_client, [transfer1, transfer2], accepted_addresses)
+
+    # Assertion
+    assert [deposit.transfer for deposit in deposits] == [transfer1]
+    mock_client.is_transaction_successful.assert_not_called()
+
+
+async def test_explorer_with_range_logic_should_extract_block_ranges(mock_client, mock_logger):
+    # Arrangement
+    accepted_addresses = {"0xDEF": 1}
+    mock_client.is_transaction_successful.return_value = True
+    mock_client.get_token_decimals.return_value = 18
+    extract_block_logic = AsyncMock(return_value=[])
+    extract_range_logic = AsyncMock(
+        side_effect=lambda from_block, to_block, **kwargs: [
+            MockTransfer(
+                tx_hash=f"0x{from_block}", value=100, chain_symbol="ETH", token="0xABC", to="0xDEF", block_number=1
+            )
+        ]
+    )
+
+    # Action
+    deposits = await explorer(
+        mock_client,
+        1,
+        12,
+        accepted_addresses,
+        extract_block_logic,
+        batch_size=5,
+        extract_range_logic=extract_range_logic,
+        logger=mock_logger,
+    )
+
+    # Assertion
+    extract_block_logic.assert_not_called()
+    assert [call.args for call in extract_range_logic.call_args_list] == [(1, 5), (6, 10), (11, 12)]
+    assert extract_range_logic.call_args.kwargs["accepted_addresses"] == accepted_addresses
+    assert [deposit.transfer.tx_hash for deposit in deposits] == ["0x1", "0x6", "0x11"]
+
+
+async def test_get_token_decimals_should_lookup_concurrent_misses_once(mock_client):
+    # Arrangement
+    token_address = "0xABC"
+    mock_client.get_token_decimals.return_value = 6
+
+    # Action
+    results = await asyncio.gather(*[get_token_decimals(mock_client, token_address) for _ in range(5)])
+
+    # Assertion
+    assert results == [6] * 5
+    mock_client.get_token_decimals.assert_called_once_with(token_address)
+
+
+async def test_get_accepted_deposits_should_skip_tokens_without_decimals(mock_client):
+    # Arrangement
+    transfer1 = MockTransfer(tx_hash="0x123", value=100, chain_symbol="ETH", token="0xNFT", to="0xDEF", block_number=1)
+    transfer2 = MockTransfer(tx_hash="0x456", value=100, chain_symbol="ETH", token="0xNFT", to="0xDEF", block_number=2)
+    accepted_addresses = {"0xDEF": 1}
+    mock_client.is_transaction_successful.return_value = True
+    mock_client.get_token_decimals.side_effect = EVMTokenDecimalsNotFound()
+
+    # Action
+    deposits = await get_accepted_deposits(mock_client, [transfer1, transfer2], accepted_addresses)
+
+    # Assertion
+    assert deposits == []
+    mock_client.get_token_decimals.assert_called_once()
+
+
+async def test_get_accepted_deposits_should_check_each_transaction_once(mock_client):
+    # Arrangement
+    transfers = [
+        MockTransfer(tx_hash="0x123", value=100, chain_symbol="ETH", token="0xABC", to="0xDEF", block_number=1),
+        MockTransfer(tx_hash="0x456", value=300, chain_symbol="ETH", token="0xXYZ", to="0xDEF", block_number=1),
+        MockTransfer(tx_hash="0x123", value=200, chain_symbol="ETH", token="0xABC", to="0xGHI", block_number=1),
+    ]
+    accepted_addresses = {"0xDEF": 1, "0xGHI": 2}
+    mock_client.is_transaction_successful.return_value = True
+    mock_client.get_token_decimals.return_value = 18
+
+    # Action
+    deposits = await get_accepted_deposits(mock_client, transfers, accepted_addresses, max_concurrency=1)
+
+    # Assertion
+    assert [(deposit.user_id, deposit.transfer.value) for deposit in deposits] == [(1, 100), (1, 300), (2, 200)]
+    assert mock_client.is_transaction_successful.call_count == 2
+    assert mock_client.get_token_decimals.call_count == 2
+
+
+async def test_explorer_should_keep_learned_concurrency_of_given_limiter(mock_client, mock_extract_block_logic):
+    # Arrangement
+    limiter = AdaptiveLimiter(1, max_limit=20)
+
+    # Action
+    for from_block in range(1, 100, 20):
+        await explorer(mock_client, from_block, from_block + 19, {}, mock_extract_block_logic, limiter=limiter)
+
+    # Assertion
+    assert mock_extract_block_logic.await_count == 100
+    assert limiter.limit > 1
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from collections import deque
+
+from zexporta.utils.nonce_pool import NoncePool
+
+PARTY = ["1", "2"]
+
+
+def _request_nonces(calls: list[int]):
+    async def request_nonces(party, number_of_nonces):
+        start = sum(calls)
+        calls.append(number_of_nonces)
+        return {
+            node_id: {"status": "SUCCESSFUL", "data": [f"{node_id}-{start + i}" for i in range(number_of_nonces)]}
+            for node_id in party
+        }
+
+    return request_nonces
+
+
+async def test_get_should_hand_out_each_nonce_once():
+    # Arrangement
+    calls = []
+    pool = NoncePool(_request_nonces(calls), batch_size=10, low_watermark=10)
+
+    # Action
+    nonces = [await pool.get(PARTY) for _ in range(3)]
+
+    # Assertion
+    assert calls == [10]
+    assert nonces == [{"1": f"1-{i}", "2": f"2-{i}"} for i in range(3)]
+    assert pool.depth(PARTY) == 7
+
+
+async def test_get_should_refill_below_low_watermark_with_signing_rate():
+    # Arrangement
+    calls = []
+    pool = NoncePool(_request_nonces(calls), batch_size=4, low_watermark=2)
+
+    # Action
+    nonces = [await pool.get(PARTY) for _ in range(3)]
+    await asyncio.gather(*pool._refills.values())
+
+    # Assertion
+    # Nothing was consumed yet for the first refill, then 1 and 3 nonces were used within the ttl.
+    assert calls == [2, 2, 3]
+    assert nonces[-1] == {"1": "1-2", "2": "2-2"}
+    assert pool.depth(PARTY) == 4
+    assert pool.stats()["consumed"] == 3
+
+
+def test_refill_size_should_be_capped_by_batch_size_and_forget_old_consumption():
+    # Arrangement
+    pool = NoncePool(_request_nonces([]), batch_size=4, low_watermark=1, ttl=60)
+    now = time.monotonic()
+    pool._consumed_at[tuple(PARTY)] = deque([now - 120, now - 90, now - 1])
+    slow_size = pool.refill_size(PARTY)
+    pool._consumed_at[tuple(PARTY)].extend([now] * 10)
+
+    # Action
+    fast_size = pool.refill_size(PARTY)
+
+    # Assertion
+    assert slow_size == 1
+    assert fast_size == 4
+
+
+async def test_get_should_drop_expired_nonces():
+    # Arrangement
+    calls = []
+    pool = NoncePool(_request_nonces(calls), batch_size=4, low_watermark=4, ttl=60)
+    await pool.get(PARTY)
+    pooled = pool._pools[tuple(PARTY)]
+    aged = [(fetched_at - 120, nonces) for fetched_at, nonces in pooled]
+    pooled.clear()
+    pooled.extend(aged)
+
+    # Action
+    nonces = await pool.get(PARTY)
+
+    # Assertion
+    assert calls == [4, 4]
+    assert nonces == {"1": "1-4", "2": "2-4"}
+    assert pool.stats()["expired"] == 3
@@ -0,0 +1,58 @@
+from zexporta.custom_types import BlockHeader
+from zexporta.db.block_header import upsert_block_headers
+from zexporta.reorg import find_fork_point, get_canonical_block_numbers, is_linked
+
+
+def _header(number: int, branch: str = "a") -> BlockHeader:
+    return BlockHeader(number=number, hash=f"{branch}{number}", parent_hash=f"{branch}{number - 1}")
+
+
+def test_is_linked():
+    # Arrangement
+    headers = [_header(i) for i in range(10, 15)]
+
+    # Action & Assertion
+    assert is_linked(headers)
+    assert not is_linked([*headers, _header(15, branch="b")])
+
+
+async def test_find_fork_point_should_return_last_canonical_block(mock_client):
+    # Arrangement
+    chain_symbol = mock_client.chain.chain_symbol
+    await upsert_block_headers(chain_symbol, [_header(i) for i in range(100, 150)])
+    mock_client.get_block_hash.side_effect = lambda number: f"{'a' if number <= 120 else 'b'}{number}"
+
+    # Action
+    fork_point = await find_fork_point(mock_client, chain_symbol, 149)
+
+    # Assertion
+    assert fork_point == 120
+
+
+async def test_find_fork_point_should_return_none_if_reorg_is_deeper_than_stored_headers(mock_client):
+    # Arrangement
+    chain_symbol = mock_client.chain.chain_symbol
+    await upsert_block_headers(chain_symbol, [_header(i) for i in range(100, 110)])
+    mock_client.get_block_hash.side_effect = lambda number: f"b{number}"
+
+    # Action
+    fork_point = await find_fork_point(mock_client, chain_symbol, 109)
+
+    # Assertion
+    assert fork_point is None
+
+
+async def test_get_canonical_block_numbers(mock_client):
+    # Arrangement
+    chain_symbol = mock_client.chain.chain_symbol
+    await upsert_block_headers(chain_symbol, [_header(i) for i in range(100, 110)])
+    mock_client.get_block_hash.side_effect = lambda number: f"{'a' if number <= 105 else 'b'}{number}"
+
+    # Action
+    canonical, reorged, unknown = await get_canonical_block_numbers(mock_client, chain_symbol, [90, 101, 105, 108])
+
+    # Assertion
+    assert canonical == [101, 105]
+    assert reorged == [108]
+    assert unknown == [90]
+    mock_client.get_block_header.assert_not_called()
@@ -0,0 +1,145 @@
+from unittest.mock import patch
+
+import pytest
+
+from tests.mock import MockTransfer
+from zexporta.custom_types import Deposit, DepositStatus
+from zexporta.validator.config import NODE_ID
+from zexporta.validator.deposit import (
+    _verified_deposits_key,
+    get_deposits,
+    get_verified_deposits,
+    memoize_verified_deposits,
+)
+
+
+class FakeRedisInterface:
+    def __init__(self):
+        self.values = {}
+
+    def get_values(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set_values(self, values, expiry=None):
+        self.values.update(values)
+        return True
+
+
+@pytest.fixture
+def fake_redis_interface():
+    redis_interface = FakeRedisInterface()
+    with patch("zexporta.validator.deposit.redis_interface", redis_interface):
+        yield redis_interface
+
+
+def _deposit(tx_hash: str, sa_timestamp: int) -> Deposit:
+    return Deposit(
+        transfer=MockTransfer(
+            tx_hash=tx_hash,
+            value=10,
+            chain_symbol="ETH",
+            token="0x0000000000000000000000000000000000000000",
+            to="0x0000000000000000000000000000000000000001",
+            block_number=100,
+        ),
+        user_id=1,
+        decimals=18,
+        status=DepositStatus.VERIFIED,
+        sa_timestamp=sa_timestamp,
+    )
+
+
+async def test_get_verified_deposits_should_use_request_timestamp(mock_chain_config, fake_redis_interface):
+    # Arrangement
+    await memoize_verified_deposits(mock_chain_config, [_deposit("0x1", sa_timestamp=1)])
+
+    # Action
+    verified = await get_verified_deposits(mock_chain_config, ["0x1", "0x2"], sa_timestamp=2)
+
+    # Assertion
+    assert list(verified) == ["0x1"]
+    assert verified["0x1"][0].model_dump() == _deposit("0x1", sa_timestamp=2).model_dump()
+
+
+async def test_get_deposits_should_not_verify_memoized_txs_again(mock_chain_config, fake_redis_interface):
+    # Arrangement
+    await memoize_verified_deposits(mock_chain_config, [_deposit("0x1", sa_timestamp=1)])
+
+    # Action
+    with patch("zexporta.validator.deposit.get_async_client") as get_async_client:
+        deposits = await get_deposits(mock_chain_config, ["0x1"], sa_finalized_block_number=100, sa_timestamp=2)
+
+    # Assertion
+    get_async_client.assert_not_called()
+    assert [deposit.transfer.tx_hash for deposit in deposits] == ["0x1"]
+
+
+async def test_get_deposits_should_return_every_transfer_of_tx(mock_chain_config, mock_client, fake_redis_interface):
+    # Arrangement
+    first = _deposit("0x1", sa_timestamp=2).transfer
+    second = first.model_copy(update={"value": 20})
+    mock_client.get_finalized_block_number.return_value = 100
+    mock_client.get_transfer_by_tx_hash.return_value = [first, second]
+    mock_client.is_transaction_successful.return_value = True
+    mock_client.get_token_decimals.return_value = 18
+
+    # Action
+    with (
+        patch("zexporta.validator.deposit.get_async_client", return_value=mock_client),
+        patch("zexporta.validator.deposit.insert_new_address_to_db", return_value=True),
+        patch("zexporta.validator.deposit.get_active_address", return_value={first.to: 1}),
+    ):
+        deposits = await get_deposits(mock_chain_config, ["0x1"], sa_finalized_block_number=100, sa_timestamp=2)
+
+    # Assertion
+    assert [deposit.transfer.value for deposit in deposits] == [10, 20]
+
+
+def test_verified_deposits_key_should_include_node_id(mock_chain_config):
+    # Action
+    key = _verified_deposits_key(mock_chain_config, "0x1")
+
+    # Assertion
+    assert key == f"verified_deposits:{NODE_ID}:ETH:0x1"
+
+
+@pytest.mark.parametrize(
+    "is_address_index_current, other_to, decimals, is_memoized",
+    [
+        (True, "0x0000000000000000000000000000000000000002", 18, True),
+        (False, "0x0000000000000000000000000000000000000002", 18, False),
+        (False, "0x0000000000000000000000000000000000000001", 18, True),
+        (True, "0x0000000000000000000000000000000000000001", None, False),
+    ],
+)
+async def test_get_deposits_should_memoize_only_fully_verified_txs(
+    mock_chain_config,
+    mock_client,
+    fake_redis_interface,
+    is_address_index_current,
+    other_to,
+    decimals,
+    is_memoized,
+):
+    # Arrangement
+    first = _deposit("0x1", sa_timestamp=2).transfer
+    second = first.model_copy(update={"to": other_to, "token": "0x0000000000000000000000000000000000000003"})
+    mock_client.get_finalized_block_number.return_value = 100
+    mock_client.get_transfer_by_tx_hash.return_value = [first, second]
+    mock_client.is_transaction_successful.return_value = True
+
+    async def get_token_decimals(client, token):
+        return 18 if token == first.token else decimals
+
+    # Action
+    with (
+        patch("zexporta.validator.deposit.get_async_client", return_value=mock_client),
+        patch("zexporta.validator.deposit.insert_new_address_to_db", return_value=is_address_index_current),
+        patch("zexporta.validator.deposit.get_active_address", return_value={first.to: 1}),
+        patch("zexporta.explorer.get_token_decimals", side_effect=get_token_decimals),
+    ):
+        await get_deposits(mock_chain_config, ["0x1"], sa_finalized_block_number=100, sa_timestamp=2)
+
+    # Assertion
+    memoized = await get_verified_deposits(mock_chain_config, ["0x1"], sa_timestamp=2)
+    assert ("0x1" in memoized) is is_memoized
@@ -133,6 +133,20 @@ EVM_WITHDRAWER_PRIVATE_KEY = os.environ["EVM_WITHDRAWER_PRIVATE_KEY"]
 
 SENTRY_DNS = os.getenv("SENTRY_DNS")
 
+BLOCK_CACHE_SIZE = int(os.getenv("BLOCK_CACHE_SIZE", 2048))
+BLOCK_CACHE_REDIS_URL = os.getenv("BLOCK_CACHE_REDIS_URL")
+BLOCK_CACHE_EXPIRY = int(os.getenv("BLOCK_CACHE_EXPIRY", 24 * 60 * 60))
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 15))
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+
+# Workers decoding the transfers of fetched blocks, 0 decodes on the event loop.
+DECODING_WORKERS = int(os.getenv("DECODING_WORKERS", os.cpu_count() or 1))
+DECODING_USE_PROCESSES = os.getenv("DECODING_USE_PROCESSES", "true").lower() == "true"
+
 MONGO_HOST = os.environ["MONGO_HOST"]
 MONGO_PORT = os.environ["MONGO_PORT"]
 MONGO_DBNAME = os.environ.get("MONGO_DBNAME", "transaction_database")
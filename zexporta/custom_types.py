@@ -4,6 +4,7 @@ from typing import Any
 from clients.btc.custom_types import UTXO, BTCConfig, BTCTransfer, BTCWithdrawRequest, UTXOStatus
 from clients.custom_types import (
     Address,
+    BlockHeader,
     BlockNumber,
     ChainConfig,
     Transfer,
@@ -43,6 +44,8 @@ class ChainSymbol(StrEnum):
 class DepositStatus(StrEnum):
     PENDING = "pending"
     FINALIZED = "finalized"
+    # Claimed by a batch of the SA, see `zexporta.db.deposit.claim_finalized_deposits`.
+    PROCESSING = "processing"
     VERIFIED = "verified"
     SUCCESSFUL = "successful"
     REORG = "reorg"
@@ -86,6 +89,14 @@ class UserAddress(BaseModel):
     is_active: bool = Field(default=True)
 
 
+class WriteOutcome(BaseModel):
+    """Per-document counts of a bulk write."""
+
+    inserted: int = 0
+    matched: int = 0
+    modified: int = 0
+
+
 class ZexUserAsset(BaseModel):
     asset: str
     free: str
@@ -100,6 +111,7 @@ __all__ = [
     "EVMWithdrawRequest",
     "BTCWithdrawRequest",
     "UserAddress",
+    "WriteOutcome",
     "Deposit",
     "SaDepositSchema",
     "Token",
@@ -116,6 +128,7 @@ __all__ = [
     "Timestamp",
     "UserId",
     "BlockNumber",
+    "BlockHeader",
     "Address",
     "EVMTransfer",
     "BTCTransfer",
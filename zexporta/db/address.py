@@ -1,7 +1,14 @@
 import asyncio
 import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
+from typing import AsyncIterator
 
+from bitcoinutils.setup import get_network, setup
 from clients import get_compute_address_function
 from pymongo import DESCENDING
 from web3 import Web3
@@ -22,10 +29,11 @@ from zexporta.utils.zex_api import (
 
 from .db import get_db_connection
 
-
-async def __create_address_index(collection):
-    await collection.create_index("user_id", unique=True)
-    await collection.create_index("address", unique=True)
+# Read here instead of `zexporta.config` because of the circular import, like `db.py`.
+ADDRESS_DERIVATION_WORKERS = int(os.getenv("ADDRESS_DERIVATION_WORKERS", os.cpu_count() or 1))
+ADDRESS_DERIVATION_CHUNK_SIZE = int(os.getenv("ADDRESS_DERIVATION_CHUNK_SIZE", 1000))
+# Seconds between full loads of an `AddressIndex`, which drop the deactivated addresses.
+ADDRESS_INDEX_RELOAD_INTERVAL = int(os.getenv("ADDRESS_INDEX_RELOAD_INTERVAL", 10 * 60))
 
 
 @lru_cache()
@@ -37,7 +45,6 @@ def get_collection(chain: ChainConfig):
             collection = get_db_connection()["btc_address"]
         case _:
             raise NotImplementedError()
-    asyncio.run_coroutine_threadsafe(__create_address_index(collection), asyncio.get_event_loop())
     return collection
 
 
@@ -48,21 +55,74 @@ class UserNotExists(Exception):
 logger = logging.getLogger(__name__)
 
 
-async def get_active_address(
-    chain: ChainConfig,
-) -> dict[Address, UserId]:
-    res = dict()
-    collection = get_collection(chain=chain)
-    async for address in collection.find({"is_active": True}):
-        match chain:
+class AddressIndex:
+    """In-memory index of the active deposit addresses of a chain.
+
+    Addresses are never reassigned, so between full loads only rows with a `user_id` above the
+    last indexed one are read from the database. The index is loaded again from scratch every
+    `reload_interval` seconds, so deactivated addresses leave it. Keys are stored in their final
+    (checksum for EVM) form so membership checks do not need any conversion.
+    """
+
+    def __init__(self, chain: ChainConfig, reload_interval: float = ADDRESS_INDEX_RELOAD_INTERVAL):
+        self.chain = chain
+        self.reload_interval = reload_interval
+        self.addresses: dict[Address, UserId] = {}
+        self.last_user_id: UserId | None = None
+        self._loaded_at: float | None = None
+
+    def _to_key(self, address: str) -> Address:
+        match self.chain:
             case EVMConfig():
-                key = Web3.to_checksum_address(address["address"])
+                return Web3.to_checksum_address(address)
             case BTCConfig():
-                key = address["address"]
+                return address
             case _:
                 raise NotImplementedError("")
-        res[key] = address["user_id"]
-    return res
+
+    async def _load(self, above_user_id: UserId | None) -> tuple[dict[Address, UserId], UserId | None]:
+        query: dict = {"is_active": True}
+        if above_user_id is not None:
+            query["user_id"] = {"$gt": above_user_id}
+        addresses = {}
+        last_user_id = above_user_id
+        collection = get_collection(chain=self.chain)
+        async for address in collection.find(query, projection={"_id": False, "address": True, "user_id": True}):
+            addresses[self._to_key(address["address"])] = address["user_id"]
+            if last_user_id is None or address["user_id"] > last_user_id:
+                last_user_id = address["user_id"]
+        return addresses, last_user_id
+
+    async def refresh(self) -> dict[Address, UserId]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval:
+            return await self.reload()
+        new_addresses, last_user_id = await self._load(self.last_user_id)
+        # Applied in one step so readers never see a partially refreshed index.
+        self.addresses.update(new_addresses)
+        self.last_user_id = last_user_id
+        return self.addresses
+
+    async def reload(self) -> dict[Address, UserId]:
+        """Rebuild the index from scratch, dropping the addresses deactivated since the last load."""
+        # A new dict, the previous one may still be used by a scan in progress.
+        self.addresses, self.last_user_id = await self._load(None)
+        self._loaded_at = time.monotonic()
+        return self.addresses
+
+
+@lru_cache()
+def get_address_index(chain: ChainConfig) -> AddressIndex:
+    return AddressIndex(chain)
+
+
+async def get_active_address(
+    chain: ChainConfig,
+) -> dict[Address, UserId]:
+    """Return the active addresses of `chain` mapped to their user id.
+
+    The returned dict is the shared index of the process and must not be modified.
+    """
+    return await get_address_index(chain).refresh()
 
 
 async def get_last_user_id(chain: ChainConfig) -> UserId:
@@ -99,21 +159,67 @@ def get_users_address_to_insert(
     return users_address_to_insert
 
 
-async def insert_new_address_to_db(chain: ChainConfig):
+def _init_address_derivation_worker(network: str):
+    setup(network)
+
+
+@lru_cache()
+def get_address_derivation_executor() -> ProcessPoolExecutor:
+    # `spawn` since forking a process with running threads (e.g. the validator) is unsafe.
+    return ProcessPoolExecutor(
+        max_workers=ADDRESS_DERIVATION_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_address_derivation_worker,
+        initargs=(get_network(),),
+    )
+
+
+async def iter_users_address_to_insert(
+    chain: ChainConfig, first_to_compute: UserId, last_to_compute: UserId
+) -> AsyncIterator[list[UserAddress]]:
+    """Derive the addresses of `[first_to_compute, last_to_compute]` in a process pool.
+
+    The range is split in chunks of `ADDRESS_DERIVATION_CHUNK_SIZE` users, which are yielded in
+    user id order as soon as they are ready so they can be inserted while the rest is computed.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_address_derivation_executor()
+    chunks = iter(range(first_to_compute, last_to_compute + 1, ADDRESS_DERIVATION_CHUNK_SIZE))
+    pending: deque[asyncio.Future[list[UserAddress]]] = deque()
+    try:
+        while True:
+            # Keep every worker busy, without computing the whole range ahead of the inserts.
+            while len(pending) < 2 * ADDRESS_DERIVATION_WORKERS and (start := next(chunks, None)) is not None:
+                end = min(start + ADDRESS_DERIVATION_CHUNK_SIZE - 1, last_to_compute)
+                pending.append(loop.run_in_executor(executor, get_users_address_to_insert, chain, start, end))
+            if len(pending) == 0:
+                return
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def insert_new_address_to_db(chain: ChainConfig) -> bool:
+    """Insert the addresses of the Zex users created since the last call.
+
+    Return `False` when the last user id could not be fetched from Zex, the addresses of the
+    latest users may then be missing.
+    """
     async with get_async_client() as client:
         try:
             last_zex_user_id = await get_last_zex_user_id(client)
         except ZexAPIError as e:
             logger.error(f"Error in Zex API: {e}")
-            return
+            return False
 
     if last_zex_user_id is None:
-        return
+        return True
     try:
         first_id_to_compute = await get_last_user_id(chain=chain) + 1
     except UserNotExists:
         first_id_to_compute = 0
-    users_address_to_insert = get_users_address_to_insert(chain, first_id_to_compute, last_zex_user_id)
-    if len(users_address_to_insert) == 0:
-        return
-    await insert_many_user_address(chain, users_address=users_address_to_insert)
+    # Chunks are inserted in order, so `get_last_user_id` stays a valid resume point on failure.
+    async for users_address_to_insert in iter_users_address_to_insert(chain, first_id_to_compute, last_zex_user_id):
+        await insert_many_user_address(chain, users_address=users_address_to_insert)
+    return True
@@ -0,0 +1,63 @@
+import os
+from functools import lru_cache
+from typing import Iterable
+
+from pymongo import ASCENDING
+from pymongo.operations import UpdateOne
+
+from zexporta.custom_types import BlockHeader, BlockNumber, WriteOutcome
+
+from .db import bulk_write, get_db_connection
+
+# FIXME: due to circular import, we must do this. We must move this config to configs in future
+BLOCK_HEADER_RING_SIZE = int(os.getenv("BLOCK_HEADER_RING_SIZE", 1024))
+
+
+@lru_cache()
+def get_collection():
+    return get_db_connection()["block_header"]
+
+
+async def upsert_block_headers(chain_symbol: str, headers: Iterable[BlockHeader]) -> WriteOutcome:
+    operations = [
+        UpdateOne(
+            {"chain_symbol": chain_symbol, "number": header.number},
+            {"$set": {"chain_symbol": chain_symbol, **header.model_dump(mode="json")}},
+            upsert=True,
+        )
+        for header in headers
+    ]
+    return await bulk_write(get_collection(), operations)
+
+
+async def get_block_header(chain_symbol: str, block_number: BlockNumber) -> BlockHeader | None:
+    record = await get_collection().find_one({"chain_symbol": chain_symbol, "number": block_number})
+    if record is None:
+        return None
+    return BlockHeader(**record)
+
+
+async def get_block_headers(
+    chain_symbol: str, from_block: BlockNumber, to_block: BlockNumber
+) -> dict[BlockNumber, BlockHeader]:
+    """Stored headers of the blocks in `[from_block, to_block]`, by block number."""
+    cursor = get_collection().find(
+        {"chain_symbol": chain_symbol, "number": {"$gte": from_block, "$lte": to_block}},
+        projection={"_id": False},
+        sort={"number": ASCENDING},
+    )
+    return {record["number"]: BlockHeader(**record) async for record in cursor}
+
+
+async def delete_block_headers_after(chain_symbol: str, block_number: BlockNumber):
+    """Forget the headers above `block_number`, e.g. the blocks of a reorged branch."""
+    await get_collection().delete_many({"chain_symbol": chain_symbol, "number": {"$gt": block_number}})
+
+
+async def prune_block_headers(
+    chain_symbol: str, last_block_number: BlockNumber, ring_size: int = BLOCK_HEADER_RING_SIZE
+):
+    """Keep only the last `ring_size` headers up to `last_block_number`."""
+    await get_collection().delete_many(
+        {"chain_symbol": chain_symbol, "number": {"$lte": last_block_number - ring_size}}
+    )
@@ -1,4 +1,3 @@
-import asyncio
 from functools import lru_cache
 
 from zexporta.custom_types import BlockNumber
@@ -8,11 +7,7 @@ from .db import get_db_connection
 
 @lru_cache()
 def get_collection():
-    _chain_collection = get_db_connection()["chain"]
-    asyncio.run_coroutine_threadsafe(
-        _chain_collection.create_index("chain_symbol", unique=True), asyncio.get_event_loop()
-    )
-    return _chain_collection
+    return get_db_connection()["chain"]
 
 
 async def upsert_chain_last_observed_block(chain_symbol: str, block_number: BlockNumber):
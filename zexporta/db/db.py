@@ -2,6 +2,10 @@ import os
 from functools import lru_cache
 
 import pymongo
+from pymongo.errors import BulkWriteError
+from pymongo.operations import UpdateOne
+
+from zexporta.custom_types import WriteOutcome
 
 # FIXME: due to circular import, we must do this. We must move this config to configs in future
 MONGO_HOST = os.environ["MONGO_HOST"]
@@ -13,3 +17,32 @@ MONGO_DBNAME = os.environ.get("MONGO_DBNAME", "transaction_database")
 def get_db_connection():
     client = pymongo.AsyncMongoClient(f"mongodb://{MONGO_HOST}:{MONGO_PORT}/")
     return client[MONGO_DBNAME]
+
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+async def bulk_write(collection, operations: list[UpdateOne]) -> WriteOutcome:
+    """Run `operations` as a single unordered bulk write.
+
+    Concurrent upserts of the same document can fail with a duplicate key error, in which case
+    the document already exists and the error is counted as a match.
+    """
+    if len(operations) == 0:
+        return WriteOutcome()
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR_CODE for error in errors):
+            raise
+        return WriteOutcome(
+            inserted=e.details.get("nUpserted", 0),
+            matched=e.details.get("nMatched", 0) + len(errors),
+            modified=e.details.get("nModified", 0),
+        )
+    return WriteOutcome(
+        inserted=result.upserted_count,
+        matched=result.matched_count,
+        modified=result.modified_count,
+    )
@@ -1,9 +1,9 @@
-import asyncio
 from functools import lru_cache
-from typing import Iterable, overload
+from typing import AsyncIterator, Iterable, overload
 
 from clients import Transfer
 from pymongo import ASCENDING
+from pymongo.operations import UpdateOne
 
 from zexporta.custom_types import (
     BlockNumber,
@@ -15,9 +15,10 @@ from zexporta.custom_types import (
     EVMConfig,
     EVMTransfer,
     TxHash,
+    WriteOutcome,
 )
 
-from .db import get_db_connection
+from .db import bulk_write, get_db_connection
 
 
 @lru_cache()
@@ -25,34 +26,39 @@ def get_collection(chain: ChainConfig):
     match chain:
         case EVMConfig():
             collection = get_db_connection()["evm_deposit"]
-            asyncio.run_coroutine_threadsafe(
-                collection.create_index(("transfer.tx_hash", "transfer.chain_symbol"), unique=True),
-                asyncio.get_event_loop(),
-            )
         case BTCConfig():
             collection = get_db_connection()["btc_deposit"]
-            asyncio.run_coroutine_threadsafe(
-                collection.create_index(("transfer.tx_hash", "transfer.chain_symbol", "transfer.index"), unique=True),
-                asyncio.get_event_loop(),
-            )
         case _:
             raise NotImplementedError()
     return collection
 
 
-async def insert_deposit_if_not_exists(chain: ChainConfig, deposit: Deposit):
-    collection = get_collection(chain)
-    query = {
-        "transfer.chain_symbol": deposit.transfer.chain_symbol,
+def _deposit_filter(deposit: Deposit) -> dict:
+    """Filter of the document of `deposit`, unique as the unique index of `_deposit_indexes`."""
+    filter_ = {
         "transfer.tx_hash": deposit.transfer.tx_hash,
+        "transfer.chain_symbol": deposit.transfer.chain_symbol,
     }
-    record = await collection.find_one(query)
-    if not record:
-        await collection.insert_one(deposit.model_dump(mode="json"))
+    match deposit.transfer:
+        case BTCTransfer():
+            # A bitcoin transaction can pay several deposit addresses, one deposit per output.
+            filter_["transfer.index"] = deposit.transfer.index
+        case EVMTransfer():
+            # A transaction can emit several `Transfer` logs to deposit addresses, one deposit per log.
+            filter_["transfer.log_index"] = deposit.transfer.log_index
+    return filter_
+
 
+async def insert_deposit_if_not_exists(chain: ChainConfig, deposit: Deposit) -> WriteOutcome:
+    return await insert_deposits_if_not_exists(chain, [deposit])
 
-async def insert_deposits_if_not_exists(chain: ChainConfig, deposits: Iterable[Deposit]):
-    await asyncio.gather(*[insert_deposit_if_not_exists(chain, deposit) for deposit in deposits])
+
+async def insert_deposits_if_not_exists(chain: ChainConfig, deposits: Iterable[Deposit]) -> WriteOutcome:
+    operations = [
+        UpdateOne(_deposit_filter(deposit), {"$setOnInsert": deposit.model_dump(mode="json")}, upsert=True)
+        for deposit in deposits
+    ]
+    return await bulk_write(get_collection(chain), operations)
 
 
 @overload
@@ -96,8 +102,59 @@ async def find_deposit_by_status(
     limit=None,
     txs_hash=None,
 ):
+    return [
+        deposit
+        async for deposit in iter_deposits_by_status(
+            chain,
+            status,
+            from_block=from_block,
+            to_block=to_block,
+            limit=limit,
+            txs_hash=txs_hash,
+        )
+    ]
+
+
+async def iter_deposits_by_status(
+    chain: ChainConfig,
+    status: DepositStatus,
+    from_block: BlockNumber | None = None,
+    to_block: BlockNumber | None = None,
+    limit: int | None = None,
+    txs_hash: list[TxHash] | None = None,
+    batch_size: int | None = None,
+) -> AsyncIterator[Deposit]:
+    """Lazily yield the deposits with `status` in block number order."""
+    async for record in iter_deposit_records_by_status(
+        chain,
+        status,
+        from_block=from_block,
+        to_block=to_block,
+        limit=limit,
+        txs_hash=txs_hash,
+        batch_size=batch_size,
+    ):
+        transfer = chain.transfer_class(**record["transfer"])
+        del record["transfer"]
+        yield Deposit(transfer=transfer, **record)
+
+
+async def iter_deposit_records_by_status(
+    chain: ChainConfig,
+    status: DepositStatus,
+    from_block: BlockNumber | None = None,
+    to_block: BlockNumber | None = None,
+    limit: int | None = None,
+    txs_hash: list[TxHash] | None = None,
+    batch_size: int | None = None,
+    projection: dict | None = None,
+) -> AsyncIterator[dict]:
+    """Yield the raw deposit documents with `status` in block number order.
+
+    `limit` is applied by the server, which also sends the whole limited result in one batch
+    unless `batch_size` is given. `projection` restricts the returned fields.
+    """
     collection = get_collection(chain)
-    res = []
     block_number_query = {"$gte": from_block or 0}
     if to_block:
         block_number_query["$lte"] = to_block
@@ -110,13 +167,15 @@ async def find_deposit_by_status(
     if txs_hash:
         query["transfer.tx_hash"] = {"$in": txs_hash}
 
-    async for record in collection.find(query, sort={"transfer.block_number": ASCENDING}):
-        transfer = chain.transfer_class(**record["transfer"])
-        del record["transfer"]
-        res.append(Deposit(transfer=transfer, **record))
-        if limit and len(record) >= limit:
-            break
-    return res
+    cursor = collection.find(
+        query,
+        projection={"_id": False, **(projection or {})},
+        sort={"transfer.block_number": ASCENDING},
+        limit=limit or 0,
+        batch_size=batch_size or limit or 0,
+    )
+    async for record in cursor:
+        yield record
 
 
 async def update_deposit_status(chain: ChainConfig, tx_hash: TxHash, new_status: DepositStatus):
@@ -133,7 +192,7 @@ async def to_finalized(
     chain: ChainConfig,
     finalized_block_number: BlockNumber,
     txs_hash: list[TxHash],
-):
+) -> int:
     collection = get_collection(chain)
     query = {
         "status": DepositStatus.PENDING.value,
@@ -144,7 +203,37 @@ async def to_finalized(
 
     update = {"$set": {"status": DepositStatus.FINALIZED.value}}
 
-    await collection.update_many(query, update)
+    result = await collection.update_many(query, update)
+    return result.modified_count
+
+
+async def to_finalized_by_block_numbers(chain: ChainConfig, blocks_number: list[BlockNumber]) -> int:
+    """Finalize every pending deposit of `blocks_number`, whose blocks are known to be canonical."""
+    collection = get_collection(chain)
+    query = {
+        "status": DepositStatus.PENDING.value,
+        "transfer.block_number": {"$in": blocks_number},
+        "transfer.chain_symbol": chain.chain_symbol,
+    }
+    update = {"$set": {"status": DepositStatus.FINALIZED.value}}
+    result = await collection.update_many(query, update)
+    return result.modified_count
+
+
+async def delete_deposits_after(
+    chain: ChainConfig,
+    block_number: BlockNumber,
+    status: DepositStatus = DepositStatus.PENDING,
+) -> int:
+    """Delete the deposits with `status` observed above `block_number`, so their blocks can be observed again."""
+    collection = get_collection(chain)
+    query = {
+        "status": status.value,
+        "transfer.block_number": {"$gt": block_number},
+        "transfer.chain_symbol": chain.chain_symbol,
+    }
+    result = await collection.delete_many(query)
+    return result.deleted_count
 
 
 async def to_reorg_block_number(
@@ -163,6 +252,22 @@ async def to_reorg_block_number(
     await collection.update_many(query, update)
 
 
+async def to_reorg_by_block_numbers(
+    chain: ChainConfig,
+    blocks_number: list[BlockNumber],
+    status: DepositStatus = DepositStatus.PENDING,
+):
+    """Mark the deposits with `status` of `blocks_number`, and of no other block, as reorged."""
+    collection = get_collection(chain)
+    query = {
+        "status": status.value,
+        "transfer.block_number": {"$in": blocks_number},
+        "transfer.chain_symbol": chain.chain_symbol,
+    }
+    update = {"$set": {"status": DepositStatus.REORG.value}}
+    await collection.update_many(query, update)
+
+
 async def to_reorg_with_tx_hash(
     chain: ChainConfig,
     txs_hash: list[TxHash],
@@ -178,47 +283,127 @@ async def to_reorg_with_tx_hash(
     await collection.update_many(query, update)
 
 
+async def claim_finalized_deposits(chain: ChainConfig, claim: str, limit: int) -> list[dict]:
+    """Move the oldest finalized deposits, up to `limit` transactions, to PROCESSING under `claim`.
+
+    Only deposits still FINALIZED are updated, so concurrent claims never share a deposit; every
+    deposit of a claimed transaction is claimed. Returns the `tx_hash` and `block_number` of the
+    claimed transfers in block number order.
+    """
+    collection = get_collection(chain)
+    txs_hash = list(
+        dict.fromkeys(
+            [
+                record["transfer"]["tx_hash"]
+                async for record in iter_deposit_records_by_status(
+                    chain, DepositStatus.FINALIZED, limit=limit, projection={"transfer.tx_hash": True}
+                )
+            ]
+        )
+    )
+    if len(txs_hash) == 0:
+        return []
+    await collection.update_many(
+        {
+            "status": DepositStatus.FINALIZED.value,
+            "transfer.chain_symbol": chain.chain_symbol,
+            "transfer.tx_hash": {"$in": txs_hash},
+        },
+        {"$set": {"status": DepositStatus.PROCESSING.value, "claim": claim}},
+    )
+    cursor = collection.find(
+        {"claim": claim, "transfer.chain_symbol": chain.chain_symbol},
+        projection={"_id": False, "transfer.tx_hash": True, "transfer.block_number": True},
+        sort={"transfer.block_number": ASCENDING},
+    )
+    return [record["transfer"] async for record in cursor]
+
+
+async def release_claimed_deposits(
+    chain: ChainConfig,
+    claim: str | None = None,
+    status: DepositStatus = DepositStatus.FINALIZED,
+) -> int:
+    """Move the deposits of `claim` still PROCESSING to `status` and drop the claim.
+
+    Without `claim` every claim of the chain is released, e.g. the claims left by a stopped SA.
+    """
+    collection = get_collection(chain)
+    query: dict = {"transfer.chain_symbol": chain.chain_symbol}
+    if claim is None:
+        query["claim"] = {"$exists": True}
+    else:
+        query["claim"] = claim
+    result = await collection.update_many(
+        {**query, "status": DepositStatus.PROCESSING.value}, {"$set": {"status": status.value}}
+    )
+    await collection.update_many(query, {"$unset": {"claim": ""}})
+    return result.modified_count
+
+
 async def get_pending_deposits_block_number(
     chain: ChainConfig, finalized_block_number: BlockNumber
 ) -> list[BlockNumber]:
-    collection = get_collection(chain)
-    query = {
-        "status": DepositStatus.PENDING.value,
-        "transfer.chain_symbol": chain.chain_symbol,
-        "transfer.block_number": {"$lte": finalized_block_number},
-    }
-    block_numbers = set()
-    async for record in collection.find(
-        query,
-        sort=[("transfer.block_number", ASCENDING)],
-    ):
-        block_numbers.add(record["transfer"]["block_number"])
-    return list(block_numbers)
+    return await get_block_numbers_by_status(chain, DepositStatus.PENDING, to_block=finalized_block_number)
 
 
-async def get_block_numbers_by_status(chain: ChainConfig, status: DepositStatus) -> list[BlockNumber]:
-    collection = get_collection(chain)
-    query = {"transfer.chain_symbol": chain.chain_symbol, "status": status.value}
-    block_numbers = set()
-    async for record in collection.find(
-        query,
-        sort=[("transfer.block_number", ASCENDING)],
+async def get_block_numbers_by_status(
+    chain: ChainConfig,
+    status: DepositStatus,
+    to_block: BlockNumber | None = None,
+) -> list[BlockNumber]:
+    return [
+        block_number
+        async for block_numbers in iter_block_numbers_by_status(chain, status, to_block=to_block)
+        for block_number in block_numbers
+    ]
+
+
+async def iter_pending_deposits_block_number(
+    chain: ChainConfig, finalized_block_number: BlockNumber, batch_size: int
+) -> AsyncIterator[list[BlockNumber]]:
+    async for block_numbers in iter_block_numbers_by_status(
+        chain, DepositStatus.PENDING, to_block=finalized_block_number, batch_size=batch_size
     ):
-        block_numbers.add(record["transfer"]["block_number"])
-    return list(block_numbers)
+        yield block_numbers
 
 
-async def upsert_deposit(chain: ChainConfig, deposit: Deposit):
-    collection = get_collection(chain)
-    update = {
-        "$set": deposit.model_dump(mode="json"),
-    }
-    filter_ = {
-        "transfer.tx_hash": deposit.transfer.tx_hash,
-        "transfer.chain_symbol": deposit.transfer.chain_symbol,
-    }
-    await collection.update_one(filter=filter_, update=update, upsert=True)
-
+async def iter_block_numbers_by_status(
+    chain: ChainConfig,
+    status: DepositStatus,
+    to_block: BlockNumber | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[list[BlockNumber]]:
+    """Yield the distinct, ascending block numbers of the deposits with `status` in lists of `batch_size`.
 
-async def upsert_deposits(chain: ChainConfig, deposits: list[Deposit]):
-    await asyncio.gather(*[upsert_deposit(chain, deposit) for deposit in deposits])
+    Grouping and sorting happen on the server, so only the block numbers are transferred.
+    """
+    collection = get_collection(chain)
+    query: dict = {"transfer.chain_symbol": chain.chain_symbol, "status": status.value}
+    if to_block is not None:
+        query["transfer.block_number"] = {"$lte": to_block}
+    pipeline = [
+        {"$match": query},
+        {"$group": {"_id": "$transfer.block_number"}},
+        {"$sort": {"_id": ASCENDING}},
+    ]
+    block_numbers = []
+    async for record in await collection.aggregate(pipeline, batchSize=batch_size):
+        block_numbers.append(record["_id"])
+        if len(block_numbers) >= batch_size:
+            yield block_numbers
+            block_numbers = []
+    if len(block_numbers) > 0:
+        yield block_numbers
+
+
+async def upsert_deposit(chain: ChainConfig, deposit: Deposit) -> WriteOutcome:
+    return await upsert_deposits(chain, [deposit])
+
+
+async def upsert_deposits(chain: ChainConfig, deposits: Iterable[Deposit]) -> WriteOutcome:
+    operations = [
+        UpdateOne(_deposit_filter(deposit), {"$set": deposit.model_dump(mode="json")}, upsert=True)
+        for deposit in deposits
+    ]
+    return await bulk_write(get_collection(chain), operations)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Iterable
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.asynchronous.collection import AsyncCollection
+
+from zexporta.custom_types import BTCConfig, ChainConfig, EVMConfig
+
+from . import address, block_header, chain, deposit, token, utxo, withdraw
+
+logger = logging.getLogger(__name__)
+
+
+def _deposit_indexes(chain_config: ChainConfig) -> list[IndexModel]:
+    # One document per output of a bitcoin transaction, and per `Transfer` log of an EVM one.
+    unique_keys = [("transfer.tx_hash", ASCENDING), ("transfer.chain_symbol", ASCENDING)]
+    match chain_config:
+        case BTCConfig():
+            unique_keys.append(("transfer.index", ASCENDING))
+        case EVMConfig():
+            unique_keys.append(("transfer.log_index", ASCENDING))
+    return [
+        IndexModel(unique_keys, unique=True),
+        # Status/range queries of the observer, finalizer and SA: equality fields first, then the sorted range.
+        IndexModel([("transfer.chain_symbol", ASCENDING), ("status", ASCENDING), ("transfer.block_number", ASCENDING)]),
+        # Only deposits claimed by a batch of the SA have a claim.
+        IndexModel([("claim", ASCENDING)], sparse=True),
+    ]
+
+
+ADDRESS_INDEXES = [
+    IndexModel([("user_id", ASCENDING)], unique=True),
+    IndexModel([("address", ASCENDING)], unique=True),
+]
+
+BLOCK_HEADER_INDEXES = [
+    IndexModel([("chain_symbol", ASCENDING), ("number", ASCENDING)], unique=True),
+]
+
+CHAIN_INDEXES = [
+    IndexModel([("chain_symbol", ASCENDING)], unique=True),
+]
+
+TOKEN_INDEXES = [
+    IndexModel([("token_address", ASCENDING), ("chain_symbol", ASCENDING)], unique=True),
+]
+
+UTXO_INDEXES = [
+    IndexModel([("tx_hash", ASCENDING), ("index", ASCENDING)], unique=True),
+    IndexModel([("status", ASCENDING), ("amount", DESCENDING)]),
+]
+
+WITHDRAW_INDEXES = [
+    IndexModel([("nonce", ASCENDING), ("chain_symbol", ASCENDING)], unique=True),
+    IndexModel([("chain_symbol", ASCENDING), ("status", ASCENDING), ("nonce", ASCENDING)]),
+]
+
+
+def get_collections_indexes(chains: Iterable[ChainConfig]) -> dict[str, tuple[AsyncCollection, list[IndexModel]]]:
+    collections_indexes = {
+        block_header.get_collection().name: (block_header.get_collection(), BLOCK_HEADER_INDEXES),
+        chain.get_collection().name: (chain.get_collection(), CHAIN_INDEXES),
+        token.get_collection().name: (token.get_collection(), TOKEN_INDEXES),
+        utxo.get_collection().name: (utxo.get_collection(), UTXO_INDEXES),
+        withdraw.get_collection().name: (withdraw.get_collection(), WITHDRAW_INDEXES),
+    }
+    for chain_config in chains:
+        address_collection = address.get_collection(chain_config)
+        collections_indexes[address_collection.name] = (address_collection, ADDRESS_INDEXES)
+        deposit_collection = deposit.get_collection(chain_config)
+        collections_indexes[deposit_collection.name] = (deposit_collection, _deposit_indexes(chain_config))
+    return collections_indexes
+
+
+async def ensure_indexes(chains: Iterable[ChainConfig]):
+    """Create the indexes of every collection used by `chains`, waiting until they are built."""
+    # Iterated twice, for the indexes and for their usage.
+    chains = list(chains)
+    collections_indexes = get_collections_indexes(chains)
+    names = await asyncio.gather(
+        *[collection.create_indexes(indexes) for collection, indexes in collections_indexes.values()]
+    )
+    for collection_name, index_names in zip(collections_indexes, names):
+        logger.info(f"Indexes of {collection_name}: {index_names}")
+    usage = await get_index_usage(chains)
+    for collection_name, index_usage in usage.items():
+        logger.info(f"Index usage of {collection_name}: {index_usage}")
+
+
+async def get_index_usage(chains: Iterable[ChainConfig]) -> dict[str, dict[str, int]]:
+    """Number of operations that used each index since the server started, from `$indexStats`."""
+    usage = {}
+    for collection_name, (collection, _) in get_collections_indexes(chains).items():
+        cursor = await collection.aggregate([{"$indexStats": {}}])
+        usage[collection_name] = {stats["name"]: stats["accesses"]["ops"] async for stats in cursor}
+    return usage
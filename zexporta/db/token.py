@@ -1,22 +1,12 @@
-import asyncio
 from functools import lru_cache
 
 from zexporta.custom_types import Address
 from zexporta.db.db import get_db_connection
 
 
-async def __create_token_index(collection):
-    await collection.create_index(("token_address", "chain_symbol"), unique=True)
-
-
 @lru_cache()
 def get_collection():
-    collection = get_db_connection()["token"]
-    asyncio.run_coroutine_threadsafe(
-        __create_token_index(collection),
-        asyncio.get_event_loop(),
-    )
-    return collection
+    return get_db_connection()["token"]
 
 
 async def get_decimals(chain_symbol: str, token_address: Address) -> int | None:
@@ -27,11 +17,17 @@ async def get_decimals(chain_symbol: str, token_address: Address) -> int | None:
     return result["decimals"] if result else None
 
 
+async def get_tokens_decimals(chain_symbol: str) -> dict[Address, int]:
+    return {
+        token["token_address"]: token["decimals"]
+        async for token in get_collection().find(
+            {"chain_symbol": chain_symbol},
+            projection={"_id": False, "token_address": True, "decimals": True},
+        )
+    }
+
+
 async def insert_token(chain_symbol: str, token_address: Address, decimals: int) -> None:
-    await get_collection().insert_one(
-        {
-            "chain_symbol": chain_symbol,
-            "token_address": token_address,
-            "decimals": decimals,
-        }
-    )
+    query = {"chain_symbol": chain_symbol, "token_address": token_address}
+    # Upsert, as concurrent lookups of a new token can race on the unique index.
+    await get_collection().update_one(query, {"$setOnInsert": {"decimals": decimals}}, upsert=True)
@@ -1,61 +1,70 @@
-import asyncio
 from functools import lru_cache
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
 from pymongo import DESCENDING
+from pymongo.operations import UpdateOne
 
 from zexporta.custom_types import (
     UTXO,
     Deposit,
     TxHash,
     UTXOStatus,
+    WriteOutcome,
 )
 
-from .db import get_db_connection
-
-
-async def __create_indexes(collection):
-    await collection.create_index(("tx_hash", "index"), unique=True)
+from .db import bulk_write, get_db_connection
 
 
 @lru_cache()
 def get_collection():
-    collection = get_db_connection()["btc_utxo"]
-    asyncio.run_coroutine_threadsafe(
-        __create_indexes(collection),
-        asyncio.get_event_loop(),
-    )
-    return collection
+    return get_db_connection()["btc_utxo"]
 
 
-async def insert_utxo_if_not_exists(utxo: UTXO):
-    query = {
-        "tx_hash": utxo.tx_hash,
-        "index": utxo.index,
-    }
-    record = await get_collection().find_one(query)
-    if not record:
-        await get_collection().insert_one(utxo.model_dump(mode="json"))
+def _utxo_filter(utxo: UTXO) -> dict:
+    # `index` is a `Value`, stored in its json (string) form.
+    return utxo.model_dump(mode="json", include={"tx_hash", "index"})
+
 
+async def insert_utxo_if_not_exists(utxo: UTXO) -> WriteOutcome:
+    return await insert_utxos_if_not_exists([utxo])
 
-async def insert_utxos_if_not_exists(utxos: Iterable[UTXO]):
-    await asyncio.gather(*[insert_utxo_if_not_exists(utxo) for utxo in utxos])
+
+async def insert_utxos_if_not_exists(utxos: Iterable[UTXO]) -> WriteOutcome:
+    operations = [
+        UpdateOne(_utxo_filter(utxo), {"$setOnInsert": utxo.model_dump(mode="json")}, upsert=True) for utxo in utxos
+    ]
+    return await bulk_write(get_collection(), operations)
 
 
 async def find_utxo_by_status(
     status: UTXOStatus,
     limit: int | None = None,
 ) -> list[UTXO]:
-    res = []
+    return [utxo async for utxo in iter_utxos_by_status(status, limit=limit)]
+
+
+async def iter_utxos_by_status(
+    status: UTXOStatus,
+    limit: int | None = None,
+    batch_size: int | None = None,
+) -> AsyncIterator[UTXO]:
+    """Lazily yield the utxos with `status`, largest amount first.
+
+    Amounts are stored as strings and compared as such, so only amounts with the same number of
+    digits are in numeric order.
+    """
     query = {
         "status": status.value,
     }
-
-    async for record in get_collection().find(query, sort={"amount": DESCENDING}):
-        res.append(UTXO(**record))
-        if limit and len(record) >= limit:
-            break
-    return res
+    cursor = get_collection().find(
+        query,
+        projection={"_id": False},
+        sort={"amount": DESCENDING},
+        limit=limit or 0,
+        batch_size=batch_size or limit or 0,
+    )
+    async for record in cursor:
+        yield UTXO(**record)
 
 
 async def update_utxo_status(tx_hash: TxHash, new_status: UTXOStatus):
@@ -66,18 +75,13 @@ async def delete_utxo(tx_hash: TxHash):
     await get_collection().delete_one({"tx_hash": tx_hash})
 
 
-async def upsert_utxo(utxo: UTXO):
-    update = {
-        "$set": utxo.model_dump(mode="json"),
-    }
-    filter_ = {
-        "tx_hash": utxo.tx_hash,
-    }
-    await get_collection().update_one(filter=filter_, update=update, upsert=True)
+async def upsert_utxo(utxo: UTXO) -> WriteOutcome:
+    return await upsert_utxos([utxo])
 
 
-async def upsert_utxos(utxos: list[UTXO]):
-    await asyncio.gather(*[upsert_utxo(utxo) for utxo in utxos])
+async def upsert_utxos(utxos: Iterable[UTXO]) -> WriteOutcome:
+    operations = [UpdateOne(_utxo_filter(utxo), {"$set": utxo.model_dump(mode="json")}, upsert=True) for utxo in utxos]
+    return await bulk_write(get_collection(), operations)
 
 
 async def populate_deposits_utxos(deposits: list[Deposit]):
@@ -1,57 +1,53 @@
-import asyncio
+from functools import lru_cache
 from typing import Iterable
 
 from pymongo import ASCENDING
+from pymongo.operations import UpdateOne
 
 from zexporta.custom_types import (
     ChainConfig,
     WithdrawRequest,
     WithdrawStatus,
+    WriteOutcome,
 )
 
-from .db import get_db_connection
-
-
-async def __create_withdraw_index(collection):
-    await collection.create_index(("nonce", "chain_symbol"), unique=True)
+from .db import bulk_write, get_db_connection
 
 
+@lru_cache()
 def get_collection():
-    collection = get_db_connection()["withdraw"]
-    asyncio.run_coroutine_threadsafe(
-        __create_withdraw_index(collection),
-        asyncio.get_event_loop(),
-    )
-    return collection
+    return get_db_connection()["withdraw"]
 
 
-async def insert_withdraw_if_not_exists(withdraw: WithdrawRequest):
-    query = {
+def _withdraw_filter(withdraw: WithdrawRequest) -> dict:
+    return {
         "chain_symbol": withdraw.chain_symbol,
         "nonce": withdraw.nonce,
     }
-    record = await get_collection().find_one(query)
-    if not record:
-        await get_collection().insert_one(withdraw.model_dump(mode="json"))
 
 
-async def insert_withdraws_if_not_exists(withdraws: Iterable[WithdrawRequest]):
-    await asyncio.gather(*[insert_withdraw_if_not_exists(withdraw) for withdraw in withdraws])
+async def insert_withdraw_if_not_exists(withdraw: WithdrawRequest) -> WriteOutcome:
+    return await insert_withdraws_if_not_exists([withdraw])
 
 
-async def upsert_withdraw(withdraw: WithdrawRequest):
-    update = {
-        "$set": withdraw.model_dump(mode="json"),
-    }
-    filter_ = {
-        "nonce": withdraw.nonce,
-        "chain_symbol": withdraw.chain_symbol,
-    }
-    await get_collection().update_one(filter=filter_, update=update, upsert=True)
+async def insert_withdraws_if_not_exists(withdraws: Iterable[WithdrawRequest]) -> WriteOutcome:
+    operations = [
+        UpdateOne(_withdraw_filter(withdraw), {"$setOnInsert": withdraw.model_dump(mode="json")}, upsert=True)
+        for withdraw in withdraws
+    ]
+    return await bulk_write(get_collection(), operations)
+
+
+async def upsert_withdraw(withdraw: WithdrawRequest) -> WriteOutcome:
+    return await upsert_withdraws([withdraw])
 
 
-async def upsert_withdraws(withdraws: list[WithdrawRequest]):
-    await asyncio.gather(*[upsert_withdraw(withdraw) for withdraw in withdraws])
+async def upsert_withdraws(withdraws: Iterable[WithdrawRequest]) -> WriteOutcome:
+    operations = [
+        UpdateOne(_withdraw_filter(withdraw), {"$set": withdraw.model_dump(mode="json")}, upsert=True)
+        for withdraw in withdraws
+    ]
+    return await bulk_write(get_collection(), operations)
 
 
 async def find_withdraws_by_status(
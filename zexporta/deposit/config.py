@@ -3,7 +3,12 @@
 import os
 
 from zexporta.config import (
+    BLOCK_CACHE_EXPIRY,
+    BLOCK_CACHE_REDIS_URL,
+    BLOCK_CACHE_SIZE,
     CHAINS_CONFIG,
+    DECODING_USE_PROCESSES,
+    DECODING_WORKERS,
     DKG_JSON_PATH,
     DKG_NAME,
     EVM_NATIVE_TOKEN_ADDRESS,
@@ -24,4 +29,16 @@ MAX_DELAY_PER_BLOCK_BATCH = int(os.getenv("MAX_DELAY_PER_BLOCK_BATCH", 3))
 SA_DELAY_SECOND = 10
 SA_TIMEOUT = 200
 SA_BATCH_BLOCK_NUMBER_SIZE = int(os.getenv("SA_BATCH_BLOCK_NUMBER_SIZE", 100))
+# Initial number of transactions per batch, adapted up to the maximum while batches are
+# signed and sent to Zex within the target latency (seconds).
 SA_TRANSACTIONS_BATCH_SIZE = int(os.getenv("SA_TRANSACTIONS_BATCH_SIZE", 2))
+SA_MAX_TRANSACTIONS_BATCH_SIZE = int(os.getenv("SA_MAX_TRANSACTIONS_BATCH_SIZE", 100))
+SA_BATCH_TARGET_LATENCY = float(os.getenv("SA_BATCH_TARGET_LATENCY", SA_TIMEOUT / 4))
+# Batches of deposits being signed at the same time per chain, each over its own deposits; 1 disables pipelining.
+SA_MAX_INFLIGHT_BATCHES = int(os.getenv("SA_MAX_INFLIGHT_BATCHES", 2))
+# Signing nonces are refilled when fewer than the low watermark are left, with as many nonces as were
+# used in the last SA_NONCE_TTL seconds, between the low watermark and the batch size.
+SA_NONCE_BATCH_SIZE = int(os.getenv("SA_NONCE_BATCH_SIZE", 100))
+SA_NONCE_LOW_WATERMARK = int(os.getenv("SA_NONCE_LOW_WATERMARK", 5))
+# Must stay below the NONCE_EXPIRY of the validators, after which they forget a nonce.
+SA_NONCE_TTL = int(os.getenv("SA_NONCE_TTL", 10 * 60))
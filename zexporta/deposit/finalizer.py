@@ -1,68 +1,124 @@
 import asyncio
 import logging.config
-import math
 
 import sentry_sdk
-from clients import filter_blocks, get_async_client
+from clients import ChainAsyncClient, filter_blocks, get_async_client
 
-from zexporta.custom_types import ChainConfig, DepositStatus
+from zexporta.custom_types import BlockNumber, ChainConfig, DepositStatus
 from zexporta.db.deposit import (
     find_deposit_by_status,
-    get_pending_deposits_block_number,
+    iter_pending_deposits_block_number,
     to_finalized,
-    to_reorg_block_number,
+    to_finalized_by_block_numbers,
+    to_reorg_by_block_numbers,
 )
+from zexporta.db.index import ensure_indexes
+from zexporta.reorg import get_canonical_block_numbers
+from zexporta.utils.block_cache import setup_block_cache
+from zexporta.utils.http import setup_http_clients
 from zexporta.utils.logger import ChainLoggerAdapter, get_logger_config
 
-from .config import CHAINS_CONFIG, LOGGER_PATH, SENTRY_DNS
+from .config import (
+    BLOCK_CACHE_EXPIRY,
+    BLOCK_CACHE_REDIS_URL,
+    BLOCK_CACHE_SIZE,
+    CHAINS_CONFIG,
+    LOGGER_PATH,
+    SENTRY_DNS,
+)
 
 logging.config.dictConfig(get_logger_config(logger_path=f"{LOGGER_PATH}/finalizer.log"))  # type: ignore
 logger = logging.getLogger(__name__)
 
 
+async def finalize_canonical_blocks(chain: ChainConfig, blocks_number: list[BlockNumber]) -> int:
+    """Finalize the deposits of blocks whose stored header is still canonical, without fetching them."""
+    deposit_finalizer_middleware = chain.deposit_finalizer_middleware
+    if deposit_finalizer_middleware:
+        pending_deposits = await find_deposit_by_status(
+            chain=chain,
+            status=DepositStatus.PENDING,
+            from_block=blocks_number[0],
+            to_block=blocks_number[-1],
+        )
+        block_numbers = set(blocks_number)
+        finalized_deposits_list = [
+            deposit for deposit in pending_deposits if deposit.transfer.block_number in block_numbers
+        ]
+        for middleware in deposit_finalizer_middleware:
+            await middleware(finalized_deposits_list)
+    return await to_finalized_by_block_numbers(chain, blocks_number)
+
+
+async def finalize_blocks_by_tx_hash(
+    chain: ChainConfig,
+    client: ChainAsyncClient,
+    finalized_block_number: BlockNumber,
+    blocks_number: list[BlockNumber],
+) -> int:
+    """Finalize the deposits of blocks observed without a stored header by refetching their transactions.
+
+    The other pending deposits of `blocks_number` are no longer in their block and are marked as reorged.
+    """
+    results = await filter_blocks(
+        blocks_number,
+        client.get_block_tx_hash,
+        max_delay_per_block_batch=chain.delay,
+    )
+    deposit_finalizer_middleware = chain.deposit_finalizer_middleware
+    if deposit_finalizer_middleware:
+        finalized_deposits_list = await find_deposit_by_status(
+            chain=chain,
+            status=DepositStatus.PENDING,
+            to_block=finalized_block_number,
+            txs_hash=results,
+        )
+        for middleware in deposit_finalizer_middleware:
+            await middleware(finalized_deposits_list)
+    finalized = await to_finalized(chain, finalized_block_number, results)
+    await to_reorg_by_block_numbers(chain, blocks_number)
+    return finalized
+
+
 async def update_finalized_deposits(chain: ChainConfig):
     _logger = ChainLoggerAdapter(logger, chain.chain_symbol)
     while True:
         try:
             client = get_async_client(chain, logger=_logger)
             finalized_block_number = await client.get_finalized_block_number()
-            pending_blocks_number = await get_pending_deposits_block_number(
+            has_pending_blocks = False
+            finalized = 0
+            async for blocks_to_check in iter_pending_deposits_block_number(
                 chain=chain,
                 finalized_block_number=finalized_block_number,
-            )
+                batch_size=chain.batch_block_size,
+            ):
+                has_pending_blocks = True
+                canonical, reorged, unknown = await get_canonical_block_numbers(
+                    client, chain.chain_symbol, blocks_to_check
+                )
+                if len(reorged) > 0:
+                    # The observer rolls these blocks back and observes their new branch.
+                    _logger.warning(f"Skipping reorged blocks {reorged}")
+                if len(canonical) > 0:
+                    finalized += await finalize_canonical_blocks(chain, canonical)
+                if len(unknown) > 0:
+                    finalized += await finalize_blocks_by_tx_hash(chain, client, finalized_block_number, unknown)
 
-            if len(pending_blocks_number) == 0:
+            if not has_pending_blocks:
                 _logger.info(f"No pending tx has been found. finalized_block_number: {finalized_block_number}")
+            if finalized == 0:
+                # Also when only reorged blocks are pending, until the observer rolls them back.
                 await asyncio.sleep(chain.delay)
-                continue
-
-            for i in range(math.ceil(len(pending_blocks_number) / chain.batch_block_size)):
-                blocks_to_check = pending_blocks_number[
-                    (i * chain.batch_block_size) : ((i + 1) * chain.batch_block_size)
-                ]
-                results = await filter_blocks(
-                    blocks_to_check,
-                    client.get_block_tx_hash,
-                    max_delay_per_block_batch=chain.delay,
-                )
-                deposit_finalizer_middleware = chain.deposit_finalizer_middleware
-                if deposit_finalizer_middleware:
-                    finalized_deposits_list = await find_deposit_by_status(
-                        chain=chain,
-                        status=DepositStatus.PENDING,
-                        to_block=finalized_block_number,
-                        txs_hash=results,
-                    )
-                    for middleware in deposit_finalizer_middleware:
-                        await middleware(finalized_deposits_list)
-                await to_finalized(chain, finalized_block_number, results)
-
-                await to_reorg_block_number(chain, min(blocks_to_check), max(blocks_to_check))
         except Exception as e:
             _logger.exception(f"An error occurred: {e}")
+            await asyncio.sleep(chain.delay)
 
 
 async def main():
+    await ensure_indexes(CHAINS_CONFIG.values())
+    setup_block_cache(BLOCK_CACHE_SIZE, BLOCK_CACHE_REDIS_URL, expiry=BLOCK_CACHE_EXPIRY)
+    setup_http_clients()
     loop = asyncio.get_running_loop()
     tasks = [loop.create_task(update_finalized_deposits(chain)) for chain in CHAINS_CONFIG.values()]
     await asyncio.gather(*tasks)
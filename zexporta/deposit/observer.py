@@ -4,28 +4,99 @@ import logging.config
 import clients.exceptions as client_exception
 import sentry_sdk
 from clients import (
+    AdaptiveLimiter,
+    ChainAsyncClient,
+    EVMAsyncClient,
     get_async_client,
 )
+from clients.decoding import configure_decoding_scheduler
+from clients.evm import EVMTransferExtractionMode
+from clients.http import get_http_client_stats
 
-from zexporta.custom_types import ChainConfig
+from zexporta.custom_types import BlockNumber, ChainConfig, EVMConfig
 from zexporta.db.address import get_active_address, insert_new_address_to_db
+from zexporta.db.block_header import (
+    BLOCK_HEADER_RING_SIZE,
+    delete_block_headers_after,
+    get_block_header,
+    prune_block_headers,
+    upsert_block_headers,
+)
 from zexporta.db.chain import (
     get_last_observed_block,
     upsert_chain_last_observed_block,
 )
-from zexporta.db.deposit import insert_deposits_if_not_exists
+from zexporta.db.deposit import delete_deposits_after, insert_deposits_if_not_exists
+from zexporta.db.index import ensure_indexes
 from zexporta.explorer import explorer
+from zexporta.reorg import fetch_block_headers, find_fork_point, is_linked
+from zexporta.utils.block_cache import setup_block_cache
+from zexporta.utils.http import setup_http_clients
 from zexporta.utils.logger import ChainLoggerAdapter, get_logger_config
 
-from .config import CHAINS_CONFIG, LOGGER_PATH, SENTRY_DNS
+from .config import (
+    BLOCK_CACHE_EXPIRY,
+    BLOCK_CACHE_REDIS_URL,
+    BLOCK_CACHE_SIZE,
+    CHAINS_CONFIG,
+    DECODING_USE_PROCESSES,
+    DECODING_WORKERS,
+    LOGGER_PATH,
+    SENTRY_DNS,
+)
 
 logging.config.dictConfig(get_logger_config(logger_path=f"{LOGGER_PATH}/observer.log"))
 logger = logging.getLogger(__name__)
 
 
+async def rollback_to_fork_point(
+    chain: ChainConfig,
+    client: ChainAsyncClient,
+    last_observed_block: BlockNumber,
+    _logger: logging.Logger | logging.LoggerAdapter,
+) -> BlockNumber:
+    """Undo the observation of the reorged blocks above the fork point and return the fork point.
+
+    Pending deposits of the reorged blocks are deleted rather than marked as reorged, so that the
+    transfers that made it into the new branch are inserted again when its blocks are observed.
+    """
+    fork_point = await find_fork_point(client, chain.chain_symbol, last_observed_block)
+    if fork_point is None:
+        fork_point = max(last_observed_block - BLOCK_HEADER_RING_SIZE, 0)
+        _logger.error(f"Reorg is deeper than the {BLOCK_HEADER_RING_SIZE} stored headers, rolling back to {fork_point}")
+    deleted = await delete_deposits_after(chain, fork_point)
+    await delete_block_headers_after(chain.chain_symbol, fork_point)
+    await upsert_chain_last_observed_block(chain.chain_symbol, fork_point)
+    _logger.warning(
+        f"Reorg detected, rolled back from {last_observed_block} to {fork_point}, deleted {deleted} pending deposits"
+    )
+    return fork_point
+
+
+async def wait_after_error(
+    chain: ChainConfig,
+    error: Exception,
+    action: str,
+    _logger: logging.Logger | logging.LoggerAdapter,
+):
+    """Log `error`, raised while `action`, and wait before the range is observed again."""
+    match error:
+        case client_exception.BaseClientError():
+            _logger.error(f"Client raise Error while {action}, {error}")
+            await asyncio.sleep(chain.delay)
+        case ValueError():
+            _logger.error(f"ValueError while {action}: {error}")
+            await asyncio.sleep(10)
+        case _:
+            _logger.exception(f"Exception while {action}: {error}")
+            await asyncio.sleep(5)
+
+
 async def observe_deposit(chain: ChainConfig):
     _logger = ChainLoggerAdapter(logger, chain.chain_symbol)
     last_observed_block = await get_last_observed_block(chain.chain_symbol)
+    # Kept across iterations, so the block fetch concurrency it learned is not lost between scans.
+    limiter = AdaptiveLimiter(chain.batch_block_size, max_limit=chain.max_block_fetch_concurrency)
     while True:
         client = get_async_client(chain, logger=_logger)
         latest_block = await client.get_latest_block_number()
@@ -34,12 +105,36 @@ async def observe_deposit(chain: ChainConfig):
             await asyncio.sleep(chain.delay)
             continue
         last_observed_block = last_observed_block or (latest_block - 1)
-        to_block = min(latest_block, last_observed_block + chain.batch_block_size)
+        to_block = min(latest_block, last_observed_block + chain.max_scan_blocks)
         if last_observed_block >= to_block:
             _logger.warning(f"last_observed_block: {last_observed_block} is bigger then to_block {to_block}")
             continue
+        try:
+            headers = await fetch_block_headers(
+                client,
+                range(last_observed_block + 1, to_block + 1),
+                max_concurrency=chain.max_block_fetch_concurrency,
+            )
+            stored_header = await get_block_header(chain.chain_symbol, last_observed_block)
+        except Exception as e:
+            await wait_after_error(chain, e, "fetching headers", _logger)
+            continue
+        if not is_linked(headers):
+            _logger.warning(f"Headers of blocks {last_observed_block + 1}-{to_block} changed while fetching, retrying")
+            await asyncio.sleep(chain.delay)
+            continue
+        if stored_header is not None and stored_header.hash != headers[0].parent_hash:
+            last_observed_block = await rollback_to_fork_point(chain, client, last_observed_block, _logger)
+            continue
         await insert_new_address_to_db(chain)
         accepted_addresses = await get_active_address(chain)
+        extract_range_logic = None
+        if (
+            isinstance(chain, EVMConfig)
+            and isinstance(client, EVMAsyncClient)
+            and chain.transfer_extraction_mode == EVMTransferExtractionMode.LOGS
+        ):
+            extract_range_logic = client.extract_transfer_from_logs
         try:
             accepted_deposits = await explorer(
                 client,
@@ -49,25 +144,38 @@ async def observe_deposit(chain: ChainConfig):
                 client.extract_transfer_from_block,
                 logger=_logger,
                 batch_size=chain.batch_block_size,
-                max_delay_per_block_batch=chain.delay,
+                max_concurrency=chain.max_block_fetch_concurrency,
+                extract_range_logic=extract_range_logic,
+                limiter=limiter,
             )
-        except client_exception.BaseClientError as e:
-            logger.error(f"Client raise Error, {e}")
-        except ValueError as e:
-            _logger.error(f"ValueError: {e}")
-            await asyncio.sleep(10)
         except Exception as e:
-            _logger.exception(f"Exception: {e}")
-            await asyncio.sleep(5)
-        else:
-            if len(accepted_deposits) > 0:
-                await insert_deposits_if_not_exists(chain, accepted_deposits)
+            # The blocks were not scanned, the checkpoint must not move past them.
+            await wait_after_error(chain, e, "exploring blocks", _logger)
+            continue
+        try:
+            to_block_hash = await client.get_block_hash(to_block)
+        except Exception as e:
+            await wait_after_error(chain, e, "fetching block hash", _logger)
+            continue
+        if to_block_hash != headers[-1].hash:
+            _logger.warning(f"Block {to_block} was reorged while observing, retrying")
+            continue
+        if len(accepted_deposits) > 0:
+            outcome = await insert_deposits_if_not_exists(chain, accepted_deposits)
+            _logger.info(f"Inserted {outcome.inserted} new deposits, {outcome.matched} already existed")
 
+        await upsert_block_headers(chain.chain_symbol, headers)
+        await prune_block_headers(chain.chain_symbol, to_block, BLOCK_HEADER_RING_SIZE)
         await upsert_chain_last_observed_block(chain.chain_symbol, to_block)
         last_observed_block = to_block
+        _logger.debug(f"HTTP client stats: {get_http_client_stats()}")
 
 
 async def main():
+    await ensure_indexes(CHAINS_CONFIG.values())
+    setup_block_cache(BLOCK_CACHE_SIZE, BLOCK_CACHE_REDIS_URL, expiry=BLOCK_CACHE_EXPIRY)
+    setup_http_clients()
+    configure_decoding_scheduler(max_workers=DECODING_WORKERS, use_processes=DECODING_USE_PROCESSES)
     loop = asyncio.get_running_loop()
     tasks = [loop.create_task(observe_deposit(chain)) for chain in CHAINS_CONFIG.values()]
     await asyncio.gather(*tasks)
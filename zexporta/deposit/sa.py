@@ -2,12 +2,17 @@ import asyncio
 import json
 import logging
 import logging.config
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from hashlib import sha256
 
 import httpx
 import sentry_sdk
 from clients.evm import get_signed_data
+from clients.http import get_http_client, get_http_client_stats
 from pyfrost.network.sa import SA
 
 from zexporta.custom_types import (
@@ -19,14 +24,18 @@ from zexporta.custom_types import (
     TxHash,
 )
 from zexporta.db.deposit import (
-    find_deposit_by_status,
-    to_reorg_with_tx_hash,
+    claim_finalized_deposits,
+    release_claimed_deposits,
     upsert_deposits,
 )
+from zexporta.db.index import ensure_indexes
+from zexporta.utils.batch_size import BatchSizeController
 from zexporta.utils.dkg import parse_dkg_json
 from zexporta.utils.encoder import DEPOSIT_OPERATION, encode_zex_deposit
+from zexporta.utils.http import setup_http_clients
 from zexporta.utils.logger import ChainLoggerAdapter, get_logger_config
 from zexporta.utils.node_info import NodesInfo
+from zexporta.utils.nonce_pool import NoncePool, NoncePoolError
 from zexporta.utils.zex_api import (
     ZexAPIError,
     send_deposits,
@@ -37,6 +46,12 @@ from .config import (
     DKG_JSON_PATH,
     DKG_NAME,
     LOGGER_PATH,
+    SA_BATCH_TARGET_LATENCY,
+    SA_MAX_INFLIGHT_BATCHES,
+    SA_MAX_TRANSACTIONS_BATCH_SIZE,
+    SA_NONCE_BATCH_SIZE,
+    SA_NONCE_LOW_WATERMARK,
+    SA_NONCE_TTL,
     SA_SHIELD_PRIVATE_KEY,
     SA_TIMEOUT,
     SA_TRANSACTIONS_BATCH_SIZE,
@@ -51,25 +66,56 @@ logger = logging.getLogger(__name__)
 nodes_info = NodesInfo()
 sa = SA(nodes_info, default_timeout=SA_TIMEOUT)
 dkg_key = parse_dkg_json(DKG_JSON_PATH, DKG_NAME)
+nonce_pool = NoncePool(
+    sa.request_nonces,
+    batch_size=SA_NONCE_BATCH_SIZE,
+    low_watermark=SA_NONCE_LOW_WATERMARK,
+    ttl=SA_NONCE_TTL,
+)
+
+
+# The batch size controller of each chain, by chain symbol.
+batch_size_controllers: dict[str, BatchSizeController] = {}
 
 
 class DepositDifferentHashError(Exception):
     """Raise when validator hash is different from sa hash"""
 
 
-async def process_deposit(
-    client: httpx.AsyncClient,
+class DepositNotSignedError(Exception):
+    """Raise when validators did not sign the deposits"""
+
+
+@dataclass
+class SignedDeposits:
+    deposits: list[Deposit]
+    encoded_data: bytes
+    nonce: str
+    signature: int
+    signing_latency: float
+
+
+@dataclass
+class DepositBatch:
+    """Deposits claimed by the SA, being signed by the validators."""
+
+    claim: str
+    txs_hash: list[TxHash]
+    signing: asyncio.Task[SignedDeposits]
+    # Whether the claim was limited by the batch size, rather than by the finalized deposits.
+    full: bool
+
+
+async def sign_deposits(
     chain: ChainConfig,
     txs_hash: list[TxHash],
     dkg_party: list[str],
     finalized_block_number: BlockNumber,
     logger: ChainLoggerAdapter,
-):
+) -> SignedDeposits:
     logger.info(f"Processing txs: {txs_hash}")
-    nonces_response = await sa.request_nonces(dkg_party, number_of_nonces=1)
-    nonces_for_sig = {}
-    for id, nonce in nonces_response.items():
-        nonces_for_sig[id] = nonce["data"][0]
+    start = time.monotonic()
+    nonces_for_sig = await nonce_pool.get(dkg_party)
     data = {
         "method": "deposit",
         "data": SaDepositSchema(
@@ -83,42 +129,49 @@ async def process_deposit(
     result = await sa.request_signature(dkg_key, nonces_for_sig, data, dkg_party)
     logger.debug(f"Validator results is: {result}")
 
-    if result.get("result") == "SUCCESSFUL":
-        data = list(result["signature_data_from_node"].values())[0]["deposits"]
-
-        deposits = [
-            Deposit(
-                transfer=chain.transfer_class(**deposit["transfer"]),
-                user_id=deposit["user_id"],
-                decimals=deposit["decimals"],
-                sa_timestamp=deposit["sa_timestamp"],
-                status=deposit["status"],
-            )
-            for deposit in data
-        ]
-        encoded_data = encode_zex_deposit(
-            version=ZEX_ENCODE_VERSION,
-            operation_type=DEPOSIT_OPERATION,
-            chain_symbol=chain.chain_symbol,
-            deposits=deposits,
-        )
-        hash_ = sha256(encoded_data).hexdigest()
-        if hash_ != result["message_hash"]:
-            raise DepositDifferentHashError("Hash message is not valid")
-
-        await send_result_to_zex(
-            client,
-            encoded_data,
-            result["nonce"],
-            result["signature"],
-            logger=logger,
-        )
-        await upsert_deposits(chain, deposits)
-        await to_reorg_with_tx_hash(
-            chain=chain,
-            txs_hash=txs_hash,
-            status=DepositStatus.FINALIZED,
+    if result.get("result") != "SUCCESSFUL":
+        raise DepositNotSignedError(f"Deposits of txs {txs_hash} are not signed: {result}")
+
+    data = list(result["signature_data_from_node"].values())[0]["deposits"]
+    deposits = [
+        Deposit(
+            transfer=chain.transfer_class(**deposit["transfer"]),
+            user_id=deposit["user_id"],
+            decimals=deposit["decimals"],
+            sa_timestamp=deposit["sa_timestamp"],
+            status=deposit["status"],
         )
+        for deposit in data
+    ]
+    encoded_data = encode_zex_deposit(
+        version=ZEX_ENCODE_VERSION,
+        operation_type=DEPOSIT_OPERATION,
+        chain_symbol=chain.chain_symbol,
+        deposits=deposits,
+    )
+    hash_ = sha256(encoded_data).hexdigest()
+    if hash_ != result["message_hash"]:
+        raise DepositDifferentHashError("Hash message is not valid")
+    return SignedDeposits(deposits, encoded_data, result["nonce"], result["signature"], time.monotonic() - start)
+
+
+async def submit_deposits(
+    client: httpx.AsyncClient,
+    chain: ChainConfig,
+    claim: str,
+    signed: SignedDeposits,
+    logger: ChainLoggerAdapter,
+):
+    await send_result_to_zex(
+        client,
+        signed.encoded_data,
+        signed.nonce,
+        signed.signature,
+        logger=logger,
+    )
+    await upsert_deposits(chain, signed.deposits)
+    # Claimed deposits the validators did not return are no longer on the chain.
+    await release_claimed_deposits(chain, claim, status=DepositStatus.REORG)
 
 
 async def send_result_to_zex(
@@ -138,48 +191,110 @@ async def send_result_to_zex(
     return result
 
 
+async def claim_batch(
+    chain: ChainConfig,
+    dkg_party: list[str],
+    size: int,
+    logger: ChainLoggerAdapter,
+) -> DepositBatch | None:
+    """Claim the next `size` finalized deposits and start signing them, `None` when there are none."""
+    claim = uuid.uuid4().hex
+    transfers = await claim_finalized_deposits(chain, claim, limit=size)
+    if len(transfers) == 0:
+        return None
+    txs_hash = list(dict.fromkeys(transfer["tx_hash"] for transfer in transfers))
+    signing = asyncio.create_task(
+        sign_deposits(
+            chain,
+            txs_hash,
+            dkg_party,
+            finalized_block_number=transfers[-1]["block_number"],
+            logger=logger,
+        )
+    )
+    return DepositBatch(claim, txs_hash, signing, full=len(transfers) >= size)
+
+
+async def release_batches(chain: ChainConfig, batches: list[DepositBatch]):
+    for batch in batches:
+        batch.signing.cancel()
+    await asyncio.gather(*[batch.signing for batch in batches], return_exceptions=True)
+    for batch in batches:
+        await release_claimed_deposits(chain, batch.claim)
+
+
 async def deposit(chain: ChainConfig):
+    """Sign the finalized deposits of `chain` and send them to Zex.
+
+    Up to `SA_MAX_INFLIGHT_BATCHES` batches of deposits are signed concurrently, each over the
+    deposits it claimed, and they are submitted to Zex one at a time in the order they were
+    claimed. When a batch fails, the batches claimed after it are released as well, so their
+    deposits are claimed and submitted again after the failed ones. The number of transactions
+    per batch is adapted by a `BatchSizeController`.
+    """
     _logger = ChainLoggerAdapter(logger, chain.chain_symbol)
+    # Claims left by a previous run are never going to be submitted.
+    released = await release_claimed_deposits(chain)
+    if released > 0:
+        _logger.warning(f"Released {released} deposits claimed by a previous run.")
+    in_flight: deque[DepositBatch] = deque()
+    batch_sizes = BatchSizeController(
+        SA_TRANSACTIONS_BATCH_SIZE,
+        max_size=SA_MAX_TRANSACTIONS_BATCH_SIZE,
+        target_latency=SA_BATCH_TARGET_LATENCY,
+    )
+    batch_size_controllers[chain.chain_symbol] = batch_sizes
     while True:
-        client = httpx.AsyncClient()
+        client = get_http_client()
+        dkg_party = dkg_key["party"]
         try:
-            dkg_party = dkg_key["party"]
-            deposits = await find_deposit_by_status(
-                chain=chain,
-                status=DepositStatus.FINALIZED,
-                limit=SA_TRANSACTIONS_BATCH_SIZE,
-            )
-            txs_hash = [deposit.transfer.tx_hash for deposit in (deposits)]
-            if len(txs_hash) <= 0:
+            while len(in_flight) < SA_MAX_INFLIGHT_BATCHES:
+                batch = await claim_batch(chain, dkg_party, batch_sizes.size, _logger)
+                if batch is None:
+                    break
+                in_flight.append(batch)
+            if len(in_flight) == 0:
                 _logger.info("No finalized deposit found.")
+                await asyncio.sleep(chain.delay)
                 continue
-            finalized_block_number = deposits[-1].transfer.block_number
+
+            batch = in_flight.popleft()
             try:
-                await process_deposit(
-                    client,
-                    chain,
-                    txs_hash,
-                    dkg_party,
-                    finalized_block_number=finalized_block_number,
-                    logger=_logger,
-                )
-            except ZexAPIError as e:
-                _logger.error(f"Error at sending deposit to Zex: {e}")
-            except AssertionError as e:
-                _logger.error(f"Validator error, error: {e}")
-            except (KeyError, json.JSONDecodeError, TypeError) as e:
-                _logger.exception(f"Error occurred in pyfrost, {e}")
-            except asyncio.TimeoutError as e:
-                _logger.error(f"Timeout occurred continue after 1 min, error {e}")
-            except DepositDifferentHashError as e:
-                _logger.error(e)
-
-        finally:
-            await client.aclose()
-            await asyncio.sleep(chain.delay)
+                signed = await batch.signing
+                submit_start = time.monotonic()
+                await submit_deposits(client, chain, batch.claim, signed, logger=_logger)
+            except BaseException:
+                await release_batches(chain, [batch, *in_flight])
+                in_flight.clear()
+                raise
+            latency = signed.signing_latency + time.monotonic() - submit_start
+            decision = batch_sizes.record_success(latency, full=batch.full)
+            _logger.info(f"{len(batch.txs_hash)} txs done in {latency:.2f}s, {decision}: {batch_sizes.stats()}")
+            _logger.debug(f"Nonce pool stats: {nonce_pool.stats()}")
+            _logger.debug(f"HTTP client stats: {get_http_client_stats()}")
+            continue
+        except ZexAPIError as e:
+            _logger.error(f"Error at sending deposit to Zex: {e}")
+            batch_sizes.record_failure()
+            _logger.info(f"Batch size shrunk: {batch_sizes.stats()}")
+        except AssertionError as e:
+            _logger.error(f"Validator error, error: {e}")
+        except (KeyError, json.JSONDecodeError, TypeError) as e:
+            _logger.exception(f"Error occurred in pyfrost, {e}")
+            # The nodes may have restarted and lost the nonces handed out to the SA.
+            nonce_pool.discard(dkg_party)
+        except asyncio.TimeoutError as e:
+            _logger.error(f"Timeout occurred continue after 1 min, error {e}")
+            batch_sizes.record_failure()
+            _logger.info(f"Batch size shrunk: {batch_sizes.stats()}")
+        except (DepositDifferentHashError, DepositNotSignedError, NoncePoolError) as e:
+            _logger.error(e)
+        await asyncio.sleep(chain.delay)
 
 
 async def main():
+    await ensure_indexes(CHAINS_CONFIG.values())
+    setup_http_clients()
     loop = asyncio.get_running_loop()
     tasks = [loop.create_task(deposit(chain)) for chain in CHAINS_CONFIG.values()]
     await asyncio.gather(*tasks)
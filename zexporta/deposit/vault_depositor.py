@@ -15,6 +15,7 @@ from zexporta.custom_types import (
     EVMConfig,
 )
 from zexporta.db.deposit import find_deposit_by_status, upsert_deposit
+from zexporta.db.index import ensure_indexes
 from zexporta.utils.abi import FACTORY_ABI, USER_DEPOSIT_ABI
 from zexporta.utils.logger import ChainLoggerAdapter, get_logger_config
 
@@ -132,6 +133,7 @@ async def withdraw(chain: EVMConfig):
 
 
 async def main():
+    await ensure_indexes(CHAINS_CONFIG.values())
     loop = asyncio.get_running_loop()
     tasks = [loop.create_task(withdraw(chain)) for chain in CHAINS_CONFIG.values() if isinstance(chain, EVMConfig)]
     await asyncio.gather(*tasks)
@@ -1,6 +1,10 @@
+import asyncio
+import time
+from functools import lru_cache, partial
 from typing import Any, Callable, Coroutine
 
-from clients import ChainAsyncClient, filter_blocks
+from clients import AdaptiveLimiter, ChainAsyncClient, stream_blocks
+from clients.exceptions import EVMTokenDecimalsNotFound
 
 from zexporta.custom_types import (
     Address,
@@ -11,7 +15,7 @@ from zexporta.custom_types import (
     Transfer,
     UserId,
 )
-from zexporta.db.token import get_decimals, insert_token
+from zexporta.db.token import get_decimals, get_tokens_decimals, insert_token
 
 
 def get_block_batches(
@@ -34,19 +38,38 @@ async def explorer(
     accepted_addresses: dict[Address, UserId],
     extract_block_logic: Callable[..., Coroutine[Any, Any, list[Transfer]]],
     *,
-    batch_size=5,
-    max_delay_per_block_batch: int | float = 10,
+    batch_size: int = 5,
+    max_concurrency: int = 20,
+    extract_range_logic: Callable[..., Coroutine[Any, Any, list[Transfer]]] | None = None,
+    limiter: AdaptiveLimiter | None = None,
     **kwargs,
 ) -> list[Deposit[Transfer]]:
+    """Scan `[from_block, to_block]` and return the accepted deposits in block order.
+
+    Blocks are fetched concurrently through an `AdaptiveLimiter` that starts with `batch_size`
+    in-flight fetches and adapts up to `max_concurrency` depending on RPC latency and rate limits.
+    Deposits of a block are filtered as soon as it and all the blocks before it have arrived.
+    Callers scanning a chain repeatedly should pass their own `limiter`, so the concurrency and the
+    rate-limit backoff it learned carry over to the next scan.
+
+    `extract_block_logic` is called as `extract_block_logic(block_number, accepted_addresses=..., **kwargs)`,
+    clients may use `accepted_addresses` to skip the transfers to other addresses early.
+
+    When `extract_range_logic` is given, it is called once per range of `batch_size` blocks as
+    `extract_range_logic(from_block, to_block, accepted_addresses=..., **kwargs)` instead of calling
+    `extract_block_logic` for every block.
+    """
+    if extract_range_logic is not None:
+        units = get_block_batches(from_block, to_block, batch_size=batch_size)
+        fetch = partial(_extract_block_range, extract_range_logic, accepted_addresses=accepted_addresses, **kwargs)
+    else:
+        units = range(from_block, to_block + 1)
+        fetch = partial(extract_block_logic, accepted_addresses=accepted_addresses, **kwargs)
+
     result = []
-    block_batches = get_block_batches(from_block, to_block, batch_size=batch_size)
-    for blocks_number in block_batches:
-        transfers = await filter_blocks(
-            blocks_number,
-            extract_block_logic,
-            max_delay_per_block_batch=max_delay_per_block_batch,
-            **kwargs,
-        )
+    if limiter is None:
+        limiter = AdaptiveLimiter(batch_size, max_limit=max_concurrency)
+    async for _, transfers in stream_blocks(units, fetch, limiter):
         accepted_deposits = await get_accepted_deposits(
             client,
             transfers,
@@ -56,13 +79,72 @@ async def explorer(
     return result
 
 
-async def get_token_decimals(client: ChainAsyncClient, token_address: Address) -> int:
-    chain_symbol = client.chain.chain_symbol
-    decimals = await get_decimals(chain_symbol, token_address)
-    if decimals is None:
-        decimals = await client.get_token_decimals(token_address)
-        await insert_token(chain_symbol, token_address, decimals)
-    return decimals
+async def _extract_block_range(
+    extract_range_logic: Callable[..., Coroutine[Any, Any, list[Transfer]]],
+    blocks_number: tuple[BlockNumber, ...],
+    **kwargs,
+) -> list[Transfer]:
+    return await extract_range_logic(blocks_number[0], blocks_number[-1], **kwargs)
+
+
+class TokenDecimalsCache:
+    """In-memory decimals of the tokens of a chain.
+
+    The cache is warmed from the `token` collection on first use. Concurrent lookups of an
+    unknown token share a single database/RPC lookup, and tokens without `decimals()` are
+    remembered as `None` for `negative_ttl` seconds.
+    """
+
+    def __init__(self, chain_symbol: str, negative_ttl: float = 3600):
+        self.chain_symbol = chain_symbol
+        self.negative_ttl = negative_ttl
+        self.decimals: dict[Address, int] = {}
+        self._missing: dict[Address, float] = {}
+        self._lookups: dict[Address, asyncio.Task[int | None]] = {}
+        self._is_warm = False
+
+    async def warm(self):
+        self.decimals.update(await get_tokens_decimals(self.chain_symbol))
+        self._is_warm = True
+
+    async def get(self, client: ChainAsyncClient, token_address: Address) -> int | None:
+        if (decimals := self.decimals.get(token_address)) is not None:
+            return decimals
+        if self._missing.get(token_address, 0) > time.monotonic():
+            return None
+        if not self._is_warm:
+            await self.warm()
+            if (decimals := self.decimals.get(token_address)) is not None:
+                return decimals
+        lookup = self._lookups.get(token_address)
+        if lookup is None or lookup.get_loop() is not asyncio.get_running_loop():
+            lookup = asyncio.create_task(self._lookup(client, token_address))
+            self._lookups[token_address] = lookup
+            lookup.add_done_callback(lambda _: self._lookups.pop(token_address, None))
+        # Shielded so a cancelled caller does not cancel the lookup of the others.
+        return await asyncio.shield(lookup)
+
+    async def _lookup(self, client: ChainAsyncClient, token_address: Address) -> int | None:
+        decimals = await get_decimals(self.chain_symbol, token_address)
+        if decimals is None:
+            try:
+                decimals = await client.get_token_decimals(token_address)
+            except EVMTokenDecimalsNotFound:
+                self._missing[token_address] = time.monotonic() + self.negative_ttl
+                return None
+            await insert_token(self.chain_symbol, token_address, decimals)
+        self.decimals[token_address] = decimals
+        return decimals
+
+
+@lru_cache
+def get_token_decimals_cache(chain_symbol: str) -> TokenDecimalsCache:
+    return TokenDecimalsCache(chain_symbol)
+
+
+async def get_token_decimals(client: ChainAsyncClient, token_address: Address) -> int | None:
+    """Decimals of `token_address`, `None` if it is not a token contract."""
+    return await get_token_decimals_cache(client.chain.chain_symbol).get(client, token_address)
 
 
 async def get_accepted_deposits(
@@ -72,20 +154,52 @@ async def get_accepted_deposits(
     *,
     sa_timestamp: Timestamp | None = None,
     deposit_status: DepositStatus = DepositStatus.PENDING,
+    max_concurrency: int = 20,
 ) -> list[Deposit]:
+    """Return the deposits of `transfers` to `accepted_addresses`, in the order of `transfers`.
+
+    Decimals and transaction status are resolved concurrently, at most `max_concurrency` lookups
+    at a time, once per distinct token and transaction.
+    """
+    matched_transfers = [
+        (transfer, user_id) for transfer in transfers if (user_id := accepted_addresses.get(transfer.to)) is not None
+    ]
+    if len(matched_transfers) == 0:
+        return []
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded[T](coroutine: Coroutine[Any, Any, T]) -> T:
+        async with semaphore:
+            return await coroutine
+
+    tokens = list(dict.fromkeys(transfer.token for transfer, _ in matched_transfers))
+    txs_hash = list(
+        dict.fromkeys(transfer.tx_hash for transfer, _ in matched_transfers if transfer.is_successful is None)
+    )
+    tokens_decimals, txs_status = await asyncio.gather(
+        asyncio.gather(*[bounded(get_token_decimals(client, token)) for token in tokens]),
+        asyncio.gather(*[bounded(client.is_transaction_successful(tx_hash)) for tx_hash in txs_hash]),
+    )
+    decimals_by_token = dict(zip(tokens, tokens_decimals))
+    status_by_tx_hash = dict(zip(txs_hash, txs_status))
+
     result = []
-    for transfer in transfers:
-        if (user_id := accepted_addresses.get(transfer.to)) is not None:
-            decimals = await get_token_decimals(client, transfer.token)
-            if await client.is_transaction_successful(transfer.tx_hash):
-                result.append(
-                    Deposit(
-                        user_id=user_id,
-                        decimals=decimals,
-                        transfer=client.chain.transfer_class.model_validate(transfer),
-                        status=deposit_status,
-                        sa_timestamp=sa_timestamp,
-                    )
+    for transfer, user_id in matched_transfers:
+        decimals = decimals_by_token[transfer.token]
+        if decimals is None:
+            continue
+        is_successful = transfer.is_successful
+        if is_successful is None:
+            is_successful = status_by_tx_hash[transfer.tx_hash]
+        if is_successful:
+            result.append(
+                Deposit(
+                    user_id=user_id,
+                    decimals=decimals,
+                    transfer=client.chain.transfer_class.model_validate(transfer),
+                    status=deposit_status,
+                    sa_timestamp=sa_timestamp,
                 )
+            )
 
     return result
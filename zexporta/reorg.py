@@ -0,0 +1,75 @@
+import asyncio
+from typing import Iterable
+
+from clients import ChainAsyncClient
+
+from zexporta.custom_types import BlockHeader, BlockNumber
+from zexporta.db.block_header import get_block_headers
+
+
+async def fetch_block_headers(
+    client: ChainAsyncClient,
+    blocks_number: Iterable[BlockNumber],
+    *,
+    max_concurrency: int = 20,
+) -> list[BlockHeader]:
+    """Fetch the canonical headers of `blocks_number` concurrently, in the given order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(block_number: BlockNumber) -> BlockHeader:
+        async with semaphore:
+            return await client.get_block_header(block_number)
+
+    return await asyncio.gather(*[fetch(block_number) for block_number in blocks_number])
+
+
+def is_linked(headers: list[BlockHeader]) -> bool:
+    """Check that consecutive `headers` form a chain, i.e. none of them was fetched across a reorg."""
+    return all(child.parent_hash == parent.hash for parent, child in zip(headers, headers[1:]))
+
+
+async def find_fork_point(
+    client: ChainAsyncClient,
+    chain_symbol: str,
+    last_block: BlockNumber,
+    *,
+    batch_size: int = 20,
+) -> BlockNumber | None:
+    """Find the last stored block at or below `last_block` that is still canonical.
+
+    Stored headers are compared with the canonical ones `batch_size` at a time, walking back from
+    `last_block`. Return `None` when none of the stored headers is canonical anymore, i.e. the reorg
+    is deeper than the stored ring.
+    """
+    to_block = last_block
+    while True:
+        stored_headers = await get_block_headers(chain_symbol, to_block - batch_size + 1, to_block)
+        if len(stored_headers) == 0:
+            return None
+        canonical_hashes = await asyncio.gather(*[client.get_block_hash(number) for number in stored_headers])
+        for number, canonical_hash in sorted(zip(stored_headers, canonical_hashes), reverse=True):
+            if stored_headers[number].hash == canonical_hash:
+                return number
+        to_block = min(stored_headers) - 1
+
+
+async def get_canonical_block_numbers(
+    client: ChainAsyncClient,
+    chain_symbol: str,
+    blocks_number: list[BlockNumber],
+) -> tuple[list[BlockNumber], list[BlockNumber], list[BlockNumber]]:
+    """Split ascending `blocks_number` by comparing their stored header with the canonical hash.
+
+    Return the blocks that are still canonical, the reorged ones, and the ones without a stored header.
+    """
+    stored_headers = await get_block_headers(chain_symbol, blocks_number[0], blocks_number[-1])
+    known = [number for number in blocks_number if number in stored_headers]
+    unknown = [number for number in blocks_number if number not in stored_headers]
+    canonical_hashes = await asyncio.gather(*[client.get_block_hash(number) for number in known])
+    canonical, reorged = [], []
+    for number, canonical_hash in zip(known, canonical_hashes):
+        if stored_headers[number].hash == canonical_hash:
+            canonical.append(number)
+        else:
+            reorged.append(number)
+    return canonical, reorged, unknown
@@ -0,0 +1,66 @@
+class BatchSizeController:
+    """Pick the number of transactions per deposit batch from how the previous batches went.
+
+    The size grows by `increase` after every full batch signed and sent to Zex within
+    `target_latency` seconds, and is multiplied by `decrease` after a batch that took longer,
+    a timeout or a Zex error, so under load the batches settle around the biggest size the
+    validators can sign in time.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        *,
+        min_size: int = 1,
+        max_size: int,
+        target_latency: float,
+        increase: int = 1,
+        decrease: float = 0.5,
+    ):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.size = min(max(initial_size, min_size), self.max_size)
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.grows = 0
+        self.shrinks = 0
+        self.last_decision: str | None = None
+        self.last_latency: float | None = None
+
+    def stats(self) -> dict[str, int | float | str | None]:
+        return {
+            "size": self.size,
+            "grows": self.grows,
+            "shrinks": self.shrinks,
+            "last_decision": self.last_decision,
+            "last_latency": self.last_latency,
+        }
+
+    def record_success(self, latency: float, full: bool) -> str:
+        """Record a batch submitted to Zex `latency` seconds after its signing started."""
+        self.last_latency = latency
+        if latency > self.target_latency:
+            return self._shrink()
+        if not full:
+            # A batch smaller than the size says nothing about bigger batches.
+            return self._decide("hold", self.size)
+        size = min(self.size + self.increase, self.max_size)
+        return self._decide("grow" if size > self.size else "hold", size)
+
+    def record_failure(self) -> str:
+        """Record a batch that timed out or was refused by Zex."""
+        return self._shrink()
+
+    def _shrink(self) -> str:
+        size = max(int(self.size * self.decrease), self.min_size)
+        return self._decide("shrink" if size < self.size else "hold", size)
+
+    def _decide(self, decision: str, size: int) -> str:
+        if size > self.size:
+            self.grows += 1
+        elif size < self.size:
+            self.shrinks += 1
+        self.size = size
+        self.last_decision = decision
+        return decision
@@ -0,0 +1,24 @@
+import redis.asyncio
+from clients.cache import configure_block_cache
+
+
+class RedisBlockCacheBackend:
+    """Redis tier of the clients block cache, so processes of a host share downloaded blocks."""
+
+    def __init__(self, url: str, expiry: int | None = None):
+        self.redis_client = redis.asyncio.Redis.from_url(url, decode_responses=True)
+        self.expiry = expiry
+
+    async def get(self, key: str) -> str | None:
+        return await self.redis_client.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        await self.redis_client.set(key, value, ex=self.expiry)
+
+    async def delete(self, key: str) -> None:
+        await self.redis_client.delete(key)
+
+
+def setup_block_cache(max_size: int, redis_url: str | None = None, expiry: int | None = None):
+    backend = RedisBlockCacheBackend(redis_url, expiry=expiry) if redis_url else None
+    configure_block_cache(max_size=max_size, backend=backend)
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import threading
+from typing import Any, Coroutine
+
+
+class BackgroundEventLoop:
+    """An event loop running forever in a daemon thread, for synchronous code to run coroutines on.
+
+    Clients cached for the process (RPC clients, the HTTP client of `get_http_client`, Mongo)
+    are bound to the loop they were first used on, so running every coroutine on this one loop
+    keeps their connections open between calls, unlike `asyncio.run`.
+    """
+
+    def __init__(self, name: str = "event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run[T](self, coroutine: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run `coroutine` on the loop and wait for its result, from any other thread."""
+        if threading.current_thread() is self._thread:
+            # Waiting here would block the loop that has to run `coroutine`.
+            raise RuntimeError("Cannot wait for a coroutine from the thread of its own event loop")
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_lock = threading.Lock()
+_background_loop: BackgroundEventLoop | None = None
+_background_loop_pid: int | None = None
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    """Get the background event loop of the process, started on first use.
+
+    The thread of a loop does not survive a fork, so a forked process (e.g. a gunicorn worker)
+    starts its own loop.
+    """
+    global _background_loop, _background_loop_pid
+    with _lock:
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            _background_loop = BackgroundEventLoop()
+            _background_loop_pid = os.getpid()
+        return _background_loop
+
+
+def run_in_background_loop[T](coroutine: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    return get_background_loop().run(coroutine, timeout)
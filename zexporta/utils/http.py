@@ -0,0 +1,19 @@
+from clients.http import configure_http_clients
+
+from zexporta.config import (
+    HTTP_HTTP2,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+)
+
+
+def setup_http_clients():
+    configure_http_clients(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        timeout=HTTP_TIMEOUT,
+        http2=HTTP_HTTP2,
+    )
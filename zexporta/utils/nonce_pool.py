@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# The nonce of each node of a party, as `request_signature` takes them.
+type PartyNonces = dict[str, Any]
+
+
+class NoncePoolError(Exception):
+    """Raise when the nodes of a party answer a nonce request without nonces"""
+
+
+class NoncePool:
+    """Signing nonces of DKG parties, requested in bulk ahead of the signatures that use them.
+
+    A signature needs one nonce of every node of the party, and asking the nodes for them is a
+    round trip as long as the signing itself. The pool refills in the background when fewer than
+    `low_watermark` are left, so a signature usually only waits for the signing round trip. A
+    nonce is handed out once, and nonces older than `ttl` seconds are dropped, since the nodes
+    expire them (and forget them on a restart).
+
+    A refill asks for as many nonces as the party signed with in the last `ttl` seconds, since
+    more would expire unused, but at least `low_watermark` (and one) and at most `batch_size`.
+    """
+
+    def __init__(
+        self,
+        request_nonces: Callable[..., Awaitable[dict[str, Any]]],
+        *,
+        batch_size: int = 100,
+        low_watermark: int = 20,
+        ttl: float = 600,
+    ):
+        self.request_nonces = request_nonces
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self.ttl = ttl
+        self._pools: dict[tuple[str, ...], deque[tuple[float, PartyNonces]]] = {}
+        self._refills: dict[tuple[str, ...], asyncio.Task] = {}
+        self._consumed_at: dict[tuple[str, ...], deque[float]] = {}
+        self.consumed = 0
+        self.expired = 0
+        self.discarded = 0
+        self.refills = 0
+        self.refill_latency: float | None = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "depth": {",".join(party): len(pool) for party, pool in self._pools.items()},
+            "consumed": self.consumed,
+            "expired": self.expired,
+            "discarded": self.discarded,
+            "refills": self.refills,
+            "refill_latency": self.refill_latency,
+        }
+
+    def depth(self, party: list[str]) -> int:
+        return len(self._pools.get(tuple(party), ()))
+
+    async def get(self, party: list[str]) -> PartyNonces:
+        """Take the nonces of one signature by `party`, waiting for a refill if the pool is empty."""
+        key = tuple(party)
+        while True:
+            # Looked up again after a refill, `discard` may have replaced the pool meanwhile.
+            pool = self._pools.setdefault(key, deque())
+            self._drop_expired(pool)
+            if len(pool) > 0:
+                break
+            await self._start_refill(key)
+        _, nonces = pool.popleft()
+        self.consumed += 1
+        self._consumed_at.setdefault(key, deque()).append(time.monotonic())
+        if len(pool) < self.low_watermark:
+            self._start_refill(key)
+        return nonces
+
+    def discard(self, party: list[str]):
+        """Drop the pooled nonces of `party`, e.g. when its nodes may no longer know them."""
+        pool = self._pools.pop(tuple(party), None)
+        if pool is not None:
+            self.discarded += len(pool)
+
+    def _drop_expired(self, pool: deque[tuple[float, PartyNonces]]):
+        # Nonces are appended in the order they were fetched, the oldest are first.
+        deadline = time.monotonic() - self.ttl
+        while len(pool) > 0 and pool[0][0] < deadline:
+            pool.popleft()
+            self.expired += 1
+
+    def refill_size(self, party: list[str]) -> int:
+        """Number of nonces the next refill of `party` asks for, from its signing rate."""
+        consumed_at = self._consumed_at.get(tuple(party), deque())
+        deadline = time.monotonic() - self.ttl
+        while len(consumed_at) > 0 and consumed_at[0] < deadline:
+            consumed_at.popleft()
+        return min(self.batch_size, max(len(consumed_at), self.low_watermark, 1))
+
+    def _start_refill(self, key: tuple[str, ...]) -> asyncio.Task:
+        task = self._refills.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refill(key))
+            task.add_done_callback(self._on_refill_done)
+            self._refills[key] = task
+        return task
+
+    @staticmethod
+    def _on_refill_done(task: asyncio.Task):
+        # Background refills are not awaited by anyone, a failure is only logged; the next `get`
+        # on an empty pool starts a new refill and raises its error.
+        if not task.cancelled() and (error := task.exception()) is not None:
+            logger.error(f"Refilling nonces failed: {error!r}")
+
+    async def _refill(self, key: tuple[str, ...]):
+        start = time.monotonic()
+        response = await self.request_nonces(list(key), number_of_nonces=self.refill_size(list(key)))
+        fetched_at = time.monotonic()
+        self.refills += 1
+        self.refill_latency = fetched_at - start
+        count = min(len(response[node_id]["data"]) for node_id in key)
+        if count == 0:
+            raise NoncePoolError(f"No nonces received from party {list(key)}")
+        pool = self._pools.setdefault(key, deque())
+        pool.extend((fetched_at, {node_id: response[node_id]["data"][i] for node_id in key}) for i in range(count))
@@ -25,6 +25,27 @@ class RedisInterface:
     def get_value(self, key: str) -> Any:
         return self.redis_client.get(key)
 
+    def get_values(self, keys: list[str]) -> list[Any]:
+        """Get the values of `keys` in one round trip, `None` for missing keys or when Redis fails."""
+        if len(keys) == 0:
+            return []
+        try:
+            return self.redis_client.mget(keys)  # type: ignore
+        except redis.RedisError:
+            return [None] * len(keys)
+
+    def set_values(self, values: dict[str, Any], expiry: int | None = None) -> bool:
+        if len(values) == 0:
+            return True
+        try:
+            with self.redis_client.pipeline() as pipeline:
+                for key, value in values.items():
+                    pipeline.set(key, value, ex=expiry)
+                pipeline.execute()
+        except redis.RedisError:
+            return False
+        return True
+
     def delete_key(self, key: str) -> bool:
         try:
             return bool(self.redis_client.delete(key))
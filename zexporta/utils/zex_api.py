@@ -4,6 +4,7 @@ from json import JSONDecodeError
 
 import httpx
 from clients import BTCConfig
+from clients.http import get_http_client
 
 from zexporta.config import ZEX_BASE_URL
 from zexporta.custom_types import (
@@ -35,8 +36,8 @@ class ZexAPIError(Exception):
 
 @asynccontextmanager
 async def get_async_client():
-    async with httpx.AsyncClient() as client:
-        yield client
+    # The shared client outlives the context, its connections are reused by the next caller.
+    yield get_http_client()
 
 
 async def get_last_zex_user_id(async_client: httpx.AsyncClient) -> UserId | None:
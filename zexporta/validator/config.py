@@ -1,6 +1,9 @@
 import os
 
 from zexporta.config import (
+    BLOCK_CACHE_EXPIRY,
+    BLOCK_CACHE_REDIS_URL,
+    BLOCK_CACHE_SIZE,
     CHAINS_CONFIG,
     ENVIRONMENT,
     SENTRY_DNS,
@@ -44,4 +47,10 @@ else:
             "/pyfrost/v1/generate-nonces",
         ],
     }
+NODE_ID = int(os.environ["NODE_ID"], 16)
 PRIVATE_KEY = int(os.environ["NODE_PRIVATE_KEY"])
+
+# Seconds a generated signing nonce is kept, it must exceed the SA_NONCE_TTL of the SAs.
+NONCE_EXPIRY = int(os.getenv("NONCE_EXPIRY", 30 * 60))
+# Seconds the deposits of a transaction verified in a finalized block are remembered, for retried batches.
+VERIFIED_DEPOSITS_EXPIRY = int(os.getenv("VERIFIED_DEPOSITS_EXPIRY", 24 * 60 * 60))
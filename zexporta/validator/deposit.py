@@ -1,23 +1,31 @@
 import asyncio
+import json
 import logging
+from collections import Counter, defaultdict
 from hashlib import sha256
 
 from clients import get_async_client
 
 from zexporta.custom_types import (
+    Address,
     BlockNumber,
     ChainConfig,
+    Deposit,
     DepositStatus,
     SaDepositSchema,
     Timestamp,
+    Transfer,
     TxHash,
+    UserId,
 )
 from zexporta.db.address import get_active_address, insert_new_address_to_db
 from zexporta.explorer import get_accepted_deposits
 from zexporta.utils.encoder import DEPOSIT_OPERATION, encode_zex_deposit
+from zexporta.utils.event_loop import run_in_background_loop
 from zexporta.utils.logger import ChainLoggerAdapter
+from zexporta.utils.redis_interface import redis_interface
 
-from .config import ZEX_ENCODE_VERSION
+from .config import NODE_ID, VERIFIED_DEPOSITS_EXPIRY, ZEX_ENCODE_VERSION
 
 
 class NoTxHashError(Exception):
@@ -35,7 +43,7 @@ def deposit(chain: ChainConfig, data: SaDepositSchema, logger: ChainLoggerAdapte
     txs_hash = data.txs_hash
     if len(txs_hash) == 0:
         raise NoTxHashError()
-    deposits = asyncio.run(
+    deposits = run_in_background_loop(
         get_deposits(
             chain=chain,
             txs_hash=txs_hash,
@@ -65,6 +73,13 @@ async def get_deposits(
     sa_timestamp: Timestamp,
 ):
     _logger = ChainLoggerAdapter(logger, chain.chain_symbol)
+    memoized = await get_verified_deposits(chain, txs_hash, sa_timestamp)
+    txs_hash = [tx_hash for tx_hash in txs_hash if tx_hash not in memoized]
+    memoized_deposits = [deposit for deposits in memoized.values() for deposit in deposits]
+    if len(txs_hash) == 0:
+        _logger.debug(f"Reusing the verified deposits of txs: {list(memoized)}")
+        return sorted(memoized_deposits)
+
     client = get_async_client(chain=chain, logger=_logger)
     finalized_block_number = await client.get_finalized_block_number()
     if sa_finalized_block_number > finalized_block_number:
@@ -72,7 +87,7 @@ async def get_deposits(
             f"sa_finalized_block_number: {sa_finalized_block_number} \
             is not finalized in validator , finalized_block: {finalized_block_number}"
         )
-    await insert_new_address_to_db(chain)
+    is_address_index_current = await insert_new_address_to_db(chain)
     accepted_addresses = await get_active_address(chain)
     transfers = await asyncio.gather(*[client.get_transfer_by_tx_hash(tx_hash) for tx_hash in txs_hash])
     flattened_transfers = []
@@ -83,15 +98,98 @@ async def get_deposits(
             flattened_transfers.append(item)
     transfers = flattened_transfers
 
+    finalized_transfers = [
+        transfer for transfer in transfers if transfer is not None and transfer.block_number <= finalized_block_number
+    ]
     deposits = await get_accepted_deposits(
         client,
-        [
-            transfer
-            for transfer in transfers
-            if transfer is not None and transfer.block_number <= finalized_block_number
-        ],
+        finalized_transfers,
         accepted_addresses,
         deposit_status=DepositStatus.VERIFIED,
         sa_timestamp=sa_timestamp,
     )
-    return sorted(deposits)
+    # Only transfers at or below the finalized block get here, their verification is final.
+    verified_txs_hash = get_fully_verified_txs_hash(
+        finalized_transfers, deposits, accepted_addresses, is_address_index_current=is_address_index_current
+    )
+    await memoize_verified_deposits(
+        chain, [deposit for deposit in deposits if deposit.transfer.tx_hash in verified_txs_hash]
+    )
+    return sorted([*memoized_deposits, *deposits])
+
+
+def _verified_deposits_key(chain: ChainConfig, tx_hash: TxHash) -> str:
+    return f"verified_deposits:{NODE_ID}:{chain.chain_symbol}:{tx_hash}"
+
+
+def get_fully_verified_txs_hash(
+    transfers: list[Transfer],
+    deposits: list[Deposit],
+    accepted_addresses: dict[Address, UserId],
+    *,
+    is_address_index_current: bool,
+) -> set[TxHash]:
+    """Get the transactions of `deposits` of which every transfer to a user is a deposit.
+
+    A transfer to an accepted address can be dropped (e.g. when the decimals of its token are not
+    found), and while the address index lags behind Zex, a transfer to an unknown address may be
+    the deposit of a new user. Such transactions must be verified again rather than remembered.
+    """
+    deposits_count = Counter(deposit.transfer.tx_hash for deposit in deposits)
+    accepted_transfers_count: Counter[TxHash] = Counter()
+    incomplete_txs_hash = set()
+    for transfer in transfers:
+        if transfer.to in accepted_addresses:
+            accepted_transfers_count[transfer.tx_hash] += 1
+        elif not is_address_index_current:
+            incomplete_txs_hash.add(transfer.tx_hash)
+    return {
+        tx_hash
+        for tx_hash, count in deposits_count.items()
+        if count == accepted_transfers_count[tx_hash] and tx_hash not in incomplete_txs_hash
+    }
+
+
+async def get_verified_deposits(
+    chain: ChainConfig, txs_hash: list[TxHash], sa_timestamp: Timestamp
+) -> dict[TxHash, list[Deposit]]:
+    """Get the deposits of the transactions of `txs_hash` verified by a previous request, by tx hash."""
+    # The Redis client is synchronous, it runs in a thread so it does not block the event loop.
+    values = await asyncio.to_thread(
+        redis_interface.get_values, [_verified_deposits_key(chain, tx_hash) for tx_hash in txs_hash]
+    )
+    return {
+        tx_hash: [
+            Deposit(
+                transfer=chain.transfer_class(**deposit["transfer"]),
+                user_id=deposit["user_id"],
+                decimals=deposit["decimals"],
+                status=DepositStatus.VERIFIED,
+                sa_timestamp=sa_timestamp,
+            )
+            for deposit in json.loads(value)
+        ]
+        for tx_hash, value in zip(txs_hash, values)
+        if value is not None
+    }
+
+
+async def memoize_verified_deposits(chain: ChainConfig, deposits: list[Deposit]):
+    """Remember the verified deposits of finalized blocks, grouped by transaction.
+
+    Transactions without verified deposits are not remembered, they are verified again the
+    next time they are requested.
+    """
+    deposits_by_tx_hash = defaultdict(list)
+    for deposit in deposits:
+        deposits_by_tx_hash[deposit.transfer.tx_hash].append(
+            deposit.model_dump(mode="json", include={"transfer", "user_id", "decimals"})
+        )
+    await asyncio.to_thread(
+        redis_interface.set_values,
+        {
+            _verified_deposits_key(chain, tx_hash): json.dumps(tx_deposits)
+            for tx_hash, tx_deposits in deposits_by_tx_hash.items()
+        },
+        expiry=VERIFIED_DEPOSITS_EXPIRY,
+    )
@@ -1,15 +1,28 @@
 import logging
 import logging.config
-import os
 
 import sentry_sdk
 from flask import Flask
 from pyfrost.network.node import Node
 
+from zexporta.db.index import ensure_indexes
+from zexporta.utils.block_cache import setup_block_cache
+from zexporta.utils.event_loop import run_in_background_loop
+from zexporta.utils.http import setup_http_clients
 from zexporta.utils.logger import get_logger_config
 from zexporta.utils.node_info import NodesInfo
 
-from .config import LOGGER_PATH, PRIVATE_KEY, SENTRY_DNS
+from .config import (
+    BLOCK_CACHE_EXPIRY,
+    BLOCK_CACHE_REDIS_URL,
+    BLOCK_CACHE_SIZE,
+    CHAINS_CONFIG,
+    LOGGER_PATH,
+    NODE_ID,
+    NONCE_EXPIRY,
+    PRIVATE_KEY,
+    SENTRY_DNS,
+)
 from .node_data_manager import NodeDataManager
 from .node_validator import NodeValidators
 
@@ -23,6 +36,7 @@ sentry_sdk.init(
 def run_node(node_id: int) -> None:
     data_manager = NodeDataManager(
         f"./zexporta/data/dkg_keys-{node_id}.json",
+        nonce_expiry=NONCE_EXPIRY,
     )
     nodes_info = NodesInfo()
     node = Node(
@@ -34,7 +48,11 @@ def run_node(node_id: int) -> None:
         NodeValidators.data_validator,  # type: ignore
     )
     logging.config.dictConfig(get_logger_config(LOGGER_PATH))
+    # Requests run on the background loop of the worker, where the Mongo client must live as well.
+    run_in_background_loop(ensure_indexes(CHAINS_CONFIG.values()))
+    setup_block_cache(BLOCK_CACHE_SIZE, BLOCK_CACHE_REDIS_URL, expiry=BLOCK_CACHE_EXPIRY)
+    setup_http_clients()
     app.register_blueprint(node.blueprint, url_prefix="/pyfrost")
 
 
-run_node(int(os.environ["NODE_ID"], 16))
+run_node(NODE_ID)
@@ -10,9 +10,12 @@ class NodeDataManager(DataManager):
     def __init__(
         self,
         dkg_keys_file="./zexporta/dkg_keys.json",
+        nonce_expiry: int | None = None,
     ) -> None:
         super().__init__()
         self.dkg_keys_file = dkg_keys_file
+        # Nonces handed out to an SA that never signs with them are dropped after `nonce_expiry` seconds.
+        self.nonce_expiry = nonce_expiry
 
         # Load data from files if they exist
         self.__dkg_keys = self._load_data(self.dkg_keys_file)
@@ -28,7 +31,7 @@ class NodeDataManager(DataManager):
             json.dump(data, file, indent=4)
 
     def set_nonce(self, nonce_public: str, nonce_private: int) -> None:
-        redis_interface.set_value(nonce_public, str(nonce_private))
+        redis_interface.set_value(nonce_public, str(nonce_private), expiry=self.nonce_expiry)
 
     def get_nonce(self, nonce_public: str):
         return int(redis_interface.get_value(nonce_public))
@@ -1,8 +1,7 @@
-import asyncio
 from logging import LoggerAdapter
 
-import httpx
 from clients import ChainConfig
+from clients.http import get_http_client
 
 from zexporta.custom_types import (
     EVMConfig,
@@ -10,20 +9,21 @@ from zexporta.custom_types import (
     WithdrawRequest,
 )
 from zexporta.utils.encoder import get_evm_withdraw_hash
+from zexporta.utils.event_loop import run_in_background_loop
 from zexporta.utils.zex_api import get_zex_withdraws
 
 limit_tx = 1
 
 
 async def get_withdraw_request(chain: ChainConfig, sa_withdraw_nonce: int, logger: LoggerAdapter) -> WithdrawRequest:
-    async with httpx.AsyncClient() as client:
-        withdraw = (await get_zex_withdraws(client, chain, offset=sa_withdraw_nonce, limit=sa_withdraw_nonce + 1))[0]
+    client = get_http_client()
+    withdraw = (await get_zex_withdraws(client, chain, offset=sa_withdraw_nonce, limit=sa_withdraw_nonce + 1))[0]
 
     return withdraw
 
 
 def evm_withdraw(chain: EVMConfig, sa_withdraw_nonce: int, logger: LoggerAdapter):
-    withdraw_request = asyncio.run(get_withdraw_request(chain, sa_withdraw_nonce, logger))
+    withdraw_request = run_in_background_loop(get_withdraw_request(chain, sa_withdraw_nonce, logger))
     zex_withdraw_hash = get_evm_withdraw_hash(EVMWithdrawRequest(**withdraw_request.model_dump(mode="json")))
 
     logger.info(f"hash for withdraw is: {zex_withdraw_hash}")
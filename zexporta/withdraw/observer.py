@@ -4,13 +4,16 @@ import logging.config
 import httpx
 import sentry_sdk
 from clients import EVMConfig
+from clients.http import get_http_client
 
 from zexporta.custom_types import ChainConfig
 from zexporta.db.chain import (
     get_last_withdraw_nonce,
     upsert_chain_last_withdraw_nonce,
 )
+from zexporta.db.index import ensure_indexes
 from zexporta.db.withdraw import insert_withdraws_if_not_exists
+from zexporta.utils.http import setup_http_clients
 from zexporta.utils.logger import ChainLoggerAdapter, get_logger_config
 from zexporta.utils.zex_api import (
     ZexAPIError,
@@ -36,7 +39,7 @@ async def observe_withdraw(chain: ChainConfig):
     _logger = ChainLoggerAdapter(logger, chain.chain_symbol)
 
     while True:
-        client = httpx.AsyncClient()
+        client = get_http_client()
         try:
             last_withdraw_nonce = await get_last_withdraw_nonce(chain.chain_symbol)
 
@@ -54,11 +57,12 @@ async def observe_withdraw(chain: ChainConfig):
             continue
 
         finally:
-            await client.aclose()
             await asyncio.sleep(WITHDRAW_DELAY_SECOND)
 
 
 async def main():
+    await ensure_indexes(CHAINS_CONFIG.values())
+    setup_http_clients()
     loop = asyncio.get_running_loop()
     tasks = [
         loop.create_task(observe_withdraw(chain)) for chain in CHAINS_CONFIG.values() if isinstance(chain, EVMConfig)
@@ -17,6 +17,7 @@ from zexporta.custom_types import (
     EVMWithdrawRequest,
     WithdrawStatus,
 )
+from zexporta.db.index import ensure_indexes
 from zexporta.db.withdraw import find_withdraws_by_status, upsert_withdraw
 from zexporta.utils.abi import VAULT_ABI
 from zexporta.utils.decode_error import decode_custom_error_data
@@ -197,6 +198,7 @@ async def withdraw(chain: EVMConfig):
 
 
 async def main():
+    await ensure_indexes(CHAINS_CONFIG.values())
     loop = asyncio.get_running_loop()
     tasks = [loop.create_task(withdraw(chain)) for chain in CHAINS_CONFIG.values() if isinstance(chain, EVMConfig)]
     await asyncio.gather(*tasks)